@@ -8,6 +8,7 @@ import json
 import os
 import shutil
 import tarfile
+import time
 from datetime import datetime
 from tempfile import NamedTemporaryFile, mkdtemp
 
@@ -275,17 +276,26 @@ def create_export_tarball(course_module, course_key, context, status=None):
     root_dir = path(mkdtemp())
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
-        else:
-            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
-
-        if status:
-            status.set_state(u'Compressing')
-            status.increment_completed_steps()
         LOGGER.debug(u'tar file being generated at %s', export_file.name)
         with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
+            # The static assets are streamed from the contentstore straight into the archive;
+            # only the course's xml goes through root_dir.
+            start = time.time()
+            if isinstance(course_key, LibraryLocator):
+                export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name, archive=tar_file)
+            else:
+                export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name, archive=tar_file)
+            LOGGER.info(u'Course export %s: content exported in %.2fs', course_key, time.time() - start)
+
+            if status:
+                status.set_state(u'Compressing')
+                status.increment_completed_steps()
+            start = time.time()
             tar_file.add(root_dir / name, arcname=name)
+        LOGGER.info(
+            u'Course export %s: xml compressed in %.2fs, %d bytes archived',
+            course_key, time.time() - start, os.path.getsize(export_file.name),
+        )
 
     except SerializationError as exc:
         LOGGER.exception(u'There was an error exporting %s', course_key)
@@ -508,7 +518,8 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
                 settings.GITHUB_REPO_ROOT, [dirpath],
                 load_error_modules=False,
                 static_content_store=contentstore(),
-                target_id=courselike_key
+                target_id=courselike_key,
+                status=self.status,
             )
 
         new_location = courselike_items[0].location
@@ -523,7 +534,8 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
             shutil.rmtree(course_dir)
             LOGGER.info(u'Course import %s: Temp data cleared', courselike_key)
 
-        if self.status.state == u'Updating' and is_course:
+        # the import reports each of its stages in the status state, so anything but a failure means it completed
+        if self.status.state not in (UserTaskStatus.FAILED, UserTaskStatus.CANCELED) and is_course:
             # Reload the course so we have the latest state
             course = modulestore().get_course(courselike_key)
             if course.entrance_exam_enabled:
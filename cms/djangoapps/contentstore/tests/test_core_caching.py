@@ -2,10 +2,15 @@
 Tests core caching facilities.
 """
 
+from datetime import datetime
+
 from django.test import TestCase
 from opaque_keys.edx.locations import Location
 
-from openedx.core.djangoapps.contentserver.caching import del_cached_content, get_cached_content, set_cached_content
+from openedx.core.djangoapps.contentserver.caching import (
+    MISSING_ASSET, del_cached_content, get_cached_content, get_cached_metadata, set_cached_content,
+    set_cached_metadata, set_cached_missing
+)
 
 
 class Content(object):
@@ -15,6 +20,11 @@ class Content(object):
     def __init__(self, location, content):
         self.location = location
         self.content = content
+        self.content_type = 'image/jpeg'
+        self.length = len(content)
+        self.content_digest = 'digest'
+        self.locked = True
+        self.last_modified_at = datetime(2017, 1, 1)
 
     def get_id(self):
         return self.location.to_deprecated_son()
@@ -43,3 +53,24 @@ class CachingTestCase(TestCase):
                          'should not be stored in cache with unicodeLocation')
         self.assertEqual(None, get_cached_content(self.nonUnicodeLocation),
                          'should not be stored in cache with nonUnicodeLocation')
+
+    def test_metadata(self):
+        set_cached_metadata(self.mockAsset)
+        metadata = get_cached_metadata(self.nonUnicodeLocation)
+        self.assertFalse(hasattr(metadata, 'content'), 'should not store the data of the content')
+        self.assertEqual(
+            (metadata.content_type, metadata.length, metadata.content_digest, metadata.locked),
+            ('image/jpeg', len('my content'), 'digest', True)
+        )
+        self.assertEqual(metadata.last_modified_at, self.mockAsset.last_modified_at)
+
+    def test_delete_metadata(self):
+        set_cached_metadata(self.mockAsset)
+        del_cached_content(self.unicodeLocation)
+        self.assertIsNone(get_cached_metadata(self.unicodeLocation))
+
+    def test_missing(self):
+        set_cached_missing(self.unicodeLocation, 60)
+        self.assertEqual(get_cached_metadata(self.nonUnicodeLocation), MISSING_ASSET)
+        del_cached_content(self.unicodeLocation)
+        self.assertIsNone(get_cached_metadata(self.unicodeLocation))
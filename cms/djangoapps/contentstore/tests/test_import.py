@@ -11,7 +11,7 @@ import ddt
 from django.conf import settings
 from django.test.client import Client
 from django.test.utils import override_settings
-from mock import patch
+from mock import Mock, patch
 
 from openedx.core.djangoapps.content.course_structures.tests import SignalDisconnectTestMixin
 from xmodule.contentstore.django import contentstore
@@ -171,6 +171,24 @@ class ContentStoreImportTest(SignalDisconnectTestMixin, ModuleStoreTestCase):
         handouts = module_store.get_item(course_key.make_usage_key('html', 'toyhtml'))
         self.assertIn('/static/', handouts.data)
 
+    def test_import_stages_reported(self):
+        status = Mock()
+        courses = import_course_from_xml(
+            modulestore(), self.user.id, TEST_DATA_DIR, ['toy'], do_import_static=False,
+            create_if_not_present=True, status=status,
+        )
+        stages = [call[0][0] for call in status.set_state.call_args_list]
+        chapters = len(courses[0].children)
+        self.assertEqual(
+            stages[:3],
+            [u'Importing course', u'Importing static content', u'Importing asset metadata'],
+        )
+        self.assertEqual(
+            stages[3:3 + chapters],
+            [u'Importing blocks ({} of {})'.format(index, chapters) for index in range(1, chapters + 1)],
+        )
+        self.assertEqual(stages[-1], u'Importing drafts')
+
     def test_tab_name_imports_correctly(self):
         _module_store, _content_store, course = self.load_test_import_course()
         print "course tabs = {0}".format(course.tabs)
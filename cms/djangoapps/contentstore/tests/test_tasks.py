@@ -5,6 +5,7 @@ from __future__ import absolute_import, division, print_function
 
 import copy
 import json
+import tarfile
 from uuid import uuid4
 
 import mock
@@ -16,11 +17,13 @@ from organizations.models import OrganizationCourse
 from organizations.tests.factories import OrganizationFactory
 from user_tasks.models import UserTaskArtifact, UserTaskStatus
 
-from contentstore.tasks import export_olx, rerun_course
+from contentstore.tasks import create_export_tarball, export_olx, rerun_course
 from contentstore.tests.test_libraries import LibraryTestCase
 from contentstore.tests.utils import CourseTestCase
 from course_action_state.models import CourseRerunState
 from openedx.core.djangoapps.embargo.models import Country, CountryAccessRule, RestrictedCourse
+from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
 
 TEST_DATA_CONTENTSTORE = copy.deepcopy(settings.CONTENTSTORE)
@@ -53,6 +56,20 @@ class ExportCourseTestCase(CourseTestCase):
         output = artifacts[0]
         self.assertEqual(output.name, 'Output')
 
+    def test_default_course_image_exported_once(self):
+        """
+        Verify that a default course image imported from its legacy location
+        is added to the export tarball only once
+        """
+        contentstore().save(StaticContent(
+            StaticContent.compute_location(self.course.id, self.course.course_image),
+            u'course_image.jpg', u'image/jpeg', b'image data', import_path=u'images/course_image.jpg',
+        ))
+        export_file = create_export_tarball(self.course, self.course.id, {})
+        with tarfile.open(export_file.name) as archive:
+            names = archive.getnames()
+        self.assertEqual(names.count(u'{}/static/images/course_image.jpg'.format(self.course.url_name)), 1)
+
     @mock.patch('contentstore.tasks.export_course_to_xml', side_effect=side_effect_exception)
     def test_exception(self, mock_export):  # pylint: disable=unused-argument
         """
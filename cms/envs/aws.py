@@ -366,6 +366,18 @@ XBLOCK_FIELD_DATA_WRAPPERS = ENV_TOKENS.get(
 
 CONTENTSTORE = AUTH_TOKENS['CONTENTSTORE']
 DOC_STORE_CONFIG = AUTH_TOKENS['DOC_STORE_CONFIG']
+COURSE_STRUCTURE_CACHE_LRU_SIZE = ENV_TOKENS.get('COURSE_STRUCTURE_CACHE_LRU_SIZE', COURSE_STRUCTURE_CACHE_LRU_SIZE)
+COURSE_ASSETS_CACHE_MAX_BODY_SIZE = ENV_TOKENS.get(
+    'COURSE_ASSETS_CACHE_MAX_BODY_SIZE', COURSE_ASSETS_CACHE_MAX_BODY_SIZE
+)
+COURSE_ASSETS_CACHE_MISSING_TIMEOUT = ENV_TOKENS.get(
+    'COURSE_ASSETS_CACHE_MISSING_TIMEOUT', COURSE_ASSETS_CACHE_MISSING_TIMEOUT
+)
+COURSE_OVERVIEW_CACHE_TIMEOUT = ENV_TOKENS.get('COURSE_OVERVIEW_CACHE_TIMEOUT', COURSE_OVERVIEW_CACHE_TIMEOUT)
+COURSE_OVERVIEW_CACHE_LRU_SIZE = ENV_TOKENS.get('COURSE_OVERVIEW_CACHE_LRU_SIZE', COURSE_OVERVIEW_CACHE_LRU_SIZE)
+COURSE_OVERVIEW_CACHE_LRU_TIMEOUT = ENV_TOKENS.get(
+    'COURSE_OVERVIEW_CACHE_LRU_TIMEOUT', COURSE_OVERVIEW_CACHE_LRU_TIMEOUT
+)
 # Datadog for events!
 DATADOG = AUTH_TOKENS.get("DATADOG", {})
 DATADOG.update(ENV_TOKENS.get("DATADOG", {}))
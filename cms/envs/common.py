@@ -438,6 +438,7 @@ MIDDLEWARE_CLASSES = [
     'django.middleware.locale.LocaleMiddleware',
 
     'codejail.django_integration.ConfigureCodeJailMiddleware',
+    'util.sandboxing.ConfigureCodeJailPoolMiddleware',
 
     # catches any uncaught RateLimitExceptions and returns a 403 instead of a 500
     'ratelimitbackend.middleware.RateLimitMiddleware',
@@ -488,6 +489,29 @@ XBLOCK_FIELD_DATA_WRAPPERS = ()
 ############################ Modulestore Configuration ################################
 MODULESTORE_BRANCH = 'draft-preferred'
 
+# Capacity, in serialized bytes, of the per-process LRU cache of split course
+# structures that sits in front of the 'course_structure_cache'. 0 disables it.
+COURSE_STRUCTURE_CACHE_LRU_SIZE = 64 * 1024 * 1024
+
+# Course assets smaller than this many bytes are kept whole in the 'course_assets'
+# cache; larger ones are streamed from the contentstore on every request, and only
+# their metadata is cached.  0 disables caching asset data.
+COURSE_ASSETS_CACHE_MAX_BODY_SIZE = 1024 * 1024
+
+# How long, in seconds, the 'course_assets' cache remembers that an asset doesn't exist.
+COURSE_ASSETS_CACHE_MISSING_TIMEOUT = 60
+
+# How long, in seconds, CourseOverviews are kept in the 'default' cache.  They are
+# never read from it once they change.  0 disables caching them.
+COURSE_OVERVIEW_CACHE_TIMEOUT = 60 * 60
+
+# Number of CourseOverviews kept in the per-process LRU cache in front of the
+# 'default' cache, and how long, in seconds, each one is used.  They are never
+# used once they change, as long as the 'default' cache keeps track of their
+# versions.  0 disables the LRU cache.
+COURSE_OVERVIEW_CACHE_LRU_SIZE = 1000
+COURSE_OVERVIEW_CACHE_LRU_TIMEOUT = 60
+
 MODULESTORE = {
     'default': {
         'ENGINE': 'xmodule.modulestore.mixed.MixedModuleStore',
@@ -536,6 +560,17 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pre-warmed workers to run code in, instead of starting a new sandboxed
+    # process every time.
+    'pool': {
+        # How many workers each server process keeps for sandboxed code, and
+        # as many again for courses allowed to run unsafe code.  0 disables
+        # the pool.
+        'size': 0,
+        # Replace a worker after it has run this many pieces of code.
+        'max_executions': 100,
+    },
 }
 
 ############################ DJANGO_BUILTINS ################################
@@ -186,6 +186,13 @@ CACHES = {
     },
 }
 
+# Don't keep course structures in process memory between tests
+COURSE_STRUCTURE_CACHE_LRU_SIZE = 0
+
+# Don't keep course overviews in caches between tests
+COURSE_OVERVIEW_CACHE_TIMEOUT = 0
+COURSE_OVERVIEW_CACHE_LRU_SIZE = 0
+
 # hide ratelimit warnings while running tests
 filterwarnings('ignore', message='No request passed to the backend, unable to rate-limit')
 
@@ -0,0 +1,109 @@
+"""
+Bulk loading of the per-course data displayed on the student dashboard.
+"""
+from collections import defaultdict
+
+from django.utils.functional import cached_property
+
+from bulk_email.models import BulkEmailFlag, CourseAuthorization  # pylint: disable=import-error
+from certificates.models import GeneratedCertificate, certificate_status  # pylint: disable=import-error
+from course_modes.models import CourseMode
+from shoppingcart.models import CourseRegistrationCode
+
+
+class DashboardData(object):
+    """
+    Loads the per-course data the dashboard displays for a user's
+    enrollments, so that rendering the dashboard takes the same number of
+    queries however many courses the user is enrolled in.
+
+    Each kind of data is loaded for all of the enrollments at once, the first
+    time it is used.
+    """
+    def __init__(self, user, course_enrollments):
+        """
+        Arguments:
+            user (User): The user whose dashboard is displayed.
+            course_enrollments (list[CourseEnrollment]): The user's
+                enrollments displayed on the dashboard.
+        """
+        self.user = user
+        self.course_ids = [enrollment.course_id for enrollment in course_enrollments]
+
+    @cached_property
+    def course_modes(self):
+        """
+        The unexpired course modes of each course, keyed by course id and
+        then by mode slug.
+        """
+        __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(self.course_ids)
+        return {
+            course_id: {
+                mode.slug: mode
+                for mode in modes
+            }
+            for course_id, modes in unexpired_course_modes.iteritems()
+        }
+
+    @cached_property
+    def certificate_statuses(self):
+        """
+        The user's certificate status in each course, as returned by
+        `certificates.models.certificate_status`, keyed by course id.
+        """
+        certificates = {
+            certificate.course_id: certificate
+            for certificate in GeneratedCertificate.objects.filter(user=self.user, course_id__in=self.course_ids)
+        }
+        return {
+            course_id: certificate_status(
+                certificates.get(course_id),
+                course_mode_slugs=self.course_modes.get(course_id, {}).keys(),
+            )
+            for course_id in self.course_ids
+        }
+
+    @cached_property
+    def email_enabled_course_ids(self):
+        """
+        The ids of the courses for which bulk email is enabled.
+        """
+        if not BulkEmailFlag.is_enabled():
+            return frozenset()
+        if not BulkEmailFlag.current().require_course_email_auth:
+            return frozenset(self.course_ids)
+        return frozenset(
+            authorization.course_id
+            for authorization in CourseAuthorization.objects.filter(course_id__in=self.course_ids, email_enabled=True)
+        )
+
+    @cached_property
+    def redeemed_registration_codes(self):
+        """
+        The registration codes the user redeemed, as lists keyed by course id.
+        """
+        redeemed_registration_codes = defaultdict(list)
+        registration_codes = CourseRegistrationCode.objects.filter(
+            course_id__in=self.course_ids,
+            registrationcoderedemption__redeemed_by=self.user,
+        ).select_related('invoice_item__invoice')
+        for registration_code in registration_codes:
+            redeemed_registration_codes[registration_code.course_id].append(registration_code)
+        return redeemed_registration_codes
+
+    def is_paid_course(self, enrollment):
+        """
+        Returns whether the enrollment is in a paid course, like
+        `CourseEnrollment.is_paid_course`.
+        """
+        # Like `CourseMode.modes_for_course_dict`, leave out the credit modes,
+        # which aren't selectable.
+        selectable_modes = {
+            slug: mode
+            for slug, mode in self.course_modes.get(enrollment.course_id, {}).iteritems()
+            if slug not in CourseMode.CREDIT_MODES
+        }
+        return (
+            CourseMode.is_white_label(enrollment.course_id, modes_dict=selectable_modes) or
+            CourseMode.is_professional_slug(enrollment.mode)
+        )
@@ -0,0 +1,100 @@
+"""
+Tests for the bulk loading of the student dashboard data.
+"""
+import ddt
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bulk_email.models import BulkEmailFlag, CourseAuthorization  # pylint: disable=import-error
+from certificates.models import CertificateStatuses, certificate_status_for_student  # pylint: disable=import-error
+from certificates.tests.factories import GeneratedCertificateFactory  # pylint: disable=import-error
+from course_modes.tests.factories import CourseModeFactory
+from student.dashboard_data import DashboardData
+from student.models import CourseEnrollment
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+
+
+@ddt.ddt
+class DashboardDataTest(TestCase):
+    """
+    Tests for DashboardData.
+    """
+    def setUp(self):
+        super(DashboardDataTest, self).setUp()
+        self.user = UserFactory.create()
+        BulkEmailFlag.objects.create(enabled=True, require_course_email_auth=True)
+        self.addCleanup(BulkEmailFlag.objects.all().delete)
+
+    def enroll(self, count):
+        """
+        Enrolls the user in `count` new courses, with a certificate, course
+        modes and bulk email in each.
+        """
+        for __ in range(count):
+            enrollment = CourseEnrollmentFactory.create(user=self.user, mode='verified')
+            CourseModeFactory.create(course_id=enrollment.course_id, mode_slug='verified')
+            CourseModeFactory.create(course_id=enrollment.course_id, mode_slug='audit')
+            GeneratedCertificateFactory.create(
+                user=self.user,
+                course_id=enrollment.course_id,
+                status=CertificateStatuses.downloadable,
+                mode='verified',
+            )
+            CourseAuthorization.objects.create(course_id=enrollment.course_id, email_enabled=True)
+
+    def load(self, course_enrollments):
+        """
+        Loads all the dashboard data of the given enrollments.
+        """
+        dashboard_data = DashboardData(self.user, course_enrollments)
+        for enrollment in course_enrollments:
+            __ = dashboard_data.course_modes[enrollment.course_id]
+            __ = dashboard_data.certificate_statuses[enrollment.course_id]
+            __ = dashboard_data.redeemed_registration_codes[enrollment.course_id]
+            __ = enrollment.course_id in dashboard_data.email_enabled_course_ids
+            dashboard_data.is_paid_course(enrollment)
+
+    @ddt.data(2, 10)
+    def test_constant_query_count(self, enrollment_count):
+        self.enroll(1)
+        course_enrollments = list(CourseEnrollment.enrollments_for_user(self.user))
+        # Fill the configuration caches before counting queries.
+        self.load(course_enrollments)
+        with CaptureQueriesContext(connection) as queries:
+            self.load(course_enrollments)
+
+        self.enroll(enrollment_count - 1)
+        course_enrollments = list(CourseEnrollment.enrollments_for_user(self.user))
+        self.assertEqual(len(course_enrollments), enrollment_count)
+        with self.assertNumQueries(len(queries.captured_queries)):
+            self.load(course_enrollments)
+
+    def test_loaded_data(self):
+        self.enroll(2)
+        CourseAuthorization.objects.filter(course_id=CourseEnrollment.objects.first().course_id).delete()
+        course_enrollments = list(CourseEnrollment.enrollments_for_user(self.user))
+        dashboard_data = DashboardData(self.user, course_enrollments)
+
+        for enrollment in course_enrollments:
+            self.assertEqual(
+                dashboard_data.certificate_statuses[enrollment.course_id],
+                certificate_status_for_student(self.user, enrollment.course_id),
+            )
+            self.assertEqual(
+                enrollment.course_id in dashboard_data.email_enabled_course_ids,
+                BulkEmailFlag.feature_enabled(enrollment.course_id),
+            )
+            self.assertEqual(dashboard_data.is_paid_course(enrollment), enrollment.is_paid_course())
+            self.assertEqual(set(dashboard_data.course_modes[enrollment.course_id]), {'verified', 'audit'})
+            self.assertEqual(dashboard_data.redeemed_registration_codes[enrollment.course_id], [])
+
+    def test_paid_honor_course_with_credit_mode(self):
+        # A white label course stays paid when it also offers credit.
+        enrollment = CourseEnrollmentFactory.create(user=self.user, mode='honor')
+        CourseModeFactory.create(course_id=enrollment.course_id, mode_slug='honor', min_price=10)
+        CourseModeFactory.create(course_id=enrollment.course_id, mode_slug='credit')
+        dashboard_data = DashboardData(self.user, [enrollment])
+
+        self.assertTrue(enrollment.is_paid_course())
+        self.assertTrue(dashboard_data.is_paid_course(enrollment))
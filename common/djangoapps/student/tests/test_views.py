@@ -10,13 +10,19 @@ import ddt
 import pytz
 from django.conf import settings
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.http import HttpResponse
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from edx_oauth2_provider.constants import AUTHORIZED_CLIENTS_SESSION_KEY
 from edx_oauth2_provider.tests.factories import ClientFactory, TrustedClientFactory
 from mock import patch
 from pyquery import PyQuery as pq
 from opaque_keys import InvalidKeyError
 
+from certificates.models import CertificateStatuses  # pylint: disable=import-error
+from certificates.tests.factories import GeneratedCertificateFactory  # pylint: disable=import-error
+from lms.djangoapps.grades.models import PersistentCourseGrade
 from milestones.tests.utils import MilestonesTestCaseMixin
 from student.cookies import get_user_info_cookie_data
 from student.helpers import DISABLE_UNENROLL_CERT_STATES
@@ -63,6 +69,10 @@ class TestStudentDashboardUnenrollments(SharedModuleStoreTestCase):
             'show_survey_button': False
         }
 
+    def mock_dashboard_cert(self, _user, _course_overview, _cert_status, _course_mode):
+        """ Return a preset certificate status for the dashboard. """
+        return self.mock_cert(_user, _course_overview, _course_mode)
+
     @ddt.data(
         ('notpassing', 1),
         ('restricted', 1),
@@ -75,7 +85,7 @@ class TestStudentDashboardUnenrollments(SharedModuleStoreTestCase):
         """ Assert that the unenroll action is shown or not based on the cert status."""
         self.cert_status = cert_status
 
-        with patch('student.views.cert_info', side_effect=self.mock_cert):
+        with patch('student.views._cert_info', side_effect=self.mock_dashboard_cert):
             response = self.client.get(reverse('dashboard'))
 
             self.assertEqual(pq(response.content)(self.UNENROLL_ELEMENT_ID).length, unenroll_action_count)
@@ -335,3 +345,51 @@ class StudentDashboardTests(SharedModuleStoreTestCase, MilestonesTestCaseMixin):
         remove_prerequisite_course(self.course.id, get_course_milestones(self.course.id)[0])
         response = self.client.get(reverse('dashboard'))
         self.assertNotIn('<div class="prerequisites">', response.content)
+
+
+@unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+@patch('student.views.render_to_response', return_value=HttpResponse())
+class StudentDashboardQueryCountTests(TestCase):
+    """
+    Tests that the number of queries made by the student dashboard doesn't
+    grow with the number of enrollments.
+    """
+    def setUp(self):
+        super(StudentDashboardQueryCountTests, self).setUp()
+        self.user = UserFactory()
+        self.client.login(username=self.user.username, password=PASSWORD)
+        self.path = reverse('dashboard')
+
+    def enroll(self, count):
+        """
+        Enrolls the user in `count` new courses, with a certificate and a
+        persisted grade in each.
+        """
+        for __ in range(count):
+            enrollment = CourseEnrollmentFactory.create(user=self.user, mode='verified')
+            GeneratedCertificateFactory.create(
+                user=self.user,
+                course_id=enrollment.course_id,
+                status=CertificateStatuses.notpassing,
+                mode='verified',
+            )
+            PersistentCourseGrade.update_or_create(
+                user_id=self.user.id,
+                course_id=enrollment.course_id,
+                percent_grade=0.2,
+                letter_grade='',
+                passed=False,
+            )
+
+    def test_constant_query_count(self, __):
+        self.enroll(2)
+        # Fill the configuration caches before counting queries.
+        self.client.get(self.path)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+
+        self.enroll(8)
+        with self.assertNumQueries(len(queries.captured_queries)):
+            response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
@@ -52,7 +52,7 @@ import dogstats_wrapper as dog_stats_api
 import openedx.core.djangoapps.external_auth.views
 import third_party_auth
 import track.views
-from bulk_email.models import BulkEmailFlag, Optout  # pylint: disable=import-error
+from bulk_email.models import Optout  # pylint: disable=import-error
 from certificates.api import get_certificate_url, has_html_certificates_enabled  # pylint: disable=import-error
 from certificates.models import (  # pylint: disable=import-error
     CertificateStatuses,
@@ -67,6 +67,7 @@ from edxmako.shortcuts import render_to_response, render_to_string
 from eventtracking import tracker
 from lms.djangoapps.commerce.utils import EcommerceService  # pylint: disable=import-error
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification  # pylint: disable=import-error
 # Note that this lives in LMS, so this dependency should be refactored.
 from notification_prefs.views import enable_notifications
@@ -85,11 +86,12 @@ from openedx.core.djangoapps.site_configuration import helpers as configuration_
 from openedx.core.djangoapps.theming import helpers as theming_helpers
 from openedx.core.djangoapps.user_api.preferences import api as preferences_api
 from openedx.core.djangolib.markup import HTML
-from openedx.features.course_experience import course_home_url_name
+from openedx.features.course_experience import COURSE_PRE_START_ACCESS_FLAG, course_home_url_name
 from openedx.features.enterprise_support.api import get_dashboard_consent_notification
 from shoppingcart.api import order_history
-from shoppingcart.models import CourseRegistrationCode, DonationConfiguration
+from shoppingcart.models import DonationConfiguration
 from student.cookies import delete_logged_in_cookies, set_logged_in_cookies, set_user_info_cookie
+from student.dashboard_data import DashboardData
 from student.forms import AccountCreationForm, PasswordResetFormNoActive, get_registration_extension_form
 from student.helpers import (
     DISABLE_UNENROLL_CERT_STATES,
@@ -683,16 +685,10 @@ def dashboard(request):
     # sort the enrollment pairs by the enrollment date
     course_enrollments.sort(key=lambda x: x.created, reverse=True)
 
-    # Retrieve the course modes for each course
-    enrolled_course_ids = [enrollment.course_id for enrollment in course_enrollments]
-    __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(enrolled_course_ids)
-    course_modes_by_course = {
-        course_id: {
-            mode.slug: mode
-            for mode in modes
-        }
-        for course_id, modes in unexpired_course_modes.iteritems()
-    }
+    # Load the per-course data for all the enrollments at once, so that the
+    # number of queries doesn't grow with the number of enrollments.
+    dashboard_data = DashboardData(user, course_enrollments)
+    course_modes_by_course = dashboard_data.course_modes
 
     # Check to see if the student has recently enrolled in a course.
     # If so, display a notification message confirming the enrollment.
@@ -741,6 +737,11 @@ def dashboard(request):
         staff_access = True
         errored_courses = modulestore().get_errored_courses()
 
+    # has_access checks this flag for each course, so read all of its course
+    # overrides at once.
+    COURSE_PRE_START_ACCESS_FLAG.prefetch_course_overrides(
+        [enrollment.course_id for enrollment in course_enrollments]
+    )
     show_courseware_links_for = frozenset(
         enrollment.course_id for enrollment in course_enrollments
         if has_access(request.user, 'load', enrollment.course_overview)
@@ -778,16 +779,33 @@ def dashboard(request):
     # If a course is not included in this dictionary,
     # there is no verification messaging to display.
     verify_status_by_course = check_verify_status_by_course(user, course_enrollments)
-    cert_statuses = {
-        enrollment.course_id: cert_info(request.user, enrollment.course_overview, enrollment.mode)
-        for enrollment in course_enrollments
-    }
+
+    # _cert_info reads the persisted grade of the courses the user has a
+    # certificate in, so read all of those grades at once.
+    graded_course_ids = [
+        course_id for course_id, cert_status in dashboard_data.certificate_statuses.iteritems()
+        if cert_status['status'] != CertificateStatuses.unavailable
+    ]
+    if graded_course_ids:
+        PersistentCourseGrade.prefetch_for_courses(user, graded_course_ids)
+    try:
+        cert_statuses = {
+            enrollment.course_id: _cert_info(
+                request.user,
+                enrollment.course_overview,
+                dashboard_data.certificate_statuses[enrollment.course_id],
+                enrollment.mode
+            )
+            for enrollment in course_enrollments
+        }
+    finally:
+        for course_id in graded_course_ids:
+            PersistentCourseGrade.clear_prefetched_data(course_id)
 
     # only show email settings for Mongo course and when bulk email is turned on
     show_email_settings_for = frozenset(
-        enrollment.course_id for enrollment in course_enrollments if (
-            BulkEmailFlag.feature_enabled(enrollment.course_id)
-        )
+        enrollment.course_id for enrollment in course_enrollments
+        if enrollment.course_id in dashboard_data.email_enabled_course_ids
     )
 
     # Verification Attempts
@@ -803,17 +821,14 @@ def dashboard(request):
         enrollment.course_id for enrollment in course_enrollments
         if is_course_blocked(
             request,
-            CourseRegistrationCode.objects.filter(
-                course_id=enrollment.course_id,
-                registrationcoderedemption__redeemed_by=request.user
-            ),
+            dashboard_data.redeemed_registration_codes[enrollment.course_id],
             enrollment.course_id
         )
     )
 
     enrolled_courses_either_paid = frozenset(
         enrollment.course_id for enrollment in course_enrollments
-        if enrollment.is_paid_course()
+        if dashboard_data.is_paid_course(enrollment)
     )
 
     # If there are *any* denied reverifications that have not been toggled off,
@@ -1,6 +1,10 @@
 import re
 
+from celery.signals import worker_process_init
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from capa.safe_exec import configure_pool
 
 # We'll make assets named this be importable by Python code in the sandbox.
 PYTHON_LIB_ZIP = "python_lib.zip"
@@ -39,3 +43,32 @@ def get_python_lib_zip(contentstore, course_id):
         return zip_lib.data
     else:
         return None
+
+
+def configure_code_jail_pool():
+    """
+    Configure the pool of pre-warmed workers used to run capa's Python code,
+    from the 'pool' entry of the CODE_JAIL setting.
+    """
+    configure_pool(**getattr(settings, 'CODE_JAIL', {}).get('pool', {}))
+
+
+@worker_process_init.connect
+def configure_code_jail_pool_for_celery(**kwargs):  # pylint: disable=unused-argument
+    """
+    Configure the pool in each Celery worker process, which don't load the
+    middleware, so that tasks such as rescoring use it too.
+    """
+    configure_code_jail_pool()
+
+
+class ConfigureCodeJailPoolMiddleware(object):
+    """
+    Configure the pool of pre-warmed workers for web server processes.
+
+    Like codejail's own ConfigureCodeJailMiddleware, this only does its work
+    when it's loaded, and then removes itself from the middleware stack.
+    """
+    def __init__(self):
+        configure_code_jail_pool()
+        raise MiddlewareNotUsed
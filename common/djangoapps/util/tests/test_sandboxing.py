@@ -2,8 +2,10 @@
 Tests for sandboxing.py in util app
 """
 
+from celery.signals import worker_process_init
 from django.test import TestCase
 from django.test.utils import override_settings
+from mock import patch
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
 
@@ -38,3 +40,14 @@ class SandboxingTest(TestCase):
         self.assertFalse(can_execute_unsafe_code(CourseLocator('edX', 'full', '2012_Fall')))
         self.assertFalse(can_execute_unsafe_code(CourseLocator('edX', 'full', '2013_Spring')))
         self.assertFalse(can_execute_unsafe_code(LibraryLocator('edX', 'test_bank')))
+
+
+class ConfigureCodeJailPoolTest(TestCase):
+    """
+    Test that the pool of sandbox workers is configured in Celery workers
+    """
+    @override_settings(CODE_JAIL={'pool': {'size': 2, 'max_executions': 10}})
+    @patch('util.sandboxing.configure_pool')
+    def test_configured_on_worker_process_init(self, mock_configure_pool):
+        worker_process_init.send(sender=None)
+        mock_configure_pool.assert_called_once_with(size=2, max_executions=10)
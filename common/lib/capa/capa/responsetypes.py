@@ -2090,6 +2090,7 @@ class CustomResponse(LoncapaResponse):
                            'designprotein2dinput', 'editageneinput',
                            'annotationinput', 'jsinput', 'formulaequationinput']
     code = None
+    code_digest = None
     expect = None
 
     # Standard amount for partial credit if not otherwise specified:
@@ -2164,6 +2165,9 @@ class CustomResponse(LoncapaResponse):
                 else:
                     self.code = answer.text
 
+        if isinstance(self.code, basestring):
+            self.code_digest = safe_exec.digest_code(self.code)
+
     def get_score(self, student_answers):
         """
         student_answers is a dict with everything from request.POST, but with the first part
@@ -2296,6 +2300,7 @@ class CustomResponse(LoncapaResponse):
                     slug=self.id,
                     random_seed=self.context['seed'],
                     unsafely=self.capa_system.can_execute_unsafe_code(),
+                    code_digest=self.code_digest,
                 )
             except Exception as err:  # pylint: disable=broad-except
                 self._handle_exec_exception(err)
@@ -3263,6 +3268,7 @@ class SchematicResponse(LoncapaResponse):
             self.code = self.capa_system.filestore.open('src/' + answer_src).read()
         else:
             self.code = answer.text
+        self.code_digest = safe_exec.digest_code(self.code)
 
     def get_score(self, student_answers):
         submission = [
@@ -3279,6 +3285,7 @@ class SchematicResponse(LoncapaResponse):
                 slug=self.id,
                 random_seed=self.context['seed'],
                 unsafely=self.capa_system.can_execute_unsafe_code(),
+                code_digest=self.code_digest,
             )
         except Exception as err:
             _ = self.capa_system.i18n.ugettext
@@ -0,0 +1,348 @@
+"""
+A pool of long-lived, pre-warmed workers for running capa's Python code.
+
+Starting a sandboxed interpreter and importing numpy and friends dominates the
+cost of most ``safe_exec`` calls.  When a pool is configured, ``safe_exec``
+hands the code to an idle worker instead: a sandboxed interpreter that has
+already imported the common modules and forks a fresh child for every
+execution (see pool_worker.py).  Workers are replaced after a number of
+executions, or when they grow past a memory limit.
+
+The same pool runs code for courses allowed to execute unsafe code, using the
+platform's own interpreter instead of the sandboxed one, which also makes the
+pool usable in development without an AppArmor setup.
+"""
+import base64
+import json
+import logging
+import os
+import select
+import subprocess
+import sys
+import threading
+import time
+from Queue import Empty, Queue
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+from dogapi import dog_stats_api
+
+from . import pool_worker
+
+log = logging.getLogger(__name__)
+
+# The worker's source is run with -c, so the sandbox doesn't need to be able
+# to read the platform's files.
+pool_worker_py_file = pool_worker.__file__
+if pool_worker_py_file.endswith("c"):
+    pool_worker_py_file = pool_worker_py_file[:-1]
+
+WORKER_SOURCE = open(pool_worker_py_file).read()
+
+# How long to wait for a worker to answer, on top of the code's own time limit.
+RESPONSE_GRACE_SECONDS = 5
+
+# How long to wait for a worker to import its modules and report it's ready.
+STARTUP_TIMEOUT_SECONDS = 30
+
+METRIC_PREFIX = 'capa.safe_exec.pool'
+
+_POOL_CONFIG = {
+    'size': 0,
+    'max_executions': 100,
+    'preload': [],
+}
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+class WorkerError(Exception):
+    """
+    Raised when a worker can't be started or stops answering.
+    """
+    pass
+
+
+def configure(size=0, max_executions=100, preload=()):
+    """
+    Configure the worker pools.
+
+    `size` is the number of workers kept per process for each of the safe and
+    unsafe pools; 0 disables pooling.  A worker is replaced once it has run
+    `max_executions` pieces of code.  `preload` names the modules each
+    worker imports when it starts.
+    """
+    with _POOLS_LOCK:
+        _POOL_CONFIG.update(size=size, max_executions=max_executions, preload=list(preload))
+        for pool in _POOLS.values():
+            pool.close()
+        _POOLS.clear()
+
+
+def get_pool(unsafely):
+    """
+    Return the pool for running code safely or unsafely, or None if code
+    shouldn't be run in a pool.
+    """
+    if not _POOL_CONFIG['size']:
+        return None
+    if not unsafely and not jail_code.is_configured('python'):
+        # Let codejail decide what to do without a sandbox.
+        return None
+    with _POOLS_LOCK:
+        pool = _POOLS.get(unsafely)
+        if pool is None:
+            if unsafely:
+                command = [sys.executable, '-E', '-B']
+            else:
+                python = jail_code.COMMANDS['python']
+                command = list(python['cmdline_start'])
+                if python['user']:
+                    command = ['sudo', '-u', python['user']] + command
+            pool = _POOLS[unsafely] = WorkerPool(
+                command + ['-c', WORKER_SOURCE], sandboxed=not unsafely, **_POOL_CONFIG
+            )
+            pool.warm()
+        return pool
+
+
+def _read_files(path):
+    """
+    Return (name, contents) pairs for the file or directory tree at path,
+    named relative to its parent directory.
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(path):
+        paths = [path]
+    else:
+        paths = [
+            os.path.join(dirpath, filename)
+            for dirpath, __, filenames in os.walk(path)
+            for filename in filenames
+        ]
+    files = []
+    for file_path in paths:
+        with open(file_path, 'rb') as source:
+            files.append((os.path.relpath(os.path.abspath(file_path), parent), source.read()))
+    return files
+
+
+class Worker(object):
+    """
+    A running worker process and the pipes to talk to it.
+    """
+    def __init__(self, command, preload):
+        self.executions = 0
+        self._buffer = ''
+        try:
+            self.process = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, close_fds=True,
+            )
+        except OSError as err:
+            raise WorkerError("Couldn't start worker: {}".format(err))
+        try:
+            self._send({'preload': preload})
+            self._receive(time.time() + STARTUP_TIMEOUT_SECONDS)
+        except WorkerError:
+            self.kill()
+            raise
+
+    def execute(self, request, timeout):
+        """
+        Run a request and return the worker's response.
+        """
+        self._send(request)
+        response = self._receive(time.time() + timeout)
+        self.executions += 1
+        return response
+
+    def kill(self):
+        """
+        Stop the worker process.
+        """
+        if self.process.poll() is None:
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+        self.process.wait()
+
+    def _send(self, message):
+        """
+        Write a message to the worker.
+        """
+        try:
+            self.process.stdin.write(json.dumps(message) + '\n')
+            self.process.stdin.flush()
+        except (IOError, OSError) as err:
+            raise WorkerError("Couldn't send to worker: {}".format(err))
+
+    def _receive(self, deadline):
+        """
+        Read a message from the worker, waiting until deadline at most.
+        """
+        stdout = self.process.stdout.fileno()
+        while '\n' not in self._buffer:
+            readable, __, __ = select.select([stdout], [], [], max(deadline - time.time(), 0))
+            if not readable:
+                raise WorkerError("Worker didn't answer in time")
+            chunk = os.read(stdout, 65536)
+            if not chunk:
+                raise WorkerError("Worker exited with status {}".format(self.process.wait()))
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split('\n', 1)
+        return json.loads(line)
+
+
+class WorkerPool(object):
+    """
+    A bounded pool of workers, all started from the same command.
+
+    Workers of a `sandboxed` pool run code under codejail's resource limits.
+    """
+    def __init__(self, command, sandboxed, size, max_executions, preload):
+        self.command = command
+        self.sandboxed = sandboxed
+        self.size = size
+        self.max_executions = max_executions
+        self.preload = preload
+        self._idle = Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """
+        Start workers until the pool is full.
+        """
+        while True:
+            with self._lock:
+                if self._started >= self.size:
+                    return
+                self._started += 1
+            try:
+                self._idle.put(self._start_worker())
+            except WorkerError:
+                log.exception("Couldn't start sandbox worker")
+                return
+
+    def close(self):
+        """
+        Stop all the idle workers.  Busy workers are stopped when they're returned.
+        """
+        with self._lock:
+            self.size = 0
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except Empty:
+                return
+            self._discard(worker)
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Execute code with globals_dict as its globals, like codejail's safe_exec.
+
+        The JSON-safe values of globals_dict are passed in, and globals_dict
+        is updated with the JSON-safe globals left after running the code.
+        Raises SafeExecException if the code raised an exception or couldn't
+        be run.
+        """
+        # As with codejail, python_path entries that aren't extra files are
+        # copied into the sandbox, and found there by their base names.
+        extra_files = list(extra_files or [])
+        extra_names = set(name for name, __ in extra_files)
+        for pydir in python_path or []:
+            if os.path.basename(pydir) not in extra_names:
+                extra_files.extend(_read_files(pydir))
+        request = {
+            'code': code,
+            'globals': json_safe(globals_dict),
+            'python_path': [os.path.basename(pydir) for pydir in python_path or []],
+            'extra_files': [[name, base64.b64encode(contents)] for name, contents in extra_files],
+            # As codejail does, sandboxed code may not start other processes.
+            'limits': dict(jail_code.LIMITS, NPROC=0) if self.sandboxed else {},
+        }
+        timeout = (request['limits'].get('REALTIME') or STARTUP_TIMEOUT_SECONDS) + RESPONSE_GRACE_SECONDS
+
+        start = time.time()
+        worker = self._checkout()
+        dog_stats_api.histogram(METRIC_PREFIX + '.queue_wait', time.time() - start)
+
+        start = time.time()
+        try:
+            response = worker.execute(request, timeout)
+        except WorkerError as err:
+            log.warning("Sandbox worker failed running %s: %s", slug, err)
+            self._discard(worker, 'failed')
+            raise SafeExecException("Couldn't execute jailed code: {}".format(err))
+        else:
+            self._checkin(worker)
+        finally:
+            dog_stats_api.histogram(METRIC_PREFIX + '.execution_time', time.time() - start)
+
+        if response['error']:
+            raise SafeExecException("Couldn't execute jailed code: {}".format(response['error']))
+        globals_dict.update(response['globals'])
+
+    def _start_worker(self):
+        """
+        Start a new worker, giving back its slot in the pool if that fails.
+        """
+        try:
+            return Worker(self.command, self.preload)
+        except WorkerError:
+            with self._lock:
+                self._started -= 1
+            raise
+
+    def _checkout(self):
+        """
+        Return an idle worker, starting one if the pool isn't full, or
+        waiting for one otherwise.
+        """
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except Empty:
+                pass
+            with self._lock:
+                start = self._started < self.size
+                if start:
+                    self._started += 1
+            if start:
+                try:
+                    return self._start_worker()
+                except WorkerError as err:
+                    raise SafeExecException("Couldn't start sandbox worker: {}".format(err))
+            # Wake up now and then, in case a slot was freed by a worker
+            # being discarded rather than returned.
+            try:
+                return self._idle.get(timeout=1)
+            except Empty:
+                pass
+
+    def _checkin(self, worker):
+        """
+        Return a worker to the pool, replacing it if it's worn out.
+        """
+        if not self.size:
+            self._discard(worker)
+        elif worker.executions >= self.max_executions:
+            self._discard(worker, 'executions')
+        else:
+            self._idle.put(worker)
+
+    def _discard(self, worker, reason=None):
+        """
+        Stop a worker and free its slot in the pool.
+        """
+        worker.kill()
+        with self._lock:
+            self._started -= 1
+        if reason:
+            dog_stats_api.increment(METRIC_PREFIX + '.recycle', tags=['reason:{}'.format(reason)])
+            # Start the replacement in the background, so that it's warm by
+            # the time it's needed.
+            replacement = threading.Thread(target=self.warm)
+            replacement.daemon = True
+            replacement.start()
@@ -0,0 +1,243 @@
+"""
+A long-lived sandbox worker for the safe_exec pool.
+
+This file is not imported by the platform: its source is run by the sandboxed
+Python interpreter (see pool.py), so it may only use the standard library.
+
+The worker reads one JSON request per line from stdin and writes one JSON
+response per line to stdout.  The first request is an init request naming the
+modules to import up front.  The worker then stays a pristine template: for
+every execution request, it forks a handler process as soon as it has read the
+request's line, and drops the line before reading the next one.  The handler
+parses the request, runs the code in a child process of its own, writes the
+response and exits.  So neither the code nor anything it leaves behind, nor
+any request or response, is ever visible to the code of another request::
+
+    request:  {"code": ..., "globals": {...}, "python_path": [...],
+               "extra_files": [[name, base64 contents], ...], "limits": {...}}
+    response: {"globals": {...}, "error": null or message}
+
+"globals" follows the codejail contract: the JSON-safe globals are sent in,
+and the JSON-safe globals left after running the code are sent back.
+"""
+import base64
+import errno
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+# Exit status of a child that ran the code to completion, whether or not the
+# code raised: anything else means the child was killed.
+CHILD_DONE = 0
+
+# Exit status of a handler that wrote the response to its request.
+HANDLER_DONE = 0
+
+RLIMITS = {
+    'CPU': resource.RLIMIT_CPU,
+    'VMEM': resource.RLIMIT_AS,
+    'FSIZE': resource.RLIMIT_FSIZE,
+    'NPROC': resource.RLIMIT_NPROC,
+}
+
+# As in codejail, 0 means no limit for these; for the others, 0 is a limit
+# (e.g. FSIZE 0: nothing can be written, NPROC 0: nothing can be forked).
+ZERO_MEANS_UNLIMITED = ('CPU', 'VMEM')
+
+# How often to check whether the child has exited while waiting for its result.
+POLL_SECONDS = 0.1
+
+
+def jsonable(value):
+    """
+    Return whether value survives a JSON round trip.
+    """
+    try:
+        json.dumps(value)
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+def run_code(request):
+    """
+    Run the requested code and return the response.  Only called in a child.
+    """
+    globals_dict = request['globals']
+    try:
+        for pydir in request['python_path']:
+            sys.path.append(os.path.abspath(pydir))
+        exec request['code'] in globals_dict  # pylint: disable=exec-used
+    except Exception:  # pylint: disable=broad-except
+        return {'error': traceback.format_exc()}
+    return {
+        'error': None,
+        'globals': dict(
+            (name, value) for name, value in globals_dict.iteritems()
+            if name != '__builtins__' and jsonable(value)
+        ),
+    }
+
+
+def child_main(request, result_fd):
+    """
+    Set up the forked child for the request, run it and write its result.
+    """
+    # Anything the code prints must not end up on the worker's protocol stream.
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for stream_fd in (0, 1, 2):
+        os.dup2(devnull, stream_fd)
+
+    for name, value in request['limits'].items():
+        if name not in RLIMITS or value is None:
+            continue
+        if value == 0 and name in ZERO_MEANS_UNLIMITED:
+            continue
+        resource.setrlimit(RLIMITS[name], (value, value))
+
+    os.chdir(request['tmpdir'])
+    result = run_code(request)
+    with os.fdopen(result_fd, 'w') as result_file:
+        result_file.write(json.dumps(result))
+
+
+def kill_group(pid):
+    """
+    Kill the child's process group: the child and anything it started.
+    """
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError as err:
+        if err.errno != errno.ESRCH:
+            raise
+
+
+def execute(request):
+    """
+    Fork a child to run the request and return its response.
+    """
+    tmpdir = tempfile.mkdtemp(prefix='codejail-')
+    try:
+        for name, contents in request.pop('extra_files'):
+            path = os.path.join(tmpdir, name)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'wb') as extra_file:
+                extra_file.write(base64.b64decode(contents))
+        request['tmpdir'] = tmpdir
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                # Lead a new process group, so that anything the code starts
+                # can be killed along with it.
+                os.setsid()
+                child_main(request, write_fd)
+            finally:
+                os._exit(CHILD_DONE)  # pylint: disable=protected-access
+        os.close(write_fd)
+
+        realtime = request['limits'].get('REALTIME') or None
+        deadline = time.time() + realtime if realtime else None
+        chunks = []
+        exited = False
+        while True:
+            timeout = POLL_SECONDS
+            if deadline:
+                timeout = min(max(deadline - time.time(), 0), timeout)
+            readable, __, __ = select.select([read_fd], [], [], timeout)
+            if readable:
+                chunk = os.read(read_fd, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            elif exited:
+                # The child is gone and everything it wrote has been read; a
+                # process it started may still hold the pipe open.
+                break
+            elif deadline and time.time() >= deadline:
+                kill_group(pid)
+                os.kill(pid, signal.SIGKILL)
+                break
+            else:
+                waited_pid, status = os.waitpid(pid, os.WNOHANG)
+                exited = waited_pid == pid
+                if exited:
+                    # Stop anything the child left behind, which closes the pipe.
+                    kill_group(pid)
+        os.close(read_fd)
+        if not exited:
+            __, status = os.waitpid(pid, 0)
+        kill_group(pid)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    if os.WIFEXITED(status) and os.WEXITSTATUS(status) == CHILD_DONE and chunks:
+        return json.loads(''.join(chunks))
+    if os.WIFSIGNALED(status):
+        return {'error': 'Code was killed by signal {}'.format(os.WTERMSIG(status))}
+    return {'error': 'Code exited with status {}'.format(os.WEXITSTATUS(status))}
+
+
+def write_response(response):
+    """
+    Write a response to stdout.
+    """
+    sys.stdout.write(json.dumps(response) + '\n')
+    sys.stdout.flush()
+
+
+def handle(line):
+    """
+    Run the request read from line and write its response.  Only called in a
+    handler forked from the template.
+    """
+    status = HANDLER_DONE + 1
+    try:
+        write_response(execute(json.loads(line)))
+        status = HANDLER_DONE
+    finally:
+        os._exit(status)  # pylint: disable=protected-access
+
+
+def main():
+    """
+    Serve requests until stdin is closed.
+    """
+    init = json.loads(sys.stdin.readline())
+    for module_name in init.get('preload', []):
+        try:
+            __import__(module_name)
+        except Exception:  # pylint: disable=broad-except
+            pass
+    del init
+    write_response({'ready': True})
+
+    while True:
+        # The pool sends the next request only once it has the response to
+        # this one, so stdin's buffer never holds another request's data
+        # when a handler is forked.
+        line = sys.stdin.readline()
+        if not line:
+            break
+        pid = os.fork()
+        if pid == 0:
+            handle(line)
+        # Keep nothing of the request in the template.
+        del line
+        __, status = os.waitpid(pid, 0)
+        if not (os.WIFEXITED(status) and os.WEXITSTATUS(status) == HANDLER_DONE):
+            write_response({'error': 'Worker failed to run the code'})
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,13 @@ from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
+from . import pool
 from dogapi import dog_stats_api
+from openedx.core.lib.cache_utils import LRUCache
 
 import hashlib
+import json
+import weakref
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -49,6 +53,37 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# Results whose JSON is bigger than this many bytes aren't cached, so that
+# code leaving large values in its globals doesn't fill the cache.
+MAX_CACHED_RESULT_SIZE = 256 * 1024
+
+# Results are also kept in process, in front of each cache passed to
+# safe_exec, up to this many bytes of JSON per cache.
+LOCAL_CACHE_SIZE = 16 * 1024 * 1024
+
+# Version of the cache keys and entries.  Change it whenever either changes,
+# so that servers running different versions never read each other's entries.
+CACHE_KEY_VERSION = 2
+
+CACHE_METRIC_NAME = 'capa.safe_exec.cache'
+
+# The in-process tier, keyed by the cache it stands in front of, so that
+# results stored through one cache are never served to callers of another.
+_LOCAL_CACHES = weakref.WeakKeyDictionary()
+
+
+def configure_pool(size=0, max_executions=100):
+    """
+    Run code in pools of `size` pre-warmed workers per process (0 disables
+    pooling).  See `pool.configure` for the other arguments.  The workers
+    import the modules in ASSUMED_IMPORTS when they start.
+    """
+    pool.configure(
+        size=size,
+        max_executions=max_executions,
+        preload=[modname for __, modname in ASSUMED_IMPORTS],
+    )
+
 
 def update_hash(hasher, obj):
     """
@@ -73,6 +108,83 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def digest_code(code):
+    """
+    Return the digest that identifies `code` in safe_exec's cache keys.
+
+    Callers running the same code many times can compute it once, and pass
+    it to safe_exec as `code_digest`.
+    """
+    return hashlib.md5(repr(code)).hexdigest()
+
+
+def _get_local_cache(cache):
+    """
+    Return the in-process LRUCache in front of `cache`, or None if `cache`
+    can't have one.
+    """
+    try:
+        local_cache = _LOCAL_CACHES.get(cache)
+        if local_cache is None:
+            local_cache = _LOCAL_CACHES.setdefault(cache, LRUCache(LOCAL_CACHE_SIZE))
+    except TypeError:
+        # `cache` can't be weakly referenced.
+        return None
+    return local_cache
+
+
+def _get_cached_result(cache, key):
+    """
+    Return the (exception message, globals) pair cached under key, looking
+    in process first and then in `cache`, or None.
+    """
+    local_cache = _get_local_cache(cache)
+    cached = local_cache.get(key) if local_cache is not None else None
+    if cached is not None:
+        dog_stats_api.increment(CACHE_METRIC_NAME, tags=[u'tier:local', u'result:hit'])
+        return json.loads(cached)
+
+    cached = cache.get(key)
+    if cached is None:
+        dog_stats_api.increment(CACHE_METRIC_NAME, tags=[u'tier:shared', u'result:miss'])
+    else:
+        dog_stats_api.increment(CACHE_METRIC_NAME, tags=[u'tier:shared', u'result:hit'])
+        _set_local_result(cache, key, cached)
+    return cached
+
+
+def _set_cached_result(cache, key, emsg, cleaned_results):
+    """
+    Cache the outcome of running code, unless it's too big.
+    """
+    result = (emsg, cleaned_results)
+    size = _set_local_result(cache, key, result)
+    if size > MAX_CACHED_RESULT_SIZE:
+        dog_stats_api.increment(CACHE_METRIC_NAME + '.too_large')
+        return
+    dog_stats_api.histogram(CACHE_METRIC_NAME + '.bytes', size)
+    cache.set(key, result)
+
+
+def _set_local_result(cache, key, result):
+    """
+    Keep result in process, in front of `cache`, as JSON so that callers
+    can't change it, if it isn't too big.  Returns the size of its JSON.
+    """
+    serialized = json.dumps(result)
+    local_cache = _get_local_cache(cache)
+    if local_cache is not None and len(serialized) <= MAX_CACHED_RESULT_SIZE:
+        local_cache.set(key, serialized, size=len(serialized))
+    return len(serialized)
+
+
+def clear_local_cache():
+    """
+    Forget the results cached in process.
+    """
+    _LOCAL_CACHES.clear()
+
+
 @dog_stats_api.timed('capa.safe_exec.time')
 def safe_exec(
     code,
@@ -83,6 +195,7 @@ def safe_exec(
     cache=None,
     slug=None,
     unsafely=False,
+    code_digest=None,
 ):
     """
     Execute python code safely.
@@ -102,7 +215,10 @@ def safe_exec(
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
     to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    and the random seed.  Results are also cached in process, in front of `cache`;
+    they are only ever served to callers passing that same `cache` object.
+
+    `code_digest`, if given, is `digest_code(code)`, computed in advance.
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
@@ -114,24 +230,27 @@ def safe_exec(
     if cache:
         safe_globals = json_safe(globals_dict)
         md5er = hashlib.md5()
-        md5er.update(repr(code))
+        md5er.update(code_digest or digest_code(code))
         update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
-        cached = cache.get(key)
+        key = "safe_exec.v%d.%r.%s" % (CACHE_KEY_VERSION, random_seed, md5er.hexdigest())
+        cached = _get_cached_result(cache, key)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
             # message, if any, else None; and the resulting globals dictionary.
             emsg, cleaned_results = cached
-            globals_dict.update(cleaned_results)
             if emsg:
                 raise SafeExecException(emsg)
+            globals_dict.update(cleaned_results)
             return
 
     # Create the complete code we'll run.
     code_prolog = CODE_PROLOG % random_seed
 
     # Decide which code executor to use.
-    if unsafely:
+    worker_pool = pool.get_pool(unsafely)
+    if worker_pool is not None:
+        exec_fn = worker_pool.safe_exec
+    elif unsafely:
         exec_fn = codejail_not_safe_exec
     else:
         exec_fn = codejail_safe_exec
@@ -150,8 +269,9 @@ def safe_exec(
     # Put the result back in the cache.  This is complicated by the fact that
     # the globals dict might not be entirely serializable.
     if cache:
-        cleaned_results = json_safe(globals_dict)
-        cache.set(key, (emsg, cleaned_results))
+        # Failures are cached without their globals, which are never used.
+        cleaned_results = None if emsg else json_safe(globals_dict)
+        _set_cached_result(cache, key, emsg, cleaned_results)
 
     # If an exception happened, raise it now.
     if emsg:
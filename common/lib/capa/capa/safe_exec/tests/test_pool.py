@@ -0,0 +1,168 @@
+"""Test pool.py"""
+
+import os
+import os.path
+import sys
+import textwrap
+import time
+import unittest
+
+from codejail.safe_exec import SafeExecException
+from mock import patch
+
+from capa.safe_exec import configure_pool, pool, safe_exec
+
+
+def make_pool(size=1, max_executions=100, sandboxed=False):
+    """
+    Return a pool of workers running the current interpreter.
+    """
+    worker_pool = pool.WorkerPool(
+        [sys.executable, '-E', '-B', '-c', pool.WORKER_SOURCE],
+        sandboxed=sandboxed,
+        size=size,
+        max_executions=max_executions,
+        preload=['math'],
+    )
+    return worker_pool
+
+
+class TestWorkerPool(unittest.TestCase):
+    """
+    Tests for WorkerPool.
+    """
+    def setUp(self):
+        super(TestWorkerPool, self).setUp()
+        self.pool = make_pool()
+        self.addCleanup(self.pool.close)
+
+    def test_globals_round_trip(self):
+        globals_dict = {'a': 17, 'b': [1, 'two'], 'unserializable': object()}
+        self.pool.safe_exec("c = a + len(b)\nimport math\nm = math", globals_dict)
+        self.assertEqual(globals_dict['c'], 19)
+        # Only JSON-safe values come back.
+        self.assertNotIn('m', globals_dict)
+
+    def test_raising_exceptions(self):
+        with self.assertRaisesRegexp(SafeExecException, 'ZeroDivisionError'):
+            self.pool.safe_exec("1/0", {})
+        # The worker is still usable afterwards.
+        globals_dict = {}
+        self.pool.safe_exec("a = 1", globals_dict)
+        self.assertEqual(globals_dict['a'], 1)
+
+    def test_executions_are_isolated(self):
+        globals_dict = {}
+        self.pool.safe_exec("import math\nmath.leaked = 1", {})
+        self.pool.safe_exec("import math\nleaked = hasattr(math, 'leaked')", globals_dict)
+        self.assertFalse(globals_dict['leaked'])
+
+    def test_previous_requests_are_unreachable(self):
+        # Lists, unlike dicts of strings, are always tracked by the garbage collector.
+        self.pool.safe_exec("secret = ['learner ' + 'one']", {'user_input': ['learner one answer']})
+        globals_dict = {}
+        self.pool.safe_exec(textwrap.dedent("""\
+            import gc
+            leaked = len([
+                obj for obj in gc.get_objects()
+                if isinstance(obj, list) and len(obj) == 1 and obj[0] in ('learner ' + 'one', 'learner one ' + 'answer')
+            ])
+            """), globals_dict)
+        self.assertEqual(globals_dict['leaked'], 0)
+
+    def test_printing_does_not_break_the_protocol(self):
+        globals_dict = {}
+        self.pool.safe_exec("print 'hello\\n'\nimport sys\nsys.stderr.write('oops')\na = 1", globals_dict)
+        self.assertEqual(globals_dict['a'], 1)
+
+    def test_extra_files(self):
+        globals_dict = {}
+        self.pool.safe_exec(
+            "b = open('data.txt').read()", globals_dict, extra_files=[('data.txt', 'some data')],
+        )
+        self.assertEqual(globals_dict['b'], 'some data')
+
+    def test_python_lib(self):
+        pylib = os.path.join(os.path.dirname(__file__), "test_files/pylib")
+        globals_dict = {}
+        self.pool.safe_exec(
+            "import constant\na = constant.THE_CONST", globals_dict, python_path=[pylib],
+        )
+        self.assertEqual(globals_dict['a'], 23)
+
+    def test_recycled_after_max_executions(self):
+        worker_pool = make_pool(max_executions=2)
+        self.addCleanup(worker_pool.close)
+        pids = []
+        for __ in range(3):
+            globals_dict = {}
+            # The code runs in a child of a handler forked from the worker.
+            worker_pool.safe_exec(
+                "import os\nworker_pid = int(open('/proc/%d/stat' % os.getppid()).read().split()[3])", globals_dict,
+            )
+            pids.append(globals_dict['worker_pid'])
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+
+    def test_time_limit(self):
+        worker_pool = make_pool(sandboxed=True)
+        self.addCleanup(worker_pool.close)
+        with patch.dict(pool.jail_code.LIMITS, {'REALTIME': 1, 'CPU': 0, 'VMEM': 0, 'FSIZE': 0}):
+            with self.assertRaisesRegexp(SafeExecException, 'killed'):
+                worker_pool.safe_exec("while True: pass", {})
+
+    def test_file_size_limit(self):
+        worker_pool = make_pool(sandboxed=True)
+        self.addCleanup(worker_pool.close)
+        with patch.dict(pool.jail_code.LIMITS, {'REALTIME': 5, 'CPU': 0, 'VMEM': 0, 'FSIZE': 0}):
+            with self.assertRaises(SafeExecException):
+                worker_pool.safe_exec("f = open('out.txt', 'w')\nf.write('x' * 100)\nf.close()", {})
+        # A file can be written once there is room for it.
+        globals_dict = {}
+        with patch.dict(pool.jail_code.LIMITS, {'REALTIME': 5, 'CPU': 0, 'VMEM': 0, 'FSIZE': 1000}):
+            worker_pool.safe_exec("f = open('out.txt', 'w')\nf.write('x' * 100)\nf.close()\na = 1", globals_dict)
+        self.assertEqual(globals_dict['a'], 1)
+
+    def test_started_processes_are_killed(self):
+        # Without a time limit, the worker must not wait for a process which
+        # the code started and which holds the result pipe open.
+        globals_dict = {}
+        start = time.time()
+        self.pool.safe_exec(textwrap.dedent("""\
+            import os, time
+            pid = os.fork()
+            if pid == 0:
+                time.sleep(60)
+                os._exit(0)
+            """), globals_dict)
+        self.assertLess(time.time() - start, 30)
+        self.assertIn('pid', globals_dict)
+
+    def test_dead_worker_is_replaced(self):
+        with self.assertRaises(SafeExecException):
+            self.pool.safe_exec("import os, signal\nos.kill(os.getppid(), signal.SIGKILL)", {})
+        globals_dict = {}
+        self.pool.safe_exec("a = 1", globals_dict)
+        self.assertEqual(globals_dict['a'], 1)
+
+
+class TestSafeExecWithPool(unittest.TestCase):
+    """
+    Tests for running safe_exec with a configured pool.
+    """
+    def setUp(self):
+        super(TestSafeExecWithPool, self).setUp()
+        configure_pool(size=1)
+        self.addCleanup(configure_pool)
+
+    def test_unsafe_code_uses_the_pool(self):
+        globals_dict = {}
+        safe_exec(textwrap.dedent("""\
+            import os
+            pid = os.getppid()
+            a = 1/2
+            b = int(math.pi)
+            """), globals_dict, unsafely=True)
+        self.assertEqual(globals_dict['a'], 0.5)
+        self.assertEqual(globals_dict['b'], 3)
+        self.assertNotEqual(globals_dict['pid'], os.getpid())
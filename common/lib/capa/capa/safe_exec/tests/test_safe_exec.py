@@ -10,6 +10,7 @@ import unittest
 from nose.plugins.skip import SkipTest
 
 from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec.safe_exec import CACHE_KEY_VERSION, MAX_CACHED_RESULT_SIZE, clear_local_cache, digest_code
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
@@ -110,6 +111,11 @@ class DictCache(object):
 class TestSafeExecCaching(unittest.TestCase):
     """Test that caching works on safe_exec."""
 
+    def setUp(self):
+        super(TestSafeExecCaching, self).setUp()
+        clear_local_cache()
+        self.addCleanup(clear_local_cache)
+
     def test_cache_miss_then_hit(self):
         g = {}
         cache = {}
@@ -122,6 +128,7 @@ class TestSafeExecCaching(unittest.TestCase):
 
         # Fiddle with the cache, then try it again.
         cache[cache.keys()[0]] = (None, {'a': 17})
+        clear_local_cache()
 
         g = {}
         safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
@@ -153,6 +160,7 @@ class TestSafeExecCaching(unittest.TestCase):
 
         # Change the value stored in the cache, the result should change.
         cache[cache.keys()[0]] = ("Hey there!", {})
+        clear_local_cache()
 
         with self.assertRaises(SafeExecException):
             safe_exec(code, g, cache=DictCache(cache))
@@ -163,9 +171,65 @@ class TestSafeExecCaching(unittest.TestCase):
 
         # Change it again, now no exception!
         cache[cache.keys()[0]] = (None, {'a': 17})
+        clear_local_cache()
         safe_exec(code, g, cache=DictCache(cache))
         self.assertEqual(g['a'], 17)
 
+    def test_exceptions_are_cached_without_globals(self):
+        cache = {}
+        with self.assertRaises(SafeExecException):
+            safe_exec("a = 'x' * 1000\n1/0", {'b': 1}, cache=DictCache(cache))
+        self.assertIsNone(cache.values()[0][1])
+
+    def test_local_cache_hit(self):
+        cache = {}
+        dict_cache = DictCache(cache)
+        safe_exec("a = int(math.pi)", {}, cache=dict_cache)
+        # Results are found in process, without going to the cache.
+        cache.clear()
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=dict_cache)
+        self.assertEqual(g['a'], 3)
+        self.assertEqual(cache, {})
+
+    def test_local_cache_is_per_cache(self):
+        safe_exec("a = int(math.pi)", {}, cache=DictCache({}))
+        # Another cache doesn't see the results cached in process for the first one.
+        cache = {}
+        safe_exec("a = int(math.pi)", {}, cache=DictCache(cache))
+        self.assertEqual(cache.values(), [(None, {'a': 3})])
+
+    def test_local_cache_results_are_copies(self):
+        dict_cache = DictCache({})
+        safe_exec("a = [1, 2]", {}, cache=dict_cache)
+        g = {}
+        safe_exec("a = [1, 2]", g, cache=dict_cache)
+        g['a'].append(3)
+        g = {}
+        safe_exec("a = [1, 2]", g, cache=dict_cache)
+        self.assertEqual(g['a'], [1, 2])
+
+    def test_cache_keys_are_versioned(self):
+        cache = {}
+        safe_exec("a = 17", {}, cache=DictCache(cache), random_seed=1)
+        self.assertTrue(cache.keys()[0].startswith("safe_exec.v{}.1.".format(CACHE_KEY_VERSION)))
+
+    def test_large_results_are_not_cached(self):
+        cache = {}
+        code = "a = 'x' * {}".format(MAX_CACHED_RESULT_SIZE)
+        g = {}
+        safe_exec(code, g, cache=DictCache(cache))
+        self.assertEqual(len(g['a']), MAX_CACHED_RESULT_SIZE)
+        self.assertEqual(cache, {})
+
+    def test_code_digest(self):
+        cache = {}
+        safe_exec("a = 17", {}, cache=DictCache(cache))
+        # A precomputed digest gives the same cache key.
+        clear_local_cache()
+        safe_exec("a = 17", {}, cache=DictCache(cache), code_digest=digest_code("a = 17"))
+        self.assertEqual(len(cache), 1)
+
     def test_unicode_submission(self):
         # Check that using non-ASCII unicode does not raise an encoding error.
         # Try several non-ASCII unicode characters.
@@ -1,8 +1,17 @@
 """
 MongoDB/GridFS-level code for the contentstore.
 """
+import calendar
+import logging
 import os
 import json
+import posixpath
+import tarfile
+import time
+from collections import deque
+from cStringIO import StringIO
+from multiprocessing.pool import ThreadPool
+
 import pymongo
 import gridfs
 from gridfs.errors import NoFile
@@ -18,6 +27,11 @@ from xmodule.util.misc import escape_invalid_characters
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 from .content import StaticContent, ContentStore, StaticContentStream
 
+log = logging.getLogger(__name__)
+
+# Number of assets read from GridFS at the same time when exporting a course into an archive.
+ASSET_EXPORT_WORKERS = 4
+
 
 class MongoContentStore(ContentStore):
     """
@@ -170,7 +184,52 @@ class MongoContentStore(ContentStore):
         with disk_fs.open(export_name, 'wb') as asset_file:
             asset_file.write(content.data)
 
-    def export_all_for_course(self, course_key, output_directory, assets_policy_file):
+    def export_to_archive(self, asset_keys, archive, archive_directory, workers=ASSET_EXPORT_WORKERS):
+        """
+        Write the given assets into an open tar archive, under archive_directory, at the same
+        relative paths as :meth:`export` writes them to on disk.
+
+        Up to `workers` assets are read from GridFS at the same time while the ones already read
+        are written to the archive, so only that many assets are held in memory.
+
+        Returns the number of bytes written.
+        """
+        def add_to_archive(content):
+            """
+            Add a single asset to the archive and return its size.
+            """
+            directory = archive_directory
+            if content.import_path is not None:
+                directory = posixpath.join(directory, os.path.dirname(content.import_path))
+            # Escape invalid char from filename.
+            export_name = escape_invalid_characters(name=content.name, invalid_char_list=['/', '\\'])
+
+            info = tarfile.TarInfo(posixpath.join(directory, export_name))
+            info.size = len(content.data)
+            info.mode = 0644
+            if content.last_modified_at is not None:
+                info.mtime = calendar.timegm(content.last_modified_at.utctimetuple())
+            else:
+                info.mtime = time.time()
+            archive.addfile(info, StringIO(content.data))
+            return info.size
+
+        size = 0
+        pool = ThreadPool(workers)
+        pending = deque()
+        try:
+            for asset_key in asset_keys:
+                pending.append(pool.apply_async(self.find, (asset_key,)))
+                if len(pending) >= workers:
+                    size += add_to_archive(pending.popleft().get())
+            while pending:
+                size += add_to_archive(pending.popleft().get())
+        finally:
+            pool.terminate()
+            pool.join()
+        return size
+
+    def export_all_for_course(self, course_key, output_directory, assets_policy_file, archive=None):
         """
         Export all of this course's assets to the output_directory. Export all of the assets'
         attributes to the policy file.
@@ -180,20 +239,32 @@ class MongoContentStore(ContentStore):
             output_directory: the directory under which to put all the asset files
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
+            archive (tarfile.TarFile): if given, the asset files are written into this archive, with
+                output_directory as their path inside it, instead of onto disk.
         """
         policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
+        if archive is not None:
+            start = time.time()
+            size = self.export_to_archive([asset['asset_key'] for asset in assets], archive, output_directory)
+            elapsed = time.time() - start
+            log.info(
+                u'Exported %d assets (%d bytes) of %s in %.2fs, %.0f bytes/s',
+                len(assets), size, course_key, elapsed, size / elapsed if elapsed else 0,
+            )
+
         for asset in assets:
-            # TODO: On 6/19/14, I had to put a try/except around this
-            # to export a course. The course failed on JSON files in
-            # the /static/ directory placed in it with an import.
-            #
-            # If this hasn't been looked at in a while, remove this comment.
-            #
-            # When debugging course exports, this might be a good place
-            # to look. -- pmitros
-            self.export(asset['asset_key'], output_directory)
+            if archive is None:
+                # TODO: On 6/19/14, I had to put a try/except around this
+                # to export a course. The course failed on JSON files in
+                # the /static/ directory placed in it with an import.
+                #
+                # If this hasn't been looked at in a while, remove this comment.
+                #
+                # When debugging course exports, this might be a good place
+                # to look. -- pmitros
+                self.export(asset['asset_key'], output_directory)
             for attr, value in asset.iteritems():
                 if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
                     policy.setdefault(asset['asset_key'].name, {})[attr] = value
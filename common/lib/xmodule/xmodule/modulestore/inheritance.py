@@ -272,6 +272,49 @@ def inherit_metadata(descriptor, inherited_data):
         pass
 
 
+def compute_inherited_settings(root, get_children, get_settings, root_settings=None):
+    """
+    Computes the inheritable settings that a block and each of its
+    descendants inherit from their ancestors.
+
+    The tree is walked iteratively and each block is visited once, so cycles
+    and blocks with several parents can't make it loop. A block with several
+    parents inherits from the first one visited.
+
+    A block which sets no inheritable settings of its own passes on to its
+    children the very mapping it inherited, so settings are not copied for
+    every block that inherits them unchanged. The returned mappings are
+    shared and must not be modified.
+
+    Arguments:
+        root: The key of the block to start from.
+        get_children (function): Returns the keys of the children of the
+            block with the given key.
+        get_settings (function): Returns a dict of the inheritable settings
+            set on the block with the given key.
+        root_settings (dict): The settings the root block inherits.
+
+    Returns:
+        dict: The (parent key, inherited settings) of the root block and of
+            each of its descendants, keyed by block key. The parent key of the
+            root block is None.
+    """
+    inherited = {root: (None, root_settings or {})}
+    pending = [root]
+    while pending:
+        block_key = pending.pop()
+        settings = inherited[block_key][1]
+        own_settings = get_settings(block_key)
+        if own_settings:
+            settings = dict(settings)
+            settings.update(own_settings)
+        for child_key in get_children(block_key):
+            if child_key not in inherited:
+                inherited[child_key] = (block_key, settings)
+                pending.append(child_key)
+    return inherited
+
+
 def own_metadata(module):
     """
     Return a JSON-friendly dictionary that contains only non-inherited field
@@ -12,7 +12,7 @@ structure:
 }
 """
 
-import copy
+from collections import namedtuple
 from datetime import datetime
 from importlib import import_module
 import logging
@@ -46,7 +46,12 @@ from xmodule.modulestore import ModuleStoreWriteBase, ModuleStoreEnum, BulkOpera
 from xmodule.modulestore.draft_and_published import ModuleStoreDraftAndPublished, DIRECT_ONLY_CATEGORIES
 from xmodule.modulestore.edit_info import EditInfoRuntimeMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError, DuplicateCourseError, ReferentialIntegrityError
-from xmodule.modulestore.inheritance import InheritanceMixin, inherit_metadata, InheritanceKeyValueStore
+from xmodule.modulestore.inheritance import (
+    InheritanceKeyValueStore,
+    InheritanceMixin,
+    compute_inherited_settings,
+    inherit_metadata
+)
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.modulestore.xml import CourseLocationManager
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
@@ -77,6 +82,56 @@ BLOCK_TYPES_WITH_CHILDREN = list(set(
 # at module level, cache one instance of OSFS per filesystem root.
 _OSFS_INSTANCE = {}
 
+# Version of the format of the trees stored in the metadata inheritance cache.
+METADATA_INHERITANCE_TREE_VERSION = 3
+
+# An entry of a metadata inheritance tree: the inheritable settings a block inherits, and the url of
+# its parent in the branch the tree was computed for. The settings are shared with other entries.
+InheritedMetadata = namedtuple('InheritedMetadata', 'branch parent settings')
+
+
+def metadata_inheritance_tree(root, results_by_url, branch):
+    """
+    Computes the metadata inheritance tree of a course from its containers.
+
+    Arguments:
+        root (unicode): The url of the course block.
+        results_by_url (dict): The containers of the course, keyed by url, with
+            their children and inheritable metadata, as loaded from the db.
+        branch (str): The branch the containers were loaded from.
+
+    Returns:
+        dict: An InheritedMetadata for every block below the course, keyed by
+            url. Containers get the metadata they inherit merged with their
+            own; leaves, which aren't in results_by_url, get what they inherit.
+    """
+    # now traverse the tree and compute down the inherited metadata. Remember results will
+    # not contain leaf nodes, which have neither children nor settings to pass down.
+    def _get_children(url):
+        """
+        Returns the urls of the children of the block with the given url
+        """
+        return results_by_url[url].get('definition', {}).get('children', []) if url in results_by_url else []
+
+    def _get_settings(url):
+        """
+        Returns the inheritable settings set on the block with the given url
+        """
+        return results_by_url[url].get('metadata', {}) if url in results_by_url else {}
+
+    tree = {}
+    for url, (parent_url, settings) in compute_inherited_settings(root, _get_children, _get_settings).iteritems():
+        if parent_url is None:
+            continue
+        own_settings = _get_settings(url)
+        if own_settings:
+            settings = dict(settings)
+            settings.update(own_settings)
+        # we're piggybacking on this traversal to grab and cache each block's parent, as a
+        # performance optimization for CachingDescriptorSystem.load_item
+        tree[url] = InheritedMetadata(branch, parent_url, settings)
+    return tree
+
 
 class MongoRevisionKey(object):
     """
@@ -263,12 +318,12 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 parent = None
                 if self.cached_metadata is not None:
                     # fish the parent out of here if it's available
-                    parent_url = self.cached_metadata.get(unicode(location), {}).get('parent', {}).get(
-                        ModuleStoreEnum.Branch.published_only if location.revision is None
-                        else ModuleStoreEnum.Branch.draft_preferred
-                    )
-                    if parent_url:
-                        parent = self._convert_reference_to_key(parent_url)
+                    inherited_metadata = self.cached_metadata.get(unicode(location))
+                    if inherited_metadata is not None and inherited_metadata.parent and inherited_metadata.branch == (
+                            ModuleStoreEnum.Branch.published_only if location.revision is None
+                            else ModuleStoreEnum.Branch.draft_preferred
+                    ):
+                        parent = self._convert_reference_to_key(inherited_metadata.parent)
 
                 if not parent and category not in DETACHED_XBLOCK_TYPES.union(['course']):
                     # try looking it up just-in-time (but not if we're working with a detached block).
@@ -301,10 +356,8 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                     # so when we do the lookup, we should do so with a non-draft location
                     non_draft_loc = as_published(location)
 
-                    # Convert the serialized fields values in self.cached_metadata
-                    # to python values
-                    metadata_to_inherit = self.cached_metadata.get(unicode(non_draft_loc), {})
-                    inherit_metadata(module, metadata_to_inherit)
+                    inherited_metadata = self.cached_metadata.get(unicode(non_draft_loc))
+                    inherit_metadata(module, inherited_metadata.settings if inherited_metadata is not None else {})
 
                 module._edit_info = json_data.get('edit_info')
 
@@ -733,38 +786,10 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             if location.category == 'course':
                 root = location_url
 
-        # now traverse the tree and compute down the inherited metadata
-        metadata_to_inherit = {}
-
-        def _compute_inherited_metadata(url):
-            """
-            Helper method for computing inherited metadata for a specific location url
-            """
-            my_metadata = results_by_url[url].get('metadata', {})
-
-            # go through all the children and recurse, but only if we have
-            # in the result set. Remember results will not contain leaf nodes
-            for child in results_by_url[url].get('definition', {}).get('children', []):
-                if child in results_by_url:
-                    new_child_metadata = copy.deepcopy(my_metadata)
-                    new_child_metadata.update(results_by_url[child].get('metadata', {}))
-                    results_by_url[child]['metadata'] = new_child_metadata
-                    metadata_to_inherit[child] = new_child_metadata
-                    _compute_inherited_metadata(child)
-                else:
-                    # this is likely a leaf node, so let's record what metadata we need to inherit
-                    metadata_to_inherit[child] = my_metadata.copy()
-                # WARNING: 'parent' is not part of inherited metadata, but
-                # we're piggybacking on this recursive traversal to grab
-                # and cache the child's parent, as a performance optimization.
-                # The 'parent' key will be popped out of the dictionary during
-                # CachingDescriptorSystem.load_item
-                metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
+        if root is None:
+            return {}
 
-        if root is not None:
-            _compute_inherited_metadata(root)
-
-        return metadata_to_inherit
+        return metadata_inheritance_tree(root, results_by_url, self.get_branch_setting())
 
     def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False):
         '''
@@ -780,7 +805,7 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
             # then look in any caching subsystem (e.g. memcached)
             if self.metadata_inheritance_cache_subsystem is not None:
-                tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id), {})
+                tree = self.metadata_inheritance_cache_subsystem.get(self._metadata_inheritance_cache_key(course_id), {})
             else:
                 logging.warning(
                     'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
@@ -793,7 +818,7 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
             # now write out computed tree to caching subsystem (e.g. memcached), if available
             if self.metadata_inheritance_cache_subsystem is not None:
-                self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+                self.metadata_inheritance_cache_subsystem.set(self._metadata_inheritance_cache_key(course_id), tree)
 
         # now populate a request_cache, if available. NOTE, we are outside of the
         # scope of the above if: statement so that after a memcache hit, it'll get
@@ -807,6 +832,13 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
         return tree
 
+    @staticmethod
+    def _metadata_inheritance_cache_key(course_id):
+        """
+        Returns the key of the course's tree in the metadata inheritance cache
+        """
+        return u'{}.v{}'.format(course_id, METADATA_INHERITANCE_TREE_VERSION)
+
     def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
@@ -0,0 +1,183 @@
+"""
+Performance test comparing the structure scans of the split modulestore's
+get_items, get_parent_location and orphan filtering with the lookups into
+the StructureIndex that replaces them.
+"""
+import datetime
+import unittest
+from collections import defaultdict
+from timeit import default_timer
+
+import ddt
+import pytz
+from bson.objectid import ObjectId
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex
+
+# Number of times each lookup is repeated; the fastest run is reported.
+REPEAT = 5
+
+# Number of parent lookups per measurement, as on a Studio outline page.
+PARENT_LOOKUPS = 100
+
+
+def make_course_structure(chapters, sequentials, verticals, problems):
+    """
+    Return a structure with the given fan-out at each level of a course outline.
+    """
+    version = ObjectId()
+    edited_on = datetime.datetime(2017, 1, 1, tzinfo=pytz.utc)
+    blocks = {}
+
+    def add_block(block_type, block_id, children=None, **fields):
+        """
+        Add a block to the structure and return its key.
+        """
+        block_key = BlockKey(block_type, block_id)
+        if children is not None:
+            fields['children'] = children
+        blocks[block_key] = BlockData(
+            block_type=block_type,
+            fields=fields,
+            definition=ObjectId(),
+            edit_info={'edited_on': edited_on, 'edited_by': 1, 'update_version': version},
+        )
+        return block_key
+
+    chapter_keys = []
+    for chapter in range(chapters):
+        sequential_keys = []
+        for sequential in range(sequentials):
+            vertical_keys = []
+            for vertical in range(verticals):
+                prefix = '{}_{}_{}'.format(chapter, sequential, vertical)
+                problem_keys = [
+                    add_block('problem', '{}_{}'.format(prefix, problem), display_name='Problem', weight=1.0)
+                    for problem in range(problems)
+                ]
+                vertical_keys.append(add_block('vertical', prefix, problem_keys, display_name='Unit'))
+            sequential_keys.append(add_block(
+                'sequential', '{}_{}'.format(chapter, sequential), vertical_keys, graded=True, due=edited_on,
+            ))
+        chapter_keys.append(add_block('chapter', str(chapter), sequential_keys, display_name='Section'))
+    root = add_block('course', 'course', chapter_keys, display_name='Course')
+
+    return {'_id': version, 'root': root, 'original_version': version, 'previous_version': None, 'blocks': blocks}
+
+
+def scan_block_type(structure, block_type):
+    """
+    Finds the blocks of a type the way get_items used to.
+    """
+    return [
+        block_key
+        for block_key, block_data in structure['blocks'].iteritems()
+        if block_data.block_type == block_type
+    ]
+
+
+def scan_parents(structure, block_key):
+    """
+    Finds the parents of a block the way get_parent_location used to.
+    """
+    return [
+        parent_key
+        for parent_key, block_data in structure['blocks'].iteritems()
+        if block_key in block_data.fields.get('children', [])
+    ]
+
+
+def scan_reachable(structure, block_keys):
+    """
+    Filters out orphans the way get_items(include_orphans=False) used to.
+    """
+    parents = defaultdict(list)
+    for parent_key, block_data in structure['blocks'].iteritems():
+        for child_key in block_data.fields.get('children', []):
+            parents[child_key].append(parent_key)
+    path_cache = {}
+
+    def has_path_to_root(block_key):
+        """
+        Returns whether the block has a path to the root, caching the answer.
+        """
+        if block_key not in path_cache:
+            block_parents = parents[block_key]
+            if not block_parents and block_key.type in ['course', 'library']:
+                path_cache[block_key] = True
+            else:
+                path_cache[block_key] = any(has_path_to_root(parent) for parent in block_parents)
+        return path_cache[block_key]
+
+    return [block_key for block_key in block_keys if has_path_to_root(block_key)]
+
+
+def best_time(func):
+    """
+    Returns the best wall-clock time of calling func.
+    """
+    best = None
+    for __ in range(REPEAT):
+        start = default_timer()
+        func()
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+@ddt.ddt
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip("performance test, run manually")
+class StructureIndexPerf(unittest.TestCase):
+    """
+    Compares the time of looking up blocks by scanning a structure and by
+    using its index.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(
+        (10, 5, 5, 3),  # about a thousand blocks
+        (20, 10, 10, 4),  # about ten thousand blocks
+        (40, 10, 5, 5),  # about twelve thousand blocks, with wider units
+    )
+    @ddt.unpack
+    def test_lookups(self, chapters, sequentials, verticals, problems):
+        structure = make_course_structure(chapters, sequentials, verticals, problems)
+        problem_keys = scan_block_type(structure, 'problem')
+        looked_up_keys = problem_keys[::max(1, len(problem_keys) / PARENT_LOOKUPS)][:PARENT_LOOKUPS]
+        index = StructureIndex(structure)
+        self.assertEqual(index.get_block_keys('problem'), problem_keys)
+        self.assertEqual(
+            [scan_parents(structure, block_key) for block_key in looked_up_keys],
+            [index.get_parents(block_key) for block_key in looked_up_keys],
+        )
+
+        lookups = (
+            (
+                'blocks of type',
+                lambda: scan_block_type(structure, 'problem'),
+                lambda: index.get_block_keys('problem'),
+            ),
+            (
+                '{} parents'.format(len(looked_up_keys)),
+                lambda: [scan_parents(structure, block_key) for block_key in looked_up_keys],
+                lambda: [index.get_parents(block_key) for block_key in looked_up_keys],
+            ),
+            (
+                'orphan filtering',
+                lambda: scan_reachable(structure, problem_keys),
+                lambda: [block_key for block_key in problem_keys if index.has_path_to_root(block_key)],
+            ),
+        )
+        print "\n{} blocks, index built in {:8.2f}ms".format(
+            len(structure['blocks']), best_time(lambda: StructureIndex(structure)) * 1000,
+        )
+        for name, scan, lookup in lookups:
+            print "{:>18}: scan {:10.3f}ms, index {:10.3f}ms".format(
+                name, best_time(scan) * 1000, best_time(lookup) * 1000,
+            )
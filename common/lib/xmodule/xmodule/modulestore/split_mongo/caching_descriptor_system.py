@@ -1,5 +1,6 @@
 import sys
 import logging
+from collections import OrderedDict
 
 from contracts import contract, new_contract
 from fs.osfs import OSFS
@@ -42,7 +43,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
     Computes the settings (nee 'metadata') inheritance upon creation.
     """
     @contract(course_entry=CourseEnvelope)
-    def __init__(self, modulestore, course_entry, default_class, module_data, lazy, **kwargs):
+    def __init__(self, modulestore, course_entry, default_class, module_data, lazy, definition_batch_size=1, **kwargs):
         """
         Computes the settings inheritance and sets up the cache.
 
@@ -55,6 +56,10 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
 
         module_data: a dict mapping Location -> json that was cached from the
             underlying modulestore
+
+        definition_batch_size: the maximum number of lazily loaded definitions fetched
+            together in one query; 1 fetches each definition on its own.  At most ten
+            batches of definitions fetched ahead of being asked for are kept
         """
         # needed by capa_problem (as runtime.filestore via this.resources_fs)
         if course_entry.course_key.course:
@@ -84,6 +89,15 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
         self.local_modules = {}
         self._services['library_tools'] = LibraryToolsService(modulestore)
 
+        self.definition_batch_size = definition_batch_size
+        # definitions fetched along with their siblings' but not yet asked for, oldest first
+        self._prefetched_definitions = OrderedDict()
+        self._max_prefetched_definitions = 10 * definition_batch_size
+        # ids of all the definitions fetched by this runtime
+        self._fetched_definition_ids = set()
+        self.definitions_fetched = 0
+        self.definition_batches = 0
+
     @lazy
     @contract(returns="dict(BlockKey: BlockKey)")
     def _parent_map(self):
@@ -198,6 +212,8 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 block_key.type,
                 definition_id,
                 convert_fields,
+                runtime=self if self.definition_batch_size > 1 else None,
+                block_key=block_key,
             )
         else:
             definition_loader = None
@@ -285,6 +301,78 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
 
         return module
 
+    def get_definition(self, course_key, definition_id, block_key):
+        """
+        Return the definition of the lazily loaded block with the given key.
+
+        If it wasn't prefetched, it is fetched in one query together with the
+        definitions of the block's siblings which haven't been fetched yet, up to
+        definition_batch_size of them, so that rendering a container doesn't issue
+        a query per child.  The siblings' definitions are kept until they are asked
+        for, or until more than ten batches of them are kept, when the oldest ones
+        are dropped.
+        """
+        definition = self._prefetched_definitions.pop(definition_id, None)
+        if definition is not None:
+            return definition
+
+        batch = [definition_id]
+        for sibling_definition_id in self._sibling_definition_ids(block_key):
+            if len(batch) >= self.definition_batch_size:
+                break
+            if (
+                    sibling_definition_id not in self._fetched_definition_ids and
+                    sibling_definition_id not in self._prefetched_definitions and
+                    sibling_definition_id not in batch
+            ):
+                batch.append(sibling_definition_id)
+
+        definitions = {
+            definition['_id']: definition
+            for definition in self.modulestore.get_definitions(course_key, batch)
+        }
+        self._count_definitions(len(definitions))
+        self._fetched_definition_ids.update(batch)
+        definition = definitions.pop(definition_id, None)
+        self._prefetched_definitions.update(definitions)
+        while len(self._prefetched_definitions) > self._max_prefetched_definitions:
+            self._prefetched_definitions.popitem(last=False)
+        if definition is None:
+            definition = self.modulestore.get_definition(course_key, definition_id)
+            self._count_definitions(1 if definition is not None else 0)
+        return definition
+
+    def _sibling_definition_ids(self, block_key):
+        """
+        Return the ids of the definitions of the siblings of the block with the
+        given key, starting with the siblings following it.
+        """
+        blocks = self.course_entry.structure['blocks']
+        parent_key = self._parent_map.get(block_key)
+        if parent_key is None or parent_key not in blocks:
+            return []
+        siblings = blocks[parent_key].fields.get('children', [])
+        if block_key in siblings:
+            position = siblings.index(block_key)
+            siblings = siblings[position + 1:] + siblings[:position]
+        return [
+            blocks[sibling].definition
+            for sibling in siblings
+            if sibling in blocks and blocks[sibling].definition is not None
+        ]
+
+    def _count_definitions(self, count):
+        """
+        Record that a query fetched count definitions, on this runtime and in the request cache.
+        """
+        self.definitions_fetched += count
+        self.definition_batches += 1
+        request_cache = self.modulestore.request_cache
+        if request_cache is not None:
+            counts = request_cache.data.setdefault('definition_fetches', {'definitions': 0, 'batches': 0})
+            counts['definitions'] += count
+            counts['batches'] += 1
+
     def get_edited_by(self, xblock):
         """
         See :meth: cms.lib.xblock.runtime.EditInfoRuntimeMixin.get_edited_by
@@ -15,6 +15,7 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -25,6 +26,7 @@ import logging
 
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
+from openedx.core.lib.cache_utils import LRUCache
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
@@ -44,6 +46,26 @@ def get_cache(alias):
     return caches[alias]
 
 
+_STRUCTURE_LRU_CACHE = {}
+
+
+def get_structure_lru_cache():
+    """
+    Return the process-wide LRUCache that sits in front of the
+    'course_structure_cache', or None if it is disabled.
+
+    Its capacity is the ``COURSE_STRUCTURE_CACHE_LRU_SIZE`` setting, in
+    (uncompressed, serialized) bytes; 0 disables it.
+    """
+    max_size = getattr(settings, 'COURSE_STRUCTURE_CACHE_LRU_SIZE', 0) if DJANGO_AVAILABLE else 0
+    if not max_size:
+        return None
+    if max_size not in _STRUCTURE_LRU_CACHE:
+        _STRUCTURE_LRU_CACHE.clear()
+        _STRUCTURE_LRU_CACHE[max_size] = LRUCache(max_size)
+    return _STRUCTURE_LRU_CACHE[max_size]
+
+
 def round_power_2(value):
     """
     Return value rounded up to the nearest power of 2.
@@ -246,21 +268,35 @@ class CourseStructureCache(object):
         if self.cache is None:
             return None
 
+        lru_cache = get_structure_lru_cache()
+        if lru_cache is not None:
+            with TIMER.timer("CourseStructureCache.lru_get", course_context) as tagger:
+                serialized_data = lru_cache.get(key)
+                tagger.tag(from_lru=str(serialized_data is not None).lower())
+                tagger.measure('lru_size', lru_cache.size)
+                tagger.measure('lru_entries', len(lru_cache))
+                if serialized_data is not None:
+                    # Deserialize on every hit, so that callers, which may
+                    # modify the structure they get, never share one.
+                    return pickle.loads(serialized_data)
+
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
-            compressed_pickled_data = self.cache.get(key)
-            tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+            compressed_data = self.cache.get(key)
+            tagger.tag(from_cache=str(compressed_data is not None).lower())
 
-            if compressed_pickled_data is None:
+            if compressed_data is None:
                 # Always log cache misses, because they are unexpected
                 tagger.sample_rate = 1
                 return None
 
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+            tagger.measure('compressed_size', len(compressed_data))
 
-            pickled_data = zlib.decompress(compressed_pickled_data)
-            tagger.measure('uncompressed_size', len(pickled_data))
+            serialized_data = zlib.decompress(compressed_data)
+            tagger.measure('uncompressed_size', len(serialized_data))
+            structure = pickle.loads(serialized_data)
 
-            return pickle.loads(pickled_data)
+        self._set_in_lru(key, serialized_data, course_context)
+        return structure
 
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
@@ -268,15 +304,35 @@ class CourseStructureCache(object):
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
-            pickled_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
-            tagger.measure('uncompressed_size', len(pickled_data))
+            serialized_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
+            tagger.measure('uncompressed_size', len(serialized_data))
 
             # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+            compressed_data = zlib.compress(serialized_data, 1)
+            tagger.measure('compressed_size', len(compressed_data))
 
             # Stuctures are immutable, so we set a timeout of "never"
-            self.cache.set(key, compressed_pickled_data, None)
+            self.cache.set(key, compressed_data, None)
+
+        self._set_in_lru(key, serialized_data, course_context)
+
+    def _set_in_lru(self, key, serialized_data, course_context):
+        """
+        Keep the uncompressed, serialized structure in the in-process LRU tier, if enabled.
+
+        Structures are immutable per version guid, so entries never need to be
+        invalidated. Entries are sized by their length in bytes.
+        """
+        lru_cache = get_structure_lru_cache()
+        if lru_cache is None:
+            return
+
+        with TIMER.timer("CourseStructureCache.lru_set", course_context) as tagger:
+            evictions = lru_cache.evictions
+            tagger.tag(stored=str(lru_cache.set(key, serialized_data, len(serialized_data))).lower())
+            tagger.measure('lru_evictions', lru_cache.evictions - evictions)
+            tagger.measure('lru_size', lru_cache.size)
+            tagger.measure('lru_entries', len(lru_cache))
 
 
 class MongoConnection(object):
@@ -86,6 +86,7 @@ from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo.structure_index import get_structure_index
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -116,6 +117,9 @@ log = logging.getLogger(__name__)
 # When blacklists are this, all children should be excluded
 EXCLUDE_ALL = '*'
 
+# Default maximum number of lazily loaded definitions which a runtime fetches in one query.
+DEFINITION_BATCH_SIZE = 100
+
 
 new_contract('BlockUsageLocator', BlockUsageLocator)
 new_contract('BlockKey', BlockKey)
@@ -435,10 +439,12 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         if len(ids):
             # Query the db for the definitions.
             defs_from_db = list(self.db_connection.get_definitions(list(ids), course_key))
-            defs_dict = {d.get('_id'): d for d in defs_from_db}
-            # Add the retrieved definitions to the cache.
-            bulk_write_record.definitions_in_db.update(defs_dict.iterkeys())
-            bulk_write_record.definitions.update(defs_dict)
+            if bulk_write_record.active:
+                # Add the retrieved definitions to the cache.  Outside of a bulk
+                # operation nothing would ever clear it, so don't.
+                defs_dict = {d.get('_id'): d for d in defs_from_db}
+                bulk_write_record.definitions_in_db.update(defs_dict.iterkeys())
+                bulk_write_record.definitions.update(defs_dict)
             definitions.extend(defs_from_db)
         return definitions
 
@@ -693,9 +699,11 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None, definition_batch_size=DEFINITION_BATCH_SIZE, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param definition_batch_size: the maximum number of lazily loaded definitions fetched
+            in one query; 1 fetches each definition on its own.
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
@@ -725,6 +733,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             self.services["request_cache"] = self.request_cache
 
         self.signal_handler = signal_handler
+        self.definition_batch_size = definition_batch_size
 
     def close_connections(self):
         """
@@ -1261,21 +1270,31 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
 
-        # No need of these caches unless include_orphans is set to False
+        index = self._get_structure_index(course)
+
+        # No need of these caches unless include_orphans is set to False and the structure isn't indexed
         path_cache = None
         parents_cache = None
 
-        if not include_orphans:
+        if not include_orphans and index is None:
             path_cache = {}
             parents_cache = self.build_block_key_to_parents_mapping(course.structure)
 
-        for block_id, value in course.structure['blocks'].iteritems():
-            if _block_matches_all(value):
+        block_types = self._get_qualified_block_types(qualifiers)
+        if index is None or block_types is None:
+            block_ids = course.structure['blocks'].iterkeys()
+        else:
+            block_ids = [block_id for block_type in block_types for block_id in index.get_block_keys(block_type)]
+
+        for block_id in block_ids:
+            if _block_matches_all(course.structure['blocks'][block_id]):
                 if not include_orphans:
-                    if (  # pylint: disable=bad-continuation
-                        block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
-                    ):
+                    if block_id.type in DETACHED_XBLOCK_TYPES:
+                        items.append(block_id)
+                    elif index is not None:
+                        if index.has_path_to_root(block_id):
+                            items.append(block_id)
+                    elif self.has_path_to_root(block_id, course, path_cache, parents_cache):
                         items.append(block_id)
                 else:
                     items.append(block_id)
@@ -1285,6 +1304,35 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         else:
             return []
 
+    @staticmethod
+    def _get_qualified_block_types(qualifiers):
+        """
+        Returns the block types a block must have to match the block_type
+        qualifier, or None if the qualifier doesn't restrict them to a list of
+        plain values.
+        """
+        block_type = qualifiers.get('block_type')
+        if isinstance(block_type, six.string_types):
+            return [block_type]
+        if isinstance(block_type, dict) and set(block_type) == {'$in'} and all(
+                isinstance(value, six.string_types) for value in block_type['$in']
+        ):
+            return block_type['$in']
+        return None
+
+    def _get_structure_index(self, course):
+        """
+        Returns the StructureIndex of the course's structure, or None if the
+        structure is being edited in an active bulk operation, in which case
+        it has to be scanned instead.
+
+        :param course: CourseEnvelope of the course
+        """
+        bulk_write_record = self._get_bulk_ops_record(course.course_key)
+        if bulk_write_record.active and course.structure['_id'] not in bulk_write_record.structures_in_db:
+            return None
+        return get_structure_index(course.structure)
+
     def build_block_key_to_parents_mapping(self, structure):
         """
         Given a structure, builds block_key to parents mapping for all block keys in structure
@@ -1314,6 +1362,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         :return Bool: whether or not component has path to the root
         """
+        if path_cache is None and parents_cache is None:
+            index = self._get_structure_index(course)
+            if index is not None:
+                return index.has_path_to_root(block_key)
 
         if path_cache and block_key in path_cache:
             return path_cache[block_key]
@@ -1353,7 +1405,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        block_key = BlockKey.from_usage_key(locator)
+        index = self._get_structure_index(course)
+        if index is None:
+            all_parent_ids = self._get_parents_from_structure(block_key, course.structure)
+        else:
+            all_parent_ids = index.get_parents(block_key)
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
@@ -1384,13 +1441,21 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         detached_categories = [name for name, __ in XBlock.load_tagged_classes("detached")]
         course = self._lookup_course(course_key)
-        items = set(course.structure['blocks'].keys())
-        items.remove(course.structure['root'])
         blocks = course.structure['blocks']
-        for block_id, block_data in blocks.iteritems():
-            items.difference_update(BlockKey(*child) for child in block_data.fields.get('children', []))
-            if block_data.block_type in detached_categories:
-                items.discard(block_id)
+        index = self._get_structure_index(course)
+        if index is None:
+            items = set(blocks.keys())
+            for block_id, block_data in blocks.iteritems():
+                items.difference_update(BlockKey(*child) for child in block_data.fields.get('children', []))
+                if block_data.block_type in detached_categories:
+                    items.discard(block_id)
+        else:
+            items = set(
+                block_id
+                for block_id, block_data in blocks.iteritems()
+                if block_data.block_type not in detached_categories and not index.get_parents(block_id)
+            )
+        items.discard(course.structure['root'])
         return [
             course_key.make_usage_key(block_type=block_id.type, block_id=block_id.id)
             for block_id in items
@@ -2709,50 +2774,43 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         self._emit_course_deleted_signal(course_key)
 
     @contract(block_map="dict(BlockKey: dict)", block_key=BlockKey)
-    def inherit_settings(
-        self, block_map, block_key, inherited_settings_map, inheriting_settings=None, inherited_from=None
-    ):
+    def inherit_settings(self, block_map, block_key, inherited_settings_map, inheriting_settings=None):
         """
-        Updates block_data with any inheritable setting set by an ancestor and recurses to children.
+        Updates inherited_settings_map with the inheritable settings that block_key and each of its
+        descendants inherit from their ancestors, given the settings block_key inherits.
         """
         if block_key not in block_map:
             return
-        block_data = block_map[block_key]
 
-        if inheriting_settings is None:
-            inheriting_settings = {}
+        def get_children(child_key):
+            """
+            Returns the children of the block which are in block_map
+            """
+            # here's where we need logic for looking up in other structures when we allow cross pointers
+            # but we also get missing children during course creation if creating top down w/ children set
+            # or migration where the old mongo published had pointers to privates
+            children = (BlockKey(*child) for child in block_map[child_key].fields.get('children', []))
+            return [child for child in children if child in block_map]
 
-        if inherited_from is None:
-            inherited_from = []
+        def get_settings(child_key):
+            """
+            Returns the inheritable settings set on the block
+            """
+            block_fields = block_map[child_key].fields
+            return {
+                field_name: block_fields[field_name]
+                for field_name in inheritance.InheritanceMixin.fields
+                if field_name in block_fields
+            }
 
+        inherited_settings = inheritance.compute_inherited_settings(
+            block_key, get_children, get_settings, inheriting_settings
+        )
         # the currently passed down values take precedence over any previously cached ones
         # NOTE: this should show the values which all fields would have if inherited: i.e.,
         # not set to the locally defined value but to value set by nearest ancestor who sets it
-        inherited_settings_map.setdefault(block_key, {}).update(inheriting_settings)
-
-        # update the inheriting w/ what should pass to children
-        inheriting_settings = inherited_settings_map[block_key].copy()
-        block_fields = block_data.fields
-        for field_name in inheritance.InheritanceMixin.fields:
-            if field_name in block_fields:
-                inheriting_settings[field_name] = block_fields[field_name]
-
-        for child in block_fields.get('children', []):
-            try:
-                if child in inherited_from:
-                    raise Exception(u'Infinite loop detected when inheriting to {}, having already inherited from {}'.format(child, inherited_from))
-                self.inherit_settings(
-                    block_map,
-                    BlockKey(*child),
-                    inherited_settings_map,
-                    inheriting_settings,
-                    inherited_from + [child]
-                )
-            except KeyError:
-                # here's where we need logic for looking up in other structures when we allow cross pointers
-                # but it's also getting this during course creation if creating top down w/ children set or
-                # migration where the old mongo published had pointers to privates
-                pass
+        for child_key, (__, settings) in inherited_settings.iteritems():
+            inherited_settings_map.setdefault(child_key, {}).update(settings)
 
     def descendants(self, block_map, block_id, depth, descendent_map):
         """
@@ -3403,6 +3461,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             course_entry=course_entry,
             module_data={},
             lazy=lazy,
+            definition_batch_size=self.definition_batch_size,
             default_class=self.default_class,
             error_tracker=self.error_tracker,
             render_template=self.render_template,
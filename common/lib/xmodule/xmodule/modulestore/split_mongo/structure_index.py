@@ -0,0 +1,81 @@
+"""
+Indexes into split-mongo course structures, for the lookups that would
+otherwise scan every block of the structure.
+
+A structure never changes once it has been saved under its version guid, so
+the index of a saved structure is built the first time it is needed and
+shared by every later lookup into the same structure version in the process.
+"""
+from collections import defaultdict
+
+from openedx.core.lib.cache_utils import LRUCache
+
+# Capacity of the process-wide cache of indexes, in indexed blocks.
+STRUCTURE_INDEX_CACHE_SIZE = 100000
+
+_STRUCTURE_INDEX_CACHE = LRUCache(STRUCTURE_INDEX_CACHE_SIZE)
+
+# Block types which are the root of a course or library.
+ROOT_BLOCK_TYPES = frozenset(['course', 'library'])
+
+
+class StructureIndex(object):
+    """
+    The blocks of a structure by block type, the parents of each block and
+    the blocks which have a path to the root of the course.
+    """
+    def __init__(self, structure):
+        self.block_keys_by_type = defaultdict(list)
+        self.parents = defaultdict(list)
+        for block_key, block_data in structure['blocks'].iteritems():
+            self.block_keys_by_type[block_data.block_type].append(block_key)
+            for child_key in block_data.fields.get('children', []):
+                self.parents[child_key].append(block_key)
+
+        pending = [
+            block_key
+            for block_key in structure['blocks']
+            if block_key.type in ROOT_BLOCK_TYPES and block_key not in self.parents
+        ]
+        reachable = set(pending)
+        while pending:
+            block_data = structure['blocks'].get(pending.pop())
+            if block_data is None:
+                continue
+            for child_key in block_data.fields.get('children', []):
+                if child_key not in reachable:
+                    reachable.add(child_key)
+                    pending.append(child_key)
+        self.reachable = frozenset(reachable)
+
+    def get_block_keys(self, block_type):
+        """
+        Returns the keys of the blocks of the given type, in the order of the
+        structure's blocks.
+        """
+        return self.block_keys_by_type.get(block_type, [])
+
+    def get_parents(self, block_key):
+        """
+        Returns the keys of the blocks which have the given block as a child.
+        """
+        return self.parents.get(block_key, [])
+
+    def has_path_to_root(self, block_key):
+        """
+        Returns whether the given block is the root of the course, or a
+        descendant of it.
+        """
+        return block_key in self.reachable or (block_key.type in ROOT_BLOCK_TYPES and block_key not in self.parents)
+
+
+def get_structure_index(structure):
+    """
+    Returns the StructureIndex of a saved structure, reusing the one built for
+    the same structure version if it is still cached.
+    """
+    index = _STRUCTURE_INDEX_CACHE.get(structure['_id'])
+    if index is None:
+        index = StructureIndex(structure)
+        _STRUCTURE_INDEX_CACHE.set(structure['_id'], index, len(structure['blocks']))
+    return index
@@ -8,6 +8,7 @@ import mimetypes
 from tempfile import mkdtemp
 import path
 import shutil
+import tarfile
 
 from opaque_keys.edx.locator import CourseLocator, AssetLocator
 from opaque_keys.edx.keys import AssetKey
@@ -145,6 +146,35 @@ class TestContentstore(unittest.TestCase):
         finally:
             shutil.rmtree(root_dir)
 
+    @ddt.data(True, False)
+    def test_export_for_course_to_archive(self, deprecated):
+        """
+        Test export into a tar archive
+        """
+        self.set_up_assets(deprecated)
+        root_dir = path.Path(mkdtemp())
+        try:
+            with tarfile.open(root_dir / 'export.tar.gz', 'w:gz') as archive:
+                self.contentstore.export_all_for_course(
+                    self.course1_key, 'course/static',
+                    path.Path(root_dir / "policy.json"),
+                    archive=archive,
+                )
+            with tarfile.open(root_dir / 'export.tar.gz') as archive:
+                self.assertEqual(
+                    sorted(archive.getnames()),
+                    sorted('course/static/{}'.format(filename) for filename in self.course1_files),
+                )
+                for filename in self.course1_files:
+                    asset_key = self.course1_key.make_asset_key('asset', filename)
+                    self.assertEqual(
+                        archive.extractfile('course/static/{}'.format(filename)).read(),
+                        self.contentstore.find(asset_key).data,
+                    )
+            self.assertTrue(path.Path(root_dir / "policy.json").isfile())
+        finally:
+            shutil.rmtree(root_dir)
+
     @ddt.data(True, False)
     def test_get_all_content(self, deprecated):
         """
@@ -0,0 +1,155 @@
+"""
+Tests for the computation of inherited settings.
+"""
+import copy
+import unittest
+
+from xmodule.modulestore.inheritance import compute_inherited_settings
+from xmodule.modulestore.mongo.base import metadata_inheritance_tree
+
+
+class ComputeInheritedSettingsTest(unittest.TestCase):
+    """
+    Tests for compute_inherited_settings.
+    """
+    def compute(self, children, settings, root_settings=None):
+        """
+        Computes the inherited settings of the tree with the given children
+        and settings, from the 'course' block.
+        """
+        return compute_inherited_settings(
+            'course',
+            lambda block_key: children.get(block_key, []),
+            lambda block_key: settings.get(block_key, {}),
+            root_settings,
+        )
+
+    def test_nearest_ancestor_wins(self):
+        inherited = self.compute(
+            children={'course': ['chapter'], 'chapter': ['sequential'], 'sequential': ['problem']},
+            settings={'course': {'graded': False, 'due': 'course due'}, 'sequential': {'graded': True}},
+            root_settings={'start': 'start'},
+        )
+        self.assertEqual(inherited['course'], (None, {'start': 'start'}))
+        self.assertEqual(inherited['chapter'], ('course', {'start': 'start', 'graded': False, 'due': 'course due'}))
+        self.assertEqual(inherited['sequential'], ('chapter', {'start': 'start', 'graded': False, 'due': 'course due'}))
+        self.assertEqual(inherited['problem'], ('sequential', {'start': 'start', 'graded': True, 'due': 'course due'}))
+
+    def test_unchanged_settings_are_shared(self):
+        inherited = self.compute(
+            children={'course': ['chapter_1', 'chapter_2'], 'chapter_1': ['problem_1'], 'chapter_2': ['problem_2']},
+            settings={'course': {'graded': True}, 'chapter_2': {'graded': False}},
+        )
+        self.assertIs(inherited['chapter_1'][1], inherited['chapter_2'][1])
+        self.assertIs(inherited['problem_1'][1], inherited['chapter_1'][1])
+        self.assertIsNot(inherited['problem_2'][1], inherited['chapter_2'][1])
+        self.assertEqual(inherited['chapter_1'][1], {'graded': True})
+        self.assertEqual(inherited['problem_2'][1], {'graded': False})
+
+    def test_cycles(self):
+        inherited = self.compute(
+            children={'course': ['chapter'], 'chapter': ['sequential'], 'sequential': ['chapter', 'course']},
+            settings={'chapter': {'graded': True}},
+        )
+        self.assertEqual(set(inherited), {'course', 'chapter', 'sequential'})
+        self.assertEqual(inherited['course'], (None, {}))
+        self.assertEqual(inherited['chapter'], ('course', {}))
+
+
+def legacy_metadata_inheritance_tree(root, results_by_url, branch):
+    """
+    Computes the metadata inheritance tree the way old mongo did before
+    compute_inherited_settings: recursively, copying the settings per block.
+    """
+    metadata_to_inherit = {}
+
+    def _compute_inherited_metadata(url):
+        """
+        Helper method for computing inherited metadata for a specific location url
+        """
+        my_metadata = results_by_url[url].get('metadata', {})
+        for child in results_by_url[url].get('definition', {}).get('children', []):
+            if child in results_by_url:
+                new_child_metadata = copy.deepcopy(my_metadata)
+                new_child_metadata.update(results_by_url[child].get('metadata', {}))
+                results_by_url[child]['metadata'] = new_child_metadata
+                metadata_to_inherit[child] = new_child_metadata
+                _compute_inherited_metadata(child)
+            else:
+                metadata_to_inherit[child] = my_metadata.copy()
+            metadata_to_inherit[child].setdefault('parent', {})[branch] = url
+
+    _compute_inherited_metadata(root)
+    return metadata_to_inherit
+
+
+class MetadataInheritanceTreeTest(unittest.TestCase):
+    """
+    Tests that old mongo's metadata inheritance tree is unchanged by its
+    computation with compute_inherited_settings.
+    """
+    def containers(self):
+        """
+        Returns the root and the containers, keyed by url, of a course in
+        which blocks at every level set some inheritable settings.
+        """
+        containers = {}
+
+        def add_container(url, children, **metadata):
+            """
+            Adds a container with the given children and settings.
+            """
+            containers[url] = {'definition': {'children': children}, 'metadata': metadata}
+            return url
+
+        chapter_urls = []
+        for chapter in range(2):
+            sequential_urls = []
+            for sequential in range(2):
+                vertical_urls = []
+                for vertical in range(2):
+                    prefix = 'i4x://org/course/vertical/{}_{}_{}'.format(chapter, sequential, vertical)
+                    vertical_urls.append(add_container(
+                        prefix,
+                        ['{}_problem_{}'.format(prefix, problem) for problem in range(2)],
+                        **({'showanswer': 'never'} if vertical else {})
+                    ))
+                sequential_urls.append(add_container(
+                    'i4x://org/course/sequential/{}_{}'.format(chapter, sequential),
+                    vertical_urls,
+                    **({'graded': True, 'format': 'Homework'} if sequential else {})
+                ))
+            chapter_urls.append(add_container(
+                'i4x://org/course/chapter/{}'.format(chapter),
+                sequential_urls,
+                **({'start': '2017-02-01T00:00:00Z', 'graded': False} if chapter else {})
+            ))
+        root = add_container(
+            'i4x://org/course/course/run',
+            chapter_urls,
+            start='2017-01-01T00:00:00Z',
+            xqa_key='key',
+        )
+        return root, containers
+
+    def test_same_as_legacy_tree(self):
+        tree = metadata_inheritance_tree(*self.containers(), branch='draft-preferred')
+        legacy_tree = legacy_metadata_inheritance_tree(*self.containers(), branch='draft-preferred')
+
+        self.assertEqual(set(tree), set(legacy_tree))
+        for url, inherited_metadata in tree.iteritems():
+            legacy_settings = dict(legacy_tree[url])
+            self.assertEqual(legacy_settings.pop('parent'), {inherited_metadata.branch: inherited_metadata.parent})
+            self.assertEqual(inherited_metadata.settings, legacy_settings)
+
+    def test_containers_include_their_own_settings(self):
+        tree = metadata_inheritance_tree(*self.containers(), branch='draft-preferred')
+        self.assertEqual(
+            tree['i4x://org/course/chapter/1'].settings,
+            {'start': '2017-02-01T00:00:00Z', 'graded': False, 'xqa_key': 'key'},
+        )
+        self.assertEqual(
+            tree['i4x://org/course/vertical/1_1_1_problem_0'].settings,
+            {'start': '2017-02-01T00:00:00Z', 'graded': True, 'format': 'Homework', 'xqa_key': 'key',
+             'showanswer': 'never'},
+        )
@@ -14,6 +14,7 @@ import ddt
 from contracts import contract
 from nose.plugins.attrib import attr
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -987,6 +988,39 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_lru_cache(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+
+        with override_settings(COURSE_STRUCTURE_CACHE_LRU_SIZE=10 * 1024 * 1024):
+            with check_mongo_calls(1):
+                not_cached_structure = self._get_structure(self.new_course)
+
+            # structures are served from process memory even if the django cache loses them
+            self.cache.clear()
+            with check_mongo_calls(0):
+                cached_structure = self._get_structure(self.new_course)
+            self.assertEqual(cached_structure, not_cached_structure)
+
+            # every caller gets its own copy, so changes to one never leak into another
+            self.assertIsNot(cached_structure, not_cached_structure)
+            cached_structure['blocks'].clear()
+            with check_mongo_calls(0):
+                self.assertEqual(self._get_structure(self.new_course), not_cached_structure)
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_lru_cache_too_small(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+
+        with override_settings(COURSE_STRUCTURE_CACHE_LRU_SIZE=1):
+            with check_mongo_calls(1):
+                self._get_structure(self.new_course)
+
+            # the structure didn't fit in the LRU cache, so it has to come from mongo
+            self.cache.clear()
+            with check_mongo_calls(1):
+                self._get_structure(self.new_course)
+
     def test_dummy_cache(self):
         with check_mongo_calls(1):
             not_cached_structure = self._get_structure(self.new_course)
@@ -1663,6 +1697,70 @@ class TestItemCrud(SplitModuleTest):
         self.assertEqual(updated_block.children[0].version_agnostic(), block.children[0].version_agnostic())
         self.assertEqual(updated_block.advertised_start, "Soon")
 
+    def test_lazy_definitions_fetched_in_batch(self):
+        """
+        Test that the definitions of lazily loaded siblings are fetched in one query
+        """
+        course = modulestore().create_course('batch', 'definitions', 'run', self.user_id, BRANCH_NAME_DRAFT)
+        for index in range(3):
+            modulestore().create_child(
+                self.user_id, course.location, 'problem',
+                fields={'display_name': 'problem {}'.format(index), 'data': '<problem>{}</problem>'.format(index)},
+            )
+
+        course = modulestore().get_course(course.id)
+        problems = course.get_children()
+        db_connection = modulestore().db_connection
+        with patch.object(db_connection, 'get_definitions', wraps=db_connection.get_definitions) as get_definitions:
+            with patch.object(db_connection, 'get_definition', wraps=db_connection.get_definition) as get_definition:
+                self.assertEqual(
+                    [problem.data for problem in problems],
+                    ['<problem>{}</problem>'.format(index) for index in range(3)],
+                )
+        self.assertEqual(get_definitions.call_count, 1)
+        self.assertFalse(get_definition.called)
+        self.assertEqual(course.runtime.definition_batches, 1)
+        self.assertEqual(course.runtime.definitions_fetched, 3)
+
+        # outside of a bulk operation, the fetched definitions aren't cached on the bulk ops record
+        bulk_write_record = modulestore()._get_bulk_ops_record(course.id)  # pylint: disable=protected-access
+        self.assertEqual(bulk_write_record.definitions, {})
+        self.assertEqual(bulk_write_record.definitions_in_db, set())
+
+    def test_lazy_definitions_batched_with_siblings(self):
+        """
+        Test that lazily loaded definitions are fetched with those of their siblings only,
+        and that prefetched definitions are kept until they are asked for
+        """
+        course = modulestore().create_course('batch', 'siblings', 'run', self.user_id, BRANCH_NAME_DRAFT)
+        chapters = [
+            modulestore().create_child(self.user_id, course.location, 'chapter') for __ in range(2)
+        ]
+        for chapter_index, chapter in enumerate(chapters):
+            for index in range(2):
+                modulestore().create_child(
+                    self.user_id, chapter.location, 'html',
+                    fields={'data': '<p>{} {}</p>'.format(chapter_index, index)},
+                )
+
+        course = modulestore().get_course(course.id, depth=None)
+        first, second = [chapter.get_children() for chapter in course.get_children()]
+        db_connection = modulestore().db_connection
+        with patch.object(db_connection, 'get_definitions', wraps=db_connection.get_definitions) as get_definitions:
+            # the definitions of the second chapter's blocks are fetched before
+            # the second definition of the first chapter is asked for
+            self.assertEqual(
+                [block.data for block in (first[0], second[0], first[1], second[1])],
+                ['<p>0 0</p>', '<p>1 0</p>', '<p>0 1</p>', '<p>1 1</p>'],
+            )
+        self.assertEqual(
+            [set(call[0][0]) for call in get_definitions.call_args_list],
+            [
+                {block.definition_locator.definition_id for block in first},
+                {block.definition_locator.definition_id for block in second},
+            ],
+        )
+
     def test_delete_item(self):
         course = self.create_course_for_deletion()
         with self.assertRaises(ValueError):
@@ -0,0 +1,81 @@
+"""
+Tests for the indexes into split-mongo course structures.
+"""
+import unittest
+
+from bson.objectid import ObjectId
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, get_structure_index
+
+ROOT = BlockKey('course', 'course')
+CHAPTER = BlockKey('chapter', 'chapter')
+PROBLEM_1 = BlockKey('problem', 'problem_1')
+PROBLEM_2 = BlockKey('problem', 'problem_2')
+ORPHAN = BlockKey('vertical', 'orphan')
+ORPHANED_PROBLEM = BlockKey('problem', 'orphaned_problem')
+MISSING = BlockKey('video', 'missing')
+
+
+def make_structure():
+    """
+    Returns a structure with a chapter, an orphaned vertical and a child
+    which is referenced but missing from the structure.
+    """
+    def block(block_type, children=None):
+        """
+        Returns the BlockData of a block with the given children.
+        """
+        return BlockData(
+            block_type=block_type,
+            fields={'children': children} if children is not None else {},
+            definition=ObjectId(),
+        )
+
+    return {
+        '_id': ObjectId(),
+        'root': ROOT,
+        'blocks': {
+            ROOT: block('course', [CHAPTER]),
+            CHAPTER: block('chapter', [PROBLEM_1, PROBLEM_2, MISSING]),
+            PROBLEM_1: block('problem'),
+            PROBLEM_2: block('problem'),
+            ORPHAN: block('vertical', [ORPHANED_PROBLEM, PROBLEM_2]),
+            ORPHANED_PROBLEM: block('problem'),
+        },
+    }
+
+
+class StructureIndexTest(unittest.TestCase):
+    """
+    Tests for StructureIndex.
+    """
+    def setUp(self):
+        super(StructureIndexTest, self).setUp()
+        self.structure = make_structure()
+        self.index = StructureIndex(self.structure)
+
+    def test_get_block_keys(self):
+        self.assertEqual(
+            set(self.index.get_block_keys('problem')),
+            {PROBLEM_1, PROBLEM_2, ORPHANED_PROBLEM},
+        )
+        self.assertEqual(self.index.get_block_keys('course'), [ROOT])
+        self.assertEqual(self.index.get_block_keys('html'), [])
+
+    def test_get_parents(self):
+        self.assertEqual(self.index.get_parents(ROOT), [])
+        self.assertEqual(self.index.get_parents(MISSING), [CHAPTER])
+        self.assertEqual(set(self.index.get_parents(PROBLEM_2)), {CHAPTER, ORPHAN})
+
+    def test_has_path_to_root(self):
+        for block_key in (ROOT, CHAPTER, PROBLEM_1, PROBLEM_2, MISSING):
+            self.assertTrue(self.index.has_path_to_root(block_key))
+        for block_key in (ORPHAN, ORPHANED_PROBLEM, BlockKey('problem', 'unknown')):
+            self.assertFalse(self.index.has_path_to_root(block_key))
+
+    def test_shared_per_structure_version(self):
+        index = get_structure_index(self.structure)
+        self.assertIs(get_structure_index(dict(self.structure)), index)
+        self.assertIsNot(get_structure_index(make_structure()), index)
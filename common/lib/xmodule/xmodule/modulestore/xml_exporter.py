@@ -104,7 +104,7 @@ class ExportManager(object):
     """
     Manages XML exporting for courselike objects.
     """
-    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir):
+    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir, archive=None):
         """
         Export all modules from `modulestore` and content from `contentstore` as xml to `root_dir`.
 
@@ -113,12 +113,15 @@ class ExportManager(object):
         `courselike_key`: The Locator of the Descriptor to export
         `root_dir`: The directory to write the exported xml to
         `target_dir`: The name of the directory inside `root_dir` to write the content to
+        `archive`: An open `tarfile.TarFile` into which the static assets are written directly, under
+            `target_dir`, instead of into `root_dir`. The caller adds the rest of `target_dir` to it.
         """
         self.modulestore = modulestore
         self.contentstore = contentstore
         self.courselike_key = courselike_key
         self.root_dir = root_dir
         self.target_dir = target_dir
+        self.archive = archive
 
     @abstractmethod
     def get_key(self):
@@ -142,6 +145,22 @@ class ExportManager(object):
         Perform any final processing after the other export tasks are done.
         """
 
+    def export_static_assets(self, root_courselike_dir):
+        """
+        Export the static assets from the contentstore, into the archive if there is one, and
+        their attributes into policies/assets.json.
+        """
+        if self.archive is not None:
+            static_dir = self.target_dir + '/static'
+        else:
+            static_dir = root_courselike_dir + '/static/'
+        self.contentstore.export_all_for_course(
+            self.courselike_key,
+            static_dir,
+            root_courselike_dir + '/policies/assets.json',
+            archive=self.archive,
+        )
+
     @abstractmethod
     def get_courselike(self):
         """
@@ -216,11 +235,7 @@ class CourseExportManager(ExportManager):
         # export the static assets
         policies_dir = export_fs.makeopendir('policies')
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(root_courselike_dir)
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -235,11 +250,15 @@ class CourseExportManager(ExportManager):
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_courselike_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open('course_image.jpg', 'wb') as course_image_file:
-                        course_image_file.write(course_image.data)
+                    # Assets streamed into the archive are already in it, so if the image was
+                    # imported from the legacy location, don't add it a second time.
+                    exported_path = os.path.join(os.path.dirname(course_image.import_path or ''), course_image.name)
+                    if self.archive is None or exported_path != 'images/course_image.jpg':
+                        output_dir = root_courselike_dir + '/static/images/'
+                        if not os.path.isdir(output_dir):
+                            os.makedirs(output_dir)
+                        with OSFS(output_dir).open('course_image.jpg', 'wb') as course_image_file:
+                            course_image_file.write(course_image.data)
 
         # export the static tabs
         export_extra_content(
@@ -318,11 +337,7 @@ class LibraryExportManager(ExportManager):
         export_fs.makeopendir('policies')
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(root_courselike_dir)
 
     def post_process(self, root, export_fs):
         """
@@ -337,18 +352,18 @@ class LibraryExportManager(ExportManager):
         xml_file.close()
 
 
-def export_course_to_xml(modulestore, contentstore, course_key, root_dir, course_dir):
+def export_course_to_xml(modulestore, contentstore, course_key, root_dir, course_dir, archive=None):
     """
     Thin wrapper for the Course Export Manager. See ExportManager for details.
     """
-    CourseExportManager(modulestore, contentstore, course_key, root_dir, course_dir).export()
+    CourseExportManager(modulestore, contentstore, course_key, root_dir, course_dir, archive=archive).export()
 
 
-def export_library_to_xml(modulestore, contentstore, library_key, root_dir, library_dir):
+def export_library_to_xml(modulestore, contentstore, library_key, root_dir, library_dir, archive=None):
     """
     Thin wrapper for the Library Export Manager. See ExportManager for details.
     """
-    LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
+    LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir, archive=archive).export()
 
 
 def adapt_references(subtree, destination_course_key, export_fs):
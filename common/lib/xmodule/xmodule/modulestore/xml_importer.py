@@ -20,8 +20,10 @@ Modulestore virtual   |          XML physical (draft, published)
              (a, a)   |  (a, a) | (x, a) | (x, x) | (x, y) | (a, x)
              (a, b)   |  (a, b) | (x, b) | (x, x) | (x, y) | (a, x)
 """
+import itertools
 import logging
 from abc import abstractmethod
+from multiprocessing.pool import ThreadPool
 from opaque_keys.edx.locator import LibraryLocator
 import os
 import mimetypes
@@ -54,11 +56,17 @@ from xmodule.util.misc import escape_invalid_characters
 
 log = logging.getLogger(__name__)
 
+# Number of static files which are read, thumbnailed and saved into the content store at the same time.
+STATIC_CONTENT_IMPORT_WORKERS = 4
+
 
 def import_static_content(
         course_data_path, static_content_store,
-        target_id, subpath='static', verbose=False):
-
+        target_id, subpath='static', verbose=False, workers=STATIC_CONTENT_IMPORT_WORKERS):
+    """
+    Import the files under course_data_path / subpath into static_content_store, saving up to
+    `workers` files at a time, and return the mapping of their paths to their asset keys.
+    """
     remap_dict = {}
 
     # now import all static assets
@@ -77,71 +85,97 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
-    for dirname, _, filenames in os.walk(static_dir):
-        for filename in filenames:
-
-            content_path = os.path.join(dirname, filename)
-
-            if re.match(ASSET_IGNORE_REGEX, filename):
-                if verbose:
-                    log.debug('skipping static content %s...', content_path)
-                continue
-
-            if verbose:
-                log.debug('importing static content %s...', content_path)
+    def static_files():
+        """
+        Yield the name and path of each static file to import.
+        """
+        for dirname, _, filenames in os.walk(static_dir):
+            for filename in filenames:
+                content_path = os.path.join(dirname, filename)
 
-            try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+                if re.match(ASSET_IGNORE_REGEX, filename):
+                    if verbose:
+                        log.debug('skipping static content %s...', content_path)
                     continue
-                # Not a 'hidden file', then re-raise exception
-                raise
 
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+                yield filename, content_path
 
-            policy_ele = policy.get(asset_key.path, {})
+    def import_static_file(static_file):
+        """
+        Save one static file into the content store and return its path and asset key,
+        or None if the file was skipped.
+        """
+        filename, content_path = static_file
+        if verbose:
+            log.debug('importing static content %s...', content_path)
 
-            # During export display name is used to create files, strip away slashes from name
-            displayname = escape_invalid_characters(
-                name=policy_ele.get('displayname', filename),
-                invalid_char_list=['/', '\\']
-            )
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+        try:
+            with open(content_path, 'rb') as f:
+                data = f.read()
+        except IOError:
+            if filename.startswith('._'):
+                # OS X "companion files". See
+                # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+                return None
+            # Not a 'hidden file', then re-raise exception
+            raise
+
+        # strip away leading path from the name
+        fullname_with_subpath = content_path.replace(static_dir, '')
+        if fullname_with_subpath.startswith('/'):
+            fullname_with_subpath = fullname_with_subpath[1:]
+        asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+
+        policy_ele = policy.get(asset_key.path, {})
+
+        # During export display name is used to create files, strip away slashes from name
+        displayname = escape_invalid_characters(
+            name=policy_ele.get('displayname', filename),
+            invalid_char_list=['/', '\\']
+        )
+        locked = policy_ele.get('locked', False)
+        mime_type = policy_ele.get('contentType')
+
+        # Check extracted contentType in list of all valid mimetypes
+        if not mime_type or mime_type not in mimetypes_list:
+            mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
+        content = StaticContent(
+            asset_key, displayname, mime_type, data,
+            import_path=fullname_with_subpath, locked=locked
+        )
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+        # first let's save a thumbnail so we can get back a thumbnail location
+        thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+        if thumbnail_content is not None:
+            content.thumbnail_location = thumbnail_location
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+        # then commit the content
+        try:
+            static_content_store.save(content)
+        except Exception as err:
+            log.exception(u'Error importing {0}, error={1}'.format(
+                fullname_with_subpath, err
+            ))
 
-            # store the remapping information which will be needed
-            # to subsitute in the module data
-            remap_dict[fullname_with_subpath] = asset_key
+        return fullname_with_subpath, asset_key
+
+    pool = ThreadPool(workers) if workers > 1 else None
+    try:
+        if pool is not None:
+            imported_files = pool.imap_unordered(import_static_file, static_files())
+        else:
+            imported_files = itertools.imap(import_static_file, static_files())
+        for imported_file in imported_files:
+            if imported_file is not None:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                fullname_with_subpath, asset_key = imported_file
+                remap_dict[fullname_with_subpath] = asset_key
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
 
     return remap_dict
 
@@ -178,6 +212,9 @@ class ImportManager(object):
             Otherwise, it throws an InvalidLocationError if the courselike does not exist.
 
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
+
+        status: if given, the UserTaskStatus of the task running the import, whose state is updated as each
+            stage of the import starts.
     """
     store_class = XMLModuleStore
 
@@ -187,7 +224,7 @@ class ImportManager(object):
             load_error_modules=True, static_content_store=None,
             target_id=None, verbose=False,
             do_import_static=True, create_if_not_present=False,
-            raise_on_failure=False
+            raise_on_failure=False, status=None
     ):
         self.store = store
         self.user_id = user_id
@@ -200,6 +237,7 @@ class ImportManager(object):
         self.do_import_static = do_import_static
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
+        self.status = status
         self.xml_module_store = self.store_class(
             data_dir,
             default_class=default_class,
@@ -220,6 +258,13 @@ class ImportManager(object):
         if self.target_id:
             assert len(self.xml_module_store.modules) == 1
 
+    def report_stage(self, stage):
+        """
+        Record the stage of the import which is starting in the import task's status, if any.
+        """
+        if self.status is not None:
+            self.status.set_state(stage)
+
     def import_static(self, data_path, dest_id):
         """
         Import all static items into the content store.
@@ -374,47 +419,21 @@ class ImportManager(object):
 
     def recursive_build(self, source_courselike, courselike, courselike_key, dest_id):
         """
-        Recursively imports all child blocks from the temporary modulestore into the
-        target modulestore.
+        Imports all child blocks from the temporary modulestore into the
+        target modulestore, one top-level child (e.g. chapter) at a time.
         """
         all_locs = set(self.xml_module_store.modules[courselike_key].keys())
         all_locs.remove(source_courselike.location)
 
-        def depth_first(subtree):
+        def import_module(module):
             """
-            Import top down just so import code can make assumptions about parents always being available
+            Import a single block into the target modulestore.
             """
-            if subtree.has_children:
-                for child in subtree.get_children():
-                    try:
-                        all_locs.remove(child.location)
-                    except KeyError:
-                        # tolerate same child occurring under 2 parents such as in
-                        # ContentStoreTest.test_image_import
-                        pass
-                    if self.verbose:
-                        log.debug('importing module location %s', child.location)
-
-                    _update_and_import_module(
-                        child,
-                        self.store,
-                        self.user_id,
-                        courselike_key,
-                        dest_id,
-                        do_import_static=self.do_import_static,
-                        runtime=courselike.runtime,
-                    )
-
-                    depth_first(child)
-
-        depth_first(source_courselike)
-
-        for leftover in all_locs:
             if self.verbose:
-                log.debug('importing module location %s', leftover)
+                log.debug('importing module location %s', module.location)
 
             _update_and_import_module(
-                self.xml_module_store.get_item(leftover),
+                module,
                 self.store,
                 self.user_id,
                 courselike_key,
@@ -423,6 +442,26 @@ class ImportManager(object):
                 runtime=courselike.runtime,
             )
 
+        subtree_roots = source_courselike.get_children() if source_courselike.has_children else []
+        for index, subtree_root in enumerate(subtree_roots, 1):
+            self.report_stage(u'Importing blocks ({} of {})'.format(index, len(subtree_roots)))
+
+            # Import top down just so import code can make assumptions about parents always being available
+            pending = [subtree_root]
+            while pending:
+                module = pending.pop()
+                # tolerate same child occurring under 2 parents such as in
+                # ContentStoreTest.test_image_import
+                all_locs.discard(module.location)
+                import_module(module)
+                if module.has_children:
+                    pending.extend(reversed(module.get_children()))
+
+        if all_locs:
+            self.report_stage(u'Importing unattached blocks')
+        for leftover in all_locs:
+            import_module(self.xml_module_store.get_item(leftover))
+
     def run_imports(self):
         """
         Iterate over the given directories and yield courses.
@@ -437,12 +476,15 @@ class ImportManager(object):
             # This bulk operation wraps all the operations to populate the published branch.
             with self.store.bulk_operations(dest_id):
                 # Retrieve the course itself.
+                self.report_stage(u'Importing course')
                 source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
                 # Import all static pieces.
+                self.report_stage(u'Importing static content')
                 self.import_static(data_path, dest_id)
 
                 # Import asset metadata stored in XML.
+                self.report_stage(u'Importing asset metadata')
                 self.import_asset_metadata(data_path, dest_id)
 
                 # Import all children
@@ -453,6 +495,7 @@ class ImportManager(object):
             # Drafts must be imported in a separate bulk operation from published items to import properly,
             # due to the recursive_build() above creating a draft item for each course block
             # and then publishing it.
+            self.report_stage(u'Importing drafts')
             with self.store.bulk_operations(dest_id):
                 # Import all draft items into the courselike.
                 courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
@@ -13,7 +13,7 @@ from opaque_keys.edx.locations import AssetLocation
 from xmodule.static_content import _write_js, _list_descriptors
 
 SAMPLE_STRING = """
-This is a sample string with more than 1024 bytes, the default STREAM_DATA_CHUNK_SIZE
+This is a sample string with more than 1024 bytes, the STREAM_DATA_CHUNK_SIZE used in these tests
 
 Lorem Ipsum is simply dummy text of the printing and typesetting industry.
 Lorem Ipsum has been the industry's standard dummy text ever since the 1500s,
@@ -173,6 +173,7 @@ class ContentTest(unittest.TestCase):
             asset_location
         )
 
+    @patch('xmodule.contentstore.content.STREAM_DATA_CHUNK_SIZE', 1024)
     def test_static_content_stream_stream_data(self):
         """
         Test StaticContentStream stream_data function, asserts that we get all the bytes
@@ -188,12 +189,13 @@ class ContentTest(unittest.TestCase):
 
         self.assertEqual(total_length, static_content_stream.length)
 
+    @patch('xmodule.contentstore.content.STREAM_DATA_CHUNK_SIZE', 1024)
     def test_static_content_stream_stream_data_in_range(self):
         """
         Test StaticContentStream stream_data_in_range function,
         asserts that we get the requested number of bytes
         first_byte and last_byte are chosen to be simple but non trivial values
-        and to have total_length > STREAM_DATA_CHUNK_SIZE (1024)
+        and to have total_length > STREAM_DATA_CHUNK_SIZE (1024 here)
         """
         data = SAMPLE_STRING
         item = FakeGridFsItem(data)
@@ -209,6 +211,13 @@ class ContentTest(unittest.TestCase):
 
         self.assertEqual(total_length, last_byte - first_byte + 1)
 
+    def test_static_content_stream_data_in_range(self):
+        """
+        Test StaticContent stream_data_in_range function, for content held in memory.
+        """
+        static_content = StaticContent('loc', 'name', 'type', SAMPLE_STRING, length=len(SAMPLE_STRING))
+        self.assertEqual(''.join(static_content.stream_data_in_range(100, 1500)), SAMPLE_STRING[100:1501])
+
     def test_static_content_write_js(self):
         """
         Test that only one filename starts with 000.
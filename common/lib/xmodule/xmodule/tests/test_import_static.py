@@ -39,3 +39,21 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+    def test_parallel_import(self):
+        """
+        Test that files saved by several workers are all saved and remapped
+        """
+        course_dir = DATA_DIR / "dot-underscore"
+        course_id = CourseLocator("edX", "dot-underscore", "2014_Fall")
+        remaps = []
+        for workers in (1, 4):
+            content_store = Mock()
+            content_store.generate_thumbnail.return_value = (None, None)
+            remaps.append(import_static_content(course_dir, content_store, course_id, workers=workers))
+            self.assertEqual(
+                sorted(call[0][0].import_path for call in content_store.save.call_args_list),
+                sorted(remaps[-1]),
+            )
+        self.assertEqual(remaps[0], remaps[1])
+        self.assertIn("example.txt", remaps[0])
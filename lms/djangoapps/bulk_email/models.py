@@ -2,6 +2,7 @@
 Models for bulk email
 """
 import logging
+import re
 
 import markupsafe
 from config_models.models import ConfigurationModel
@@ -17,7 +18,7 @@ from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
 from openedx.core.lib.html_to_text import html_to_text
 from openedx.core.lib.mail_utils import wrap_message
 from student.roles import CourseInstructorRole, CourseStaffRole
-from util.keyword_substitution import substitute_keywords_with_data
+from util.keyword_substitution import anonymous_id_from_user_id, substitute_keywords_with_data
 from util.query import use_read_replica_if_available
 
 log = logging.getLogger(__name__)
@@ -354,6 +355,18 @@ class CourseEmailTemplate(models.Model):
         """
         Create a text message using a template, message body and context.
 
+        See `_format` for how the message is created.  The lines of the
+        message are then wrapped to a length that all MTAs accept.
+        """
+        # finally, return the result, after wrapping long lines and without converting to an encoded byte array.
+        return wrap_message(CourseEmailTemplate._format(format_string, message_body, context))
+
+    @staticmethod
+    def _format(format_string, message_body, context):
+        """
+        Create a text message using a template, message body and context,
+        without wrapping its lines.
+
         Convert message body (`message_body`) into an email message
         using the provided template.  The template is a format string,
         which is rendered using format() with the provided `context` dict.
@@ -377,10 +390,7 @@ class CourseEmailTemplate(models.Model):
         # "formatted", so we need to do the same to the tag being
         # searched for.
         message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
-        result = result.replace(message_body_tag, message_body, 1)
-
-        # finally, return the result, after wrapping long lines and without converting to an encoded byte array.
-        return wrap_message(result)
+        return result.replace(message_body_tag, message_body, 1)
 
     def render_plaintext(self, plaintext, context):
         """
@@ -404,6 +414,82 @@ class CourseEmailTemplate(models.Model):
                 context[key] = markupsafe.escape(value)
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
+    def compile_plaintext(self, plaintext, context):
+        """
+        Compile the plain text message for all of its recipients.
+
+        Like `render_plaintext`, but `context` only has the values that are
+        the same for all recipients.  See `CompiledCourseEmailMessage`.
+        """
+        return CompiledCourseEmailMessage(self.plain_template, plaintext, context, escape=False)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Compile the HTML message for all of its recipients.
+
+        Like `render_htmltext`, but `context` only has the values that are
+        the same for all recipients.  See `CompiledCourseEmailMessage`.
+        """
+        return CompiledCourseEmailMessage(self.html_template, htmltext, context, escape=True)
+
+
+class CompiledCourseEmailMessage(object):
+    """
+    A course email message rendered once for all of its recipients, with
+    placeholders for the values that differ between them.
+
+    Rendering the message for a recipient then only fills in those values,
+    instead of formatting the whole template and substituting the keywords
+    of the message body again.  The result is the same as rendering the
+    message with a context that also has the recipient's 'name', 'email'
+    and 'user_id'.
+    """
+    # Placeholders for the recipient values.  Template values can't contain NUL characters.
+    PLACEHOLDER = u'\x00{}\x00'
+    PLACEHOLDER_RE = re.compile(u'\x00(\\w+)\x00')
+
+    # Keyword of the message body replaced by the recipient's anonymous user id.
+    ANONYMOUS_USER_ID_KEYWORD = '%%USER_ID%%'
+
+    def __init__(self, format_string, message_body, context, escape):
+        """
+        Arguments:
+            format_string (unicode): The plain text or HTML template.
+            message_body (unicode): The message, which is inserted in the template.
+            context (dict): The values that are the same for all recipients.
+            escape (bool): Whether to HTML-escape the values.
+        """
+        self.escape = escape
+
+        context = dict(context)
+        for name in ('name', 'email', 'user_id'):
+            context[name] = self.PLACEHOLDER.format(name)
+        if 'course_id' in context and context.get('course_title') is not None:
+            # Substituted by keyword substitution, as it is looked up in the database.
+            message_body = message_body.replace(
+                self.ANONYMOUS_USER_ID_KEYWORD, self.PLACEHOLDER.format('anonymous_user_id')
+            )
+        if escape:
+            for key, value in context.iteritems():
+                if isinstance(value, basestring):
+                    context[key] = markupsafe.escape(value)
+
+        # Alternates between literal text and the name of a recipient value.
+        self.parts = self.PLACEHOLDER_RE.split(CourseEmailTemplate._format(format_string, message_body, context))
+
+    def render(self, name, email, user_id):
+        """
+        Returns the message for the given recipient.
+        """
+        values = {'name': name, 'email': email, 'user_id': user_id}
+        parts = list(self.parts)
+        for index in xrange(1, len(parts), 2):
+            if parts[index] == 'anonymous_user_id' and 'anonymous_user_id' not in values:
+                values['anonymous_user_id'] = anonymous_id_from_user_id(user_id)
+            value = values[parts[index]]
+            parts[index] = markupsafe.escape(value) if self.escape else unicode(value)
+        return wrap_message(u''.join(parts))
+
 
 class CourseAuthorization(models.Model):
     """
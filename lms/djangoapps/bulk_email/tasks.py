@@ -7,6 +7,7 @@ import json
 import logging
 import random
 import re
+import threading
 from collections import Counter
 from smtplib import SMTPConnectError, SMTPDataError, SMTPException, SMTPServerDisconnected
 from time import sleep
@@ -92,6 +93,12 @@ BULK_EMAIL_FAILURE_ERRORS = (
     SMTPException,
 )
 
+# Number of recipients whose messages are rendered and sent together.
+SEND_BATCH_SIZE = 20
+
+# Outcome of a message that was not sent because an earlier one failed.
+NOT_SENT = object()
+
 
 def _get_course_email_context(course):
     """
@@ -494,51 +501,59 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
-    try:
-        connection = get_connection()
-        connection.open()
 
-        # Define context values to use in all course emails:
-        email_context = {'name': '', 'email': ''}
-        email_context.update(global_email_context)
+    # Throttle if we have gotten the rate limiter.  This is not very high-tech,
+    # but if a task has been retried for rate-limiting reasons, then we send
+    # over a single connection and sleep for a period of time between all
+    # emails within this task.
+    throttle = subtask_status.retried_nomax > 0
+    num_connections = 1 if throttle else settings.BULK_EMAIL_SEND_CONCURRENCY
+    connections = []
+    try:
+        for __ in xrange(num_connections):
+            connection = get_connection()
+            connections.append(connection)
+            connection.open()
+
+        # Define context values to use in all course emails, and compile the
+        # messages so that only the user-specific values are filled in per user:
+        email_context = dict(global_email_context)
+        email_context['course_id'] = course_email.course_id
+        plaintext_template = course_email_template.compile_plaintext(course_email.text_message, email_context)
+        html_template = course_email_template.compile_htmltext(course_email.html_message, email_context)
 
         while to_list:
-            # Update context with user-specific values from the user at the end of the list.
-            # At the end of processing this user, they will be popped off of the to_list.
+            # Render the messages for the batch of users at the end of the list.
+            # Only at the end of processing a user are they removed from the to_list.
             # That way, the to_list will always contain the recipients remaining to be emailed.
             # This is convenient for retries, which will need to send to those who haven't
             # yet been emailed, but not send to those who have already been sent to.
-            recipient_num += 1
-            current_recipient = to_list[-1]
-            email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
-
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
-
-            # Create email:
-            email_msg = EmailMultiAlternatives(
-                course_email.subject,
-                plaintext_msg,
-                from_addr,
-                [email],
-                connection=connection
-            )
-            email_msg.attach_alternative(html_msg, 'text/html')
-
-            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
-            # but if a task has been retried for rate-limiting reasons, then we sleep
-            # for a period of time between all emails within this task.  Choice of
-            # the value depends on the number of workers that might be sending email in
-            # parallel, and what the SES throttle rate is.
-            if subtask_status.retried_nomax > 0:
-                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+            batch = list(reversed(to_list[-SEND_BATCH_SIZE:]))
+            email_msgs = []
+            for current_recipient in batch:
+                name = current_recipient['profile__name']
+                email = current_recipient['email']
+                user_id = current_recipient['pk']
+                email_msg = EmailMultiAlternatives(
+                    course_email.subject,
+                    plaintext_template.render(name, email, user_id),
+                    from_addr,
+                    [email],
+                )
+                email_msg.attach_alternative(html_template.render(name, email, user_id), 'text/html')
+                email_msgs.append(email_msg)
 
-            try:
+            send_results = _send_messages(connections, email_msgs, course_title, throttle)
+
+            unprocessed_recipients = []
+            retry_exc = None
+            for current_recipient, send_result in zip(batch, send_results):
+                email = current_recipient['email']
+                if send_result is NOT_SENT:
+                    unprocessed_recipients.append(current_recipient)
+                    continue
+
+                recipient_num += 1
                 log.info(
                     "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
                     Recipient name: %s, Email address: %s",
@@ -550,82 +565,97 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     current_recipient['profile__name'],
                     email
                 )
-                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
-                    connection.send_messages([email_msg])
-
-            except SMTPDataError as exc:
-                # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                if exc.smtp_code >= 400 and exc.smtp_code < 500:
-                    # This will cause the outer handler to catch the exception and retry the entire task.
-                    raise exc
-                else:
+                try:
+                    if send_result is not None:
+                        raise send_result
+
+                except SMTPDataError as exc:
+                    # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_num,
+                        total_recipients,
+                        email
+                    )
+                    if exc.smtp_code >= 400 and exc.smtp_code < 500:
+                        # This will cause the outer handler to catch the exception and retry the entire task,
+                        # once the rest of the batch is processed.
+                        unprocessed_recipients.append(current_recipient)
+                        retry_exc = retry_exc or exc
+                        continue
+                    else:
+                        # This will fall through and not retry the message.
+                        log.warning(
+                            'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
+                            Email not delivered to %s due to error %s',
+                            parent_task_id,
+                            task_id,
+                            email_id,
+                            recipient_num,
+                            total_recipients,
+                            email,
+                            exc.smtp_error
+                        )
+                        dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
+                        subtask_status.increment(failed=1)
+
+                except SINGLE_EMAIL_FAILURE_ERRORS as exc:
                     # This will fall through and not retry the message.
-                    log.warning(
-                        'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
-                        Email not delivered to %s due to error %s',
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
+                        EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
                         parent_task_id,
                         task_id,
                         email_id,
                         recipient_num,
                         total_recipients,
                         email,
-                        exc.smtp_error
+                        exc
                     )
                     dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                     subtask_status.increment(failed=1)
 
-            except SINGLE_EMAIL_FAILURE_ERRORS as exc:
-                # This will fall through and not retry the message.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
-                    EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email,
-                    exc
-                )
-                dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
-                subtask_status.increment(failed=1)
+                except Exception as exc:  # pylint: disable=broad-except
+                    # This will cause the outer handler to catch the exception, once the
+                    # rest of the batch is processed.
+                    unprocessed_recipients.append(current_recipient)
+                    retry_exc = retry_exc or exc
+                    continue
 
-            else:
-                total_recipients_successful += 1
-                log.info(
-                    "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s,",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
-                if settings.BULK_EMAIL_LOG_SENT_EMAILS:
-                    log.info('Email with id %s sent to %s', email_id, email)
                 else:
-                    log.debug('Email with id %s sent to %s', email_id, email)
-                subtask_status.increment(succeeded=1)
+                    total_recipients_successful += 1
+                    log.info(
+                        "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s,",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_num,
+                        total_recipients,
+                        email
+                    )
+                    dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
+                    if settings.BULK_EMAIL_LOG_SENT_EMAILS:
+                        log.info('Email with id %s sent to %s', email_id, email)
+                    else:
+                        log.debug('Email with id %s sent to %s', email_id, email)
+                    subtask_status.increment(succeeded=1)
 
-            # Pop the user that was emailed off the end of the list only once they have
+                recipients_info[email] += 1
+
+            # Remove the users that were emailed from the end of the list only once they have
             # successfully been processed.  (That way, if there were a failure that
             # needed to be retried, the user is still on the list.)
-            recipients_info[email] += 1
-            to_list.pop()
+            del to_list[-len(batch):]
+            to_list.extend(reversed(unprocessed_recipients))
+            if retry_exc is not None:
+                raise retry_exc
 
         log.info(
             "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Successful Recipients: %s/%s, \
@@ -706,7 +736,63 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         return subtask_status, None
     finally:
         # Clean up at the end.
-        connection.close()
+        for connection in connections:
+            connection.close()
+
+
+def _send_messages(connections, email_msgs, course_title, throttle):
+    """
+    Sends the email messages, spreading them over the given open connections,
+    which send in parallel when there are several of them.
+
+    Each connection sends its messages in order, and stops at the first error
+    that isn't specific to the recipient of the message.  If `throttle` is
+    True, it sleeps before each message.
+
+    Returns the outcome of sending each message: None if it was sent, the
+    exception raised if it failed, or NOT_SENT if it was not attempted.
+    """
+    send_results = [NOT_SENT] * len(email_msgs)
+
+    def send(connection_index):
+        """
+        Sends the messages of the connection with the given index.
+        """
+        connection = connections[connection_index]
+        for index in xrange(connection_index, len(email_msgs), len(connections)):
+            if throttle:
+                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+            try:
+                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
+                    connection.send_messages([email_msgs[index]])
+            except Exception as exc:  # pylint: disable=broad-except
+                send_results[index] = exc
+                if not _is_single_email_failure(exc):
+                    return
+            else:
+                send_results[index] = None
+
+    if len(connections) == 1:
+        send(0)
+    else:
+        threads = [threading.Thread(target=send, args=(index,)) for index in xrange(len(connections))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return send_results
+
+
+def _is_single_email_failure(exc):
+    """
+    Returns whether the exception raised sending an email only means that the
+    email can't be sent to its recipient, so that sending carries on with the
+    next ones.
+    """
+    if isinstance(exc, SMTPDataError):
+        # 4xx error codes are retried, 5xx indicate a hard failure for the recipient.
+        return not 400 <= exc.smtp_code < 500
+    return isinstance(exc, SINGLE_EMAIL_FAILURE_ERRORS)
 
 
 def _get_current_task():
@@ -223,6 +223,36 @@ class CourseEmailTemplateTest(TestCase):
         self.assertIn(context['course_title'], message)
         self.assertIn(context['name'], message)
 
+    def _assert_compiled_message_matches_rendered(self, compile_message, render_message, context):
+        """
+        Check that a compiled message renders the same as the message
+        rendered with the full context.
+        """
+        context['user_id'] = UserFactory.create().id
+        message = "Dear %%USER_FULLNAME%% (%%USER_ID%%), thanks for enrolling in %%COURSE_DISPLAY_NAME%%."
+        recipient_fields = ('name', 'email', 'user_id')
+        compiled = compile_message(message, {
+            key: value for key, value in context.iteritems() if key not in recipient_fields
+        })
+        self.assertEqual(
+            compiled.render(*[context[field] for field in recipient_fields]),
+            render_message(message, dict(context)),
+        )
+
+    def test_compiled_html_matches_rendered(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._add_xss_fields(self._get_sample_html_context())
+        self._assert_compiled_message_matches_rendered(
+            template.compile_htmltext, template.render_htmltext, context
+        )
+
+    def test_compiled_plain_matches_rendered(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._add_xss_fields(self._get_sample_plain_context())
+        self._assert_compiled_message_matches_rendered(
+            template.compile_plaintext, template.render_plaintext, context
+        )
+
 
 @attr(shard=1)
 class CourseAuthorizationTest(TestCase):
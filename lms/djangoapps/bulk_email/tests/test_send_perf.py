@@ -0,0 +1,120 @@
+"""
+Performance tests comparing the throughput of sending bulk email with
+templates rendered per recipient or compiled once, over one or several
+connections to a local fake SMTP server, as BULK_EMAIL_SEND_CONCURRENCY
+sets for unthrottled subtasks.
+"""
+import asyncore
+import smtpd
+import threading
+import unittest
+from timeit import default_timer
+
+import ddt
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.smtp import EmailBackend
+
+from bulk_email.models import CourseEmailTemplate
+from bulk_email.tasks import _send_messages
+
+PLAIN_TEMPLATE = u"{course_title}\n\n{{message_body}}\n----\nYou are receiving this email at address {email}.\n"
+HTML_TEMPLATE = u"<html><body><h1>{course_title}</h1>{{message_body}}<p>Sent to {email}.</p></body></html>"
+MESSAGE = u"Dear %%USER_FULLNAME%%, welcome to %%COURSE_DISPLAY_NAME%%. " * 20
+CONTEXT = {
+    'course_title': u'Performance Course',
+    'course_id': u'course-v1:edX+Perf+1',
+    'course_end_date': u'',
+}
+
+
+class SinkServer(smtpd.SMTPServer):
+    """
+    An SMTP server that accepts and discards all messages.
+    """
+    def process_message(self, peer, mailfrom, rcpttos, data):
+        pass
+
+
+def start_sink_server():
+    """
+    Starts a sink server on a free local port in a background thread,
+    and returns its port.
+    """
+    server = SinkServer(('127.0.0.1', 0), None)
+    thread = threading.Thread(target=asyncore.loop, kwargs={'timeout': 0.1})
+    thread.daemon = True
+    thread.start()
+    return server.socket.getsockname()[1]
+
+
+def render_messages(template, num_messages, compiled):
+    """
+    Returns the messages to num_messages recipients, with the template
+    rendered per recipient or compiled once.
+    """
+    if compiled:
+        plaintext = template.compile_plaintext(MESSAGE, CONTEXT)
+        html = template.compile_htmltext(MESSAGE, CONTEXT)
+    messages = []
+    for index in range(num_messages):
+        name, email = u'Learner {}'.format(index), u'learner{}@example.com'.format(index)
+        if compiled:
+            plain_body, html_body = plaintext.render(name, email, index), html.render(name, email, index)
+        else:
+            # The user id is left out of the context to avoid looking up anonymous user ids.
+            context = dict(CONTEXT, name=name, email=email)
+            plain_body = template.render_plaintext(MESSAGE, dict(context))
+            html_body = template.render_htmltext(MESSAGE, dict(context))
+        message = EmailMultiAlternatives(u'Subject', plain_body, 'course@example.com', [email])
+        message.attach_alternative(html_body, 'text/html')
+        messages.append(message)
+    return messages
+
+
+@ddt.ddt
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip("performance test, run manually")
+class BulkEmailSendPerf(unittest.TestCase):
+    """
+    Reports the messages per second of rendering and sending bulk email.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    NUM_MESSAGES = 500
+
+    @classmethod
+    def setUpClass(cls):
+        super(BulkEmailSendPerf, cls).setUpClass()
+        cls.port = start_sink_server()
+        cls.template = CourseEmailTemplate(plain_template=PLAIN_TEMPLATE, html_template=HTML_TEMPLATE)
+
+    @ddt.data(
+        (False, 1),
+        (True, 1),
+        (True, 4),
+        (True, 8),
+    )
+    @ddt.unpack
+    def test_send(self, compiled, concurrency):
+        connections = [EmailBackend(host='127.0.0.1', port=self.port) for __ in range(concurrency)]
+        for connection in connections:
+            connection.open()
+
+        start = default_timer()
+        messages = render_messages(self.template, self.NUM_MESSAGES, compiled)
+        rendered = default_timer()
+        results = _send_messages(connections, messages, CONTEXT['course_title'], throttle=False)
+        sent = default_timer()
+
+        for connection in connections:
+            connection.close()
+        self.assertEqual(results, [None] * self.NUM_MESSAGES)
+        print "\n{} template, BULK_EMAIL_SEND_CONCURRENCY={}: rendered {:8.1f}/s, overall {:8.1f} messages/s".format(
+            'compiled' if compiled else 'rendered',
+            concurrency,
+            self.NUM_MESSAGES / (rendered - start),
+            self.NUM_MESSAGES / (sent - start),
+        )
@@ -9,6 +9,7 @@ paths actually work.
 import json
 from itertools import chain, cycle, repeat
 from smtplib import SMTPAuthenticationError, SMTPConnectError, SMTPDataError, SMTPServerDisconnected
+from unittest import TestCase
 from uuid import uuid4
 
 from boto.exception import AWSConnectionError
@@ -26,12 +27,20 @@ from boto.ses.exceptions import (
 from celery.states import FAILURE, SUCCESS  # pylint: disable=no-name-in-module, import-error
 from django.conf import settings
 from django.core.management import call_command
+from django.test.utils import override_settings
 from mock import Mock, patch
 from nose.plugins.attrib import attr
 from opaque_keys.edx.locator import CourseLocator
 
-from bulk_email.models import SEND_TO_LEARNERS, SEND_TO_MYSELF, SEND_TO_STAFF, CourseEmail, Optout
-from bulk_email.tasks import _get_course_email_context
+from bulk_email.models import (
+    SEND_TO_LEARNERS,
+    SEND_TO_MYSELF,
+    SEND_TO_STAFF,
+    CourseEmail,
+    CourseEmailTemplate,
+    Optout
+)
+from bulk_email.tasks import NOT_SENT, SEND_BATCH_SIZE, _get_course_email_context, _send_messages
 from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.subtasks import SubtaskStatus, update_subtask_status
 from lms.djangoapps.instructor_task.tasks import send_bulk_course_email
@@ -214,6 +223,61 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         self.assertEquals(parent_status.get('succeeded'), num_emails)
         self.assertEquals(parent_status.get('failed'), 0)
 
+    @override_settings(BULK_EMAIL_SEND_CONCURRENCY=3)
+    def test_successful_with_concurrent_sends(self):
+        # Select number of emails to fit into a single subtask.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEqual(get_conn.call_count, 3)
+        self.assertEqual(get_conn.return_value.send_messages.call_count, num_emails)
+
+    def test_connection_reused_within_subtask(self):
+        # Select number of emails to fit into a single subtask, spanning several batches.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        self.assertGreater(num_emails, SEND_BATCH_SIZE)
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+
+        # A single connection is opened for the whole subtask, and every
+        # email is sent over it, one message per call.
+        connection = get_conn.return_value
+        self.assertEqual(get_conn.call_count, 1)
+        self.assertEqual(connection.open.call_count, 1)
+        self.assertEqual(connection.close.call_count, 1)
+        self.assertEqual(connection.send_messages.call_count, num_emails)
+        recipients = set()
+        for call in connection.send_messages.call_args_list:
+            email_msgs = call[0][0]
+            self.assertEqual(len(email_msgs), 1)
+            recipients.update(email_msgs[0].to)
+        self.assertEqual(len(recipients), num_emails)
+
+    def test_templates_compiled_once_per_subtask(self):
+        # Select number of emails to fit into a single subtask.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            with patch.object(
+                CourseEmailTemplate, 'compile_plaintext', autospec=True,
+                side_effect=CourseEmailTemplate.compile_plaintext,
+            ) as compile_plaintext:
+                with patch.object(
+                    CourseEmailTemplate, 'compile_htmltext', autospec=True,
+                    side_effect=CourseEmailTemplate.compile_htmltext,
+                ) as compile_htmltext:
+                    self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEqual(compile_plaintext.call_count, 1)
+        self.assertEqual(compile_htmltext.call_count, 1)
+
     def test_unactivated_user(self):
         # Select number of emails to fit into a single subtask.
         num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
@@ -267,6 +331,11 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         # Test that celery handles permanent SMTPDataErrors by failing and not retrying.
         self._test_email_address_failures(SESAddressBlacklistedError(554, "Email address is blacklisted"))
 
+    @override_settings(BULK_EMAIL_SEND_CONCURRENCY=3)
+    def test_ses_blacklisted_user_with_concurrent_sends(self):
+        # Test that failures for single addresses don't stop the other connections.
+        self._test_email_address_failures(SESAddressBlacklistedError(554, "Email address is blacklisted"))
+
     def test_ses_illegal_address(self):
         # Test that celery handles permanent SMTPDataErrors by failing and not retrying.
         self._test_email_address_failures(SESIllegalAddressError(554, "Email address is illegal"))
@@ -444,3 +513,41 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         self.assertIn('account_settings_url', result)
         self.assertIn('email_settings_url', result)
         self.assertIn('platform_name', result)
+
+
+class TestSendMessages(TestCase):
+    """
+    Tests spreading a batch of messages over several connections.
+    """
+    def _create_connections(self, num_connections):
+        """Returns mock connections recording the messages they send."""
+        connections = [Mock() for __ in xrange(num_connections)]
+        for connection in connections:
+            connection.send_messages.side_effect = cycle([None])
+        return connections
+
+    def _sent_messages(self, connection):
+        """Returns the messages sent over a mock connection, in order."""
+        return [call[0][0][0] for call in connection.send_messages.call_args_list]
+
+    def test_messages_spread_over_connections(self):
+        email_msgs = [Mock(name='msg{}'.format(index)) for index in xrange(SEND_BATCH_SIZE)]
+        connections = self._create_connections(3)
+        send_results = _send_messages(connections, email_msgs, u'Course', throttle=False)
+
+        self.assertEqual(send_results, [None] * SEND_BATCH_SIZE)
+        for index, connection in enumerate(connections):
+            self.assertEqual(self._sent_messages(connection), email_msgs[index::3])
+
+    def test_connection_stops_after_connection_error(self):
+        email_msgs = [Mock(name='msg{}'.format(index)) for index in xrange(6)]
+        connections = self._create_connections(2)
+        error = SMTPServerDisconnected("Disconnected")
+        connections[0].send_messages.side_effect = chain([None, error], cycle([None]))
+        send_results = _send_messages(connections, email_msgs, u'Course', throttle=False)
+
+        # The first connection stops at the error, leaving its last message
+        # unsent, while the second connection sends all of its messages.
+        self.assertEqual(send_results, [None, None, error, None, NOT_SENT, None])
+        self.assertEqual(connections[0].send_messages.call_count, 2)
+        self.assertEqual(self._sent_messages(connections[1]), email_msgs[1::2])
@@ -10,7 +10,7 @@ from django.db import transaction
 from opaque_keys.edx.keys import CourseKey, UsageKey
 
 import request_cache
-from courseware.field_overrides import FieldOverrideProvider
+from courseware.field_overrides import FieldOverrideProvider, clear_override_index
 from lms.djangoapps.ccx.models import CcxFieldOverride, CustomCourseForEdX
 
 log = logging.getLogger(__name__)
@@ -174,6 +174,7 @@ def override_field_for_ccx(ccx, block, name, value):
 
     _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name] = value_json
     _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name + "_instance"] = override
+    clear_override_index()
 
 
 def clear_override_for_ccx(ccx, block, name):
@@ -199,6 +200,7 @@ def clear_ccx_field_info_from_ccx_map(ccx, block, name):  # pylint: disable=inva
     """
     Remove field information from ccx overrides mapping dictionary
     """
+    clear_override_index()
     try:
         clean_ccx_key = _clean_ccx_key(block.location)
         ccx_override_map = _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})
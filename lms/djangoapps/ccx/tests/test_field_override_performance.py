@@ -3,7 +3,7 @@
 Performance tests for field overrides.
 """
 import itertools
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import ddt
 import mock
@@ -15,6 +15,7 @@ from django.conf import settings
 from django.core.cache import caches
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
+from lms.djangoapps.ccx.overrides import override_field_for_ccx
 from lms.djangoapps.ccx.tests.factories import CcxFactory
 from nose.plugins.attrib import attr
 from nose.plugins.skip import SkipTest
@@ -158,14 +159,25 @@ class FieldOverridePerformanceTestCase(FieldOverrideTestMixin, ProceduralCourseT
         """
         return check_sum_of_calls(XBlock, ['__init__'], instantiations, instantiations, include_arguments=False)
 
+    def override_chapter_due_dates(self):
+        """
+        Overrides the due date of every chapter in the CCX, so that all the
+        blocks below them inherit an overridden due date.
+        """
+        due = datetime.now(UTC) + timedelta(days=7)
+        for chapter_key in self.populated_usage_keys['chapter']:
+            override_field_for_ccx(self.ccx, self.store.get_item(chapter_key), 'due', due)
+
     def instrument_course_progress_render(
             self, course_width, enable_ccx, view_as_ccx,
-            sql_queries, mongo_reads,
+            sql_queries, mongo_reads, override_chapter_due_dates=False,
     ):
         """
         Renders the progress page, instrumenting Mongo reads and SQL queries.
         """
         course_key = self.setup_course(course_width, enable_ccx, view_as_ccx)
+        if override_chapter_due_dates:
+            self.override_chapter_due_dates()
 
         # Switch to published-only mode to simulate the LMS
         with self.settings(MODULESTORE_BRANCH='published-only'):
@@ -224,6 +236,30 @@ class FieldOverridePerformanceTestCase(FieldOverrideTestMixin, ProceduralCourseT
                 course_width, enable_ccx, view_as_ccx, sql_queries, mongo_reads,
             )
 
+    @ddt.data(*range(1, 4))
+    @override_settings(
+        XBLOCK_FIELD_DATA_WRAPPERS=[],
+        MODULESTORE_FIELD_OVERRIDE_PROVIDERS=[],
+        ENABLE_ENTERPRISE_INTEGRATION=False,
+    )
+    def test_inherited_field_overrides(self, course_width):
+        """
+        Test that due dates overridden on the chapters of a CCX, and
+        inherited by every block below them, cost no more queries than a CCX
+        without overrides.
+        """
+        if self.MODULESTORE == TEST_DATA_MONGO_MODULESTORE:
+            raise SkipTest("Can't use a MongoModulestore test as a CCX course")
+
+        with self.settings(
+            XBLOCK_FIELD_DATA_WRAPPERS=['lms.djangoapps.courseware.field_overrides:OverrideModulestoreFieldData.wrap'],
+            MODULESTORE_FIELD_OVERRIDE_PROVIDERS=('ccx.overrides.CustomCoursesForEdxOverrideProvider',),
+        ):
+            sql_queries, mongo_reads = self.TEST_DATA[('ccx', course_width, True, True)]
+            self.instrument_course_progress_render(
+                course_width, True, True, sql_queries, mongo_reads, override_chapter_due_dates=True,
+            )
+
 
 class TestFieldOverrideMongoPerformance(FieldOverridePerformanceTestCase):
     """
@@ -276,3 +312,4 @@ class TestFieldOverrideSplitPerformance(FieldOverridePerformanceTestCase):
         ('ccx', 2, False, False): (16, 3),
         ('ccx', 3, False, False): (16, 3),
     }
+
@@ -503,7 +503,7 @@ def certificate_status_for_student(student, course_id):
     return certificate_status(generated_certificate)
 
 
-def certificate_status(generated_certificate):
+def certificate_status(generated_certificate, course_mode_slugs=None):
     '''
     This returns a dictionary with a key for status, and other information.
     The status is one of the following:
@@ -531,6 +531,9 @@ def certificate_status(generated_certificate):
 
     If the student has been graded, the dictionary also contains their
     grade for the course with the key "grade".
+
+    `course_mode_slugs` are the slugs of the course's unexpired modes, if the
+    caller has already loaded them.
     '''
     # Import here instead of top of file since this module gets imported before
     # the course_modes app is loaded, resulting in a Django deprecation warning.
@@ -546,7 +549,8 @@ def certificate_status(generated_certificate):
             cert_status['grade'] = generated_certificate.grade
 
         if generated_certificate.mode == 'audit':
-            course_mode_slugs = [mode.slug for mode in CourseMode.modes_for_course(generated_certificate.course_id)]
+            if course_mode_slugs is None:
+                course_mode_slugs = [mode.slug for mode in CourseMode.modes_for_course(generated_certificate.course_id)]
             # Short term fix to make sure old audit users with certs still see their certs
             # only do this if there if no honor mode
             if 'honor' not in course_mode_slugs:
@@ -5,6 +5,8 @@ from mock import patch
 
 from course_modes.models import CourseMode
 from lms.djangoapps.courseware.access import has_access
+from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
+from openedx.core.djangoapps.content.block_structure.config import CACHE_TRANSFORM_RESULTS, waffle
 from openedx.core.djangoapps.content.block_structure.tests.helpers import clear_registered_transformers_cache
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
@@ -35,6 +37,29 @@ class TransformerRegistryTestMixin(object):
         self.patcher.stop()
         clear_registered_transformers_cache()
 
+    def get_course_blocks_with_cached_results(self, user, transformers=None):
+        """
+        Returns the blocks of self.course transformed for the given user,
+        verifying that transforming them with the transform results
+        cache, both before and after the results are cached, gives the
+        same blocks and relations.
+        """
+        collected_block_structure = get_block_structure_manager(self.course.id).get_collected()
+        block_structure = get_course_blocks(user, self.course.location, transformers, collected_block_structure)
+
+        with waffle().override(CACHE_TRANSFORM_RESULTS, active=True):
+            for __ in range(2):
+                cached_block_structure = get_course_blocks(
+                    user, self.course.location, transformers, collected_block_structure,
+                )
+                self.assertSetEqual(set(cached_block_structure), set(block_structure))
+                for block_key in block_structure:
+                    self.assertSetEqual(
+                        set(cached_block_structure.get_children(block_key)),
+                        set(block_structure.get_children(block_key)),
+                    )
+        return block_structure
+
 
 class CourseStructureTestCase(TransformerRegistryTestMixin, ModuleStoreTestCase):
     """
@@ -312,7 +337,7 @@ class BlockParentsMapTestCase(TransformerRegistryTestMixin, ModuleStoreTestCase)
         """
 
         self.client.login(username=user.username, password=self.password)
-        block_structure = get_course_blocks(user, self.course.location, transformers)
+        block_structure = self.get_course_blocks_with_cached_results(user, transformers)
 
         for i, xblock_key in enumerate(self.xblock_keys):
 
@@ -16,7 +16,6 @@ from student.tests.factories import CourseEnrollmentFactory
 from xmodule.modulestore.tests.factories import CourseFactory
 from xmodule.partitions.partitions import Group, UserPartition
 
-from ...api import get_course_blocks
 from ..user_partitions import UserPartitionTransformer, _MergedGroupAccess
 from .helpers import CourseStructureTestCase, update_block
 
@@ -210,11 +209,7 @@ class UserPartitionTransformerTestCase(UserPartitionTestMixin, CourseStructureTe
             cohort = self.partition_cohorts[self.user_partition.id - 1][group_id - 1]
             add_user_to_cohort(cohort, self.user.username)
 
-        trans_block_structure = get_course_blocks(
-            self.user,
-            self.course.location,
-            self.transformers,
-        )
+        trans_block_structure = self.get_course_blocks_with_cached_results(self.user, self.transformers)
         self.assertSetEqual(
             set(trans_block_structure.get_block_keys()),
             self.get_block_key_set(self.blocks, *expected_blocks)
@@ -230,11 +225,7 @@ class UserPartitionTransformerTestCase(UserPartitionTestMixin, CourseStructureTe
         # inactive
         expected_blocks = ('course',) + tuple(string.ascii_uppercase[:15])
 
-        trans_block_structure = get_course_blocks(
-            self.user,
-            self.course.location,
-            self.transformers,
-        )
+        trans_block_structure = self.get_course_blocks_with_cached_results(self.user, self.transformers)
 
         self.assertSetEqual(
             set(trans_block_structure.get_block_keys()),
@@ -21,12 +21,14 @@ from contextlib import contextmanager
 from django.conf import settings
 from xblock.field_data import FieldData
 
+import request_cache
 from request_cache.middleware import RequestCache
 from xmodule.modulestore.inheritance import InheritanceMixin
 
 NOTSET = object()
 ENABLED_OVERRIDE_PROVIDERS_KEY = u'courseware.field_overrides.enabled_providers.{course_id}'
 ENABLED_MODULESTORE_OVERRIDE_PROVIDERS_KEY = u'courseware.modulestore_field_overrides.enabled_providers.{course_id}'
+OVERRIDE_INDEX_CACHE = u'courseware.field_overrides.index'
 
 
 def resolve_dotted(name):
@@ -48,17 +50,6 @@ def resolve_dotted(name):
     return target
 
 
-def _lineage(block):
-    """
-    Returns an iterator over all ancestors of the given block, starting with
-    its immediate parent and ending at the root of the block tree.
-    """
-    parent = block.get_parent()
-    while parent:
-        yield parent
-        parent = parent.get_parent()
-
-
 class _OverridesDisabled(threading.local):
     """
     A thread local used to manage state of overrides being disabled or not.
@@ -89,6 +80,35 @@ def overrides_disabled():
     return bool(_OVERRIDES_DISABLED.disabled)
 
 
+def clear_override_index():
+    """
+    Forgets the override lookups indexed for the current request.  The APIs
+    which set or clear overrides must call this, so that the new values are
+    seen by the rest of the request.
+    """
+    request_cache.clear_cache(OVERRIDE_INDEX_CACHE)
+
+
+def get_user_request_cache(name, user_id):
+    """
+    Returns the dict for the given user id in the request cache named
+    ``name``.
+
+    Only the data of the latest user to be looked up, and of no user
+    (``user_id`` None), is kept: the data of any other user is dropped.
+    Celery tasks which go through many users in one request cache, such as
+    grade reports, therefore don't keep every user's data until they end.
+    """
+    user_caches = request_cache.get_cache(name)
+    user_cache = user_caches.get(user_id)
+    if user_cache is None:
+        for cached_user_id in user_caches.keys():
+            if cached_user_id is not None:
+                del user_caches[cached_user_id]
+        user_cache = user_caches[user_id] = {}
+    return user_cache
+
+
 class FieldOverrideProvider(object):
     """
     Abstract class which defines the interface that a `FieldOverrideProvider`
@@ -197,6 +217,11 @@ class OverrideFieldData(FieldData):
     def __init__(self, user, fallback, providers):
         self.fallback = fallback
         self.providers = tuple(provider(user) for provider in providers)
+        # Blocks are wrapped one at a time, so the index of override lookups
+        # is kept in the request cache, shared by all the instances for the
+        # same user and providers.
+        self._user_id = getattr(user, 'id', None)
+        self._providers_key = tuple(providers)
 
     def get_override(self, block, name):
         """
@@ -231,11 +256,9 @@ class OverrideFieldData(FieldData):
             # If this is an inheritable field and an override is set above,
             # then we want to return False here, so the field_data uses the
             # override and not the original value for this block.
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    if self.get_override(ancestor, name) is not NOTSET:
-                        return False
+            if name in InheritanceMixin.fields and not overrides_disabled():
+                if self._get_inherited_override(block, name) is not NOTSET:
+                    return False
 
         return has is not NOTSET or self.fallback.has(block, name)
 
@@ -246,14 +269,57 @@ class OverrideFieldData(FieldData):
         # The `default` method is overloaded by the field storage system to
         # also handle inheritance.
         if self.providers and not overrides_disabled():
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    value = self.get_override(ancestor, name)
-                    if value is not NOTSET:
-                        return value
+            if name in InheritanceMixin.fields:
+                value = self._get_inherited_override(block, name)
+                if value is not NOTSET:
+                    return value
         return self.fallback.default(block, name)
 
+    def _get_index(self, block):
+        """
+        Returns the (overrides, inherited_overrides) dicts indexing the
+        override lookups of the current request by block location and field
+        name, for this instance's user and providers and the course of `block`.
+        """
+        index_cache = get_user_request_cache(OVERRIDE_INDEX_CACHE, self._user_id)
+        index_key = (block.location.course_key, self._providers_key)
+        index = index_cache.get(index_key)
+        if index is None:
+            index = index_cache[index_key] = ({}, {})
+        return index
+
+    def _get_inherited_override(self, block, name):
+        """
+        Returns the override of the inheritable field `name` set on the
+        nearest ancestor of `block`, or `NOTSET` if no ancestor overrides it.
+
+        Ancestors are only walked up to the nearest one whose lookup is
+        already indexed, and the result is indexed for every block on the
+        way, so inheritance is resolved once per block and field for the
+        whole request.
+        """
+        overrides, inherited_overrides = self._get_index(block)
+        unresolved = []
+        value = NOTSET
+        while True:
+            key = (block.location, name)
+            if key in inherited_overrides:
+                value = inherited_overrides[key]
+                break
+            unresolved.append(key)
+            block = block.get_parent()
+            if block is None:
+                break
+            parent_key = (block.location, name)
+            if parent_key not in overrides:
+                overrides[parent_key] = self.get_override(block, name)
+            if overrides[parent_key] is not NOTSET:
+                value = overrides[parent_key]
+                break
+        for key in unresolved:
+            inherited_overrides[key] = value
+        return value
+
 
 class OverrideModulestoreFieldData(OverrideFieldData):
     """Apply field data overrides at the modulestore level. No student context required."""
@@ -988,6 +988,31 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_locations_and_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create ScoresClients with pre-fetched data for the given locations for
+        each of the given users, using a single query.  Returns a dict mapping
+        each user_id to its ScoresClient.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        if clients and scorable_locations:
+            scores_qset = StudentModule.objects.filter(
+                student_id__in=clients.keys(),
+                course_id=course_id,
+                module_state_key__in=set(scorable_locations),
+            )
+            for student_id, location, correct, total, created in scores_qset.values_list(
+                    'student_id', 'module_state_key', 'grade', 'max_grade', 'created'
+            ):
+                # pylint: disable=protected-access
+                clients[student_id]._locations_to_scores[
+                    UsageKey.from_string(location).map_into_course(course_id)
+                ] = cls.Score(correct, total, created)
+        for client in clients.itervalues():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
@@ -4,9 +4,11 @@ by the individual due dates feature.
 """
 import json
 
-from .field_overrides import FieldOverrideProvider
+from .field_overrides import NOTSET, FieldOverrideProvider, clear_override_index, get_user_request_cache
 from .models import StudentFieldOverride
 
+OVERRIDES_CACHE = u'courseware.student_field_overrides'
+
 
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
     """
@@ -29,33 +31,53 @@ def get_override_for_user(user, block, name, default=None):
     specify the block and the name of the field.  If the field is not
     overridden for the given user, returns `default`.
     """
-    if not hasattr(block, '_student_overrides'):
-        block._student_overrides = {}  # pylint: disable=protected-access
-    overrides = block._student_overrides.get(user.id)  # pylint: disable=protected-access
-    if overrides is None:
-        overrides = _get_overrides_for_user(user, block)
-        block._student_overrides[user.id] = overrides  # pylint: disable=protected-access
-    return overrides.get(name, default)
+    overrides = _get_overrides_for_user(user, block.runtime.course_id)
+    value = overrides.get(_clean_location(block.location), {}).get(name, NOTSET)
+    if value is NOTSET:
+        return default
+    return block.fields[name].from_json(value)
 
 
-def _get_overrides_for_user(user, block):
+def _get_overrides_for_user(user, course_id):
     """
-    Gets all of the individual student overrides for given user and block.
-    Returns a dictionary of field override values keyed by field name.
+    Gets all of the individual student overrides for given user in the given
+    course, loaded once per request.  Returns a dictionary of JSON field
+    override values keyed by block location and field name.
     """
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.runtime.course_id,
-        location=block.location,
-        student_id=user.id,
-    )
-    overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+    overrides_cache = get_user_request_cache(OVERRIDES_CACHE, user.id)
+    cache_key = unicode(course_id)
+    overrides = overrides_cache.get(cache_key)
+    if overrides is None:
+        overrides = {}
+        query = StudentFieldOverride.objects.filter(
+            course_id=course_id,
+            student_id=user.id,
+        )
+        for override in query:
+            overrides.setdefault(_clean_location(override.location), {})[override.field] = json.loads(override.value)
+        overrides_cache[cache_key] = overrides
     return overrides
 
 
+def _clean_location(location):
+    """
+    Returns the location, without any branch and version information, as
+    stored in the database.
+    """
+    if hasattr(location, 'version_agnostic') and hasattr(location, 'for_branch'):
+        location = location.for_branch(None).version_agnostic()
+    return unicode(location)
+
+
+def _clear_overrides_for_user(user, course_id):
+    """
+    Forgets the overrides loaded for the given user and course, and the
+    override lookups indexed for the current request.
+    """
+    get_user_request_cache(OVERRIDES_CACHE, user.id).pop(unicode(course_id), None)
+    clear_override_index()
+
+
 def override_field_for_user(user, block, name, value):
     """
     Overrides a field for the `user`.  `block` and `name` specify the block
@@ -70,6 +92,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    _clear_overrides_for_user(user, block.runtime.course_id)
 
 
 def clear_override_for_user(user, block, name):
@@ -87,3 +110,4 @@ def clear_override_for_user(user, block, name):
             field=name).delete()
     except StudentFieldOverride.DoesNotExist:
         pass
+    _clear_overrides_for_user(user, block.runtime.course_id)
@@ -3,21 +3,29 @@ Tests for `field_overrides` module.
 """
 # pylint: disable=missing-docstring
 import unittest
+from collections import Counter
+from datetime import datetime
 
 from django.test.utils import override_settings
 from nose.plugins.attrib import attr
+from pytz import UTC
 from xblock.field_data import DictFieldData
 
+import request_cache
+from request_cache.middleware import RequestCache
+from student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
-from xmodule.modulestore.tests.factories import CourseFactory
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 
 from ..field_overrides import (
     FieldOverrideProvider,
     OverrideFieldData,
     OverrideModulestoreFieldData,
+    clear_override_index,
     disable_overrides,
     resolve_dotted
 )
+from ..student_field_overrides import OVERRIDES_CACHE, get_override_for_user, override_field_for_user
 from ..testutils import FieldOverrideTestMixin
 
 TESTUSER = "testuser"
@@ -45,6 +53,31 @@ class TestOverrideProvider(FieldOverrideProvider):
         return True
 
 
+class TestInheritedOverrideProvider(FieldOverrideProvider):
+    """
+    A `FieldOverrideProvider` for testing, which overrides the fields listed
+    in `overrides` and records its lookups.
+    """
+    overrides = {}
+    lookups = []
+
+    def get(self, block, name, default):
+        self.lookups.append((block.location, name))
+        return self.overrides.get((block.location, name), default)
+
+    @classmethod
+    def enabled_for(cls, course):
+        return True
+
+
+class DefaultFieldData(DictFieldData):
+    """
+    A `DictFieldData` with the same default for every field.
+    """
+    def default(self, block, name):
+        return 'default'
+
+
 class OverrideFieldBase(SharedModuleStoreTestCase):
     """
     Base class for field data override tests.  Using override_settings and
@@ -149,6 +182,134 @@ class OverrideModulestoreFieldDataTests(FieldOverrideTestMixin, OverrideFieldDat
         self.assertIsInstance(data, DictFieldData)
 
 
+@attr(shard=1)
+@override_settings(FIELD_OVERRIDE_PROVIDERS=(
+    'courseware.tests.test_field_overrides.TestInheritedOverrideProvider',))
+class OverrideIndexTests(OverrideFieldBase):
+    """
+    Tests for the inheritance of overrides through the per-request index of
+    `OverrideFieldData`.
+    """
+    DUE = datetime(2016, 1, 1, tzinfo=UTC)
+
+    @classmethod
+    def setUpClass(cls):
+        super(OverrideIndexTests, cls).setUpClass()
+        with cls.store.bulk_operations(cls.course.id):
+            cls.chapter = ItemFactory.create(parent=cls.course, category='chapter')
+            cls.sequential = ItemFactory.create(parent=cls.chapter, category='sequential')
+            cls.verticals = [
+                ItemFactory.create(parent=cls.sequential, category='vertical') for __ in range(3)
+            ]
+
+    def setUp(self):
+        super(OverrideIndexTests, self).setUp()
+        OverrideFieldData.provider_classes = None
+        TestInheritedOverrideProvider.overrides = {(self.chapter.location, 'due'): self.DUE}
+        TestInheritedOverrideProvider.lookups = []
+        RequestCache.clear_request_cache()
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def tearDown(self):
+        super(OverrideIndexTests, self).tearDown()
+        OverrideFieldData.provider_classes = None
+
+    def get_blocks(self):
+        """
+        Returns the verticals of the course, loaded from the modulestore.
+        """
+        return [self.store.get_item(vertical.location) for vertical in self.verticals]
+
+    def make_one(self):
+        """
+        Factory method.
+        """
+        return OverrideFieldData.wrap(TESTUSER, self.course, DefaultFieldData({}))
+
+    def test_inherited_override(self):
+        for block in self.get_blocks():
+            data = self.make_one()
+            self.assertEqual(data.default(block, 'due'), self.DUE)
+            self.assertFalse(data.has(block, 'due'))
+
+        # Each ancestor is looked up once for all of the verticals.
+        lookups = Counter(TestInheritedOverrideProvider.lookups)
+        self.assertEqual(lookups[(self.sequential.location, 'due')], 1)
+        self.assertEqual(lookups[(self.chapter.location, 'due')], 1)
+        self.assertEqual(lookups[(self.course.location, 'due')], 0)
+
+    def test_no_inherited_override(self):
+        TestInheritedOverrideProvider.overrides = {}
+        for block in self.get_blocks():
+            self.assertEqual(self.make_one().default(block, 'due'), 'default')
+
+        lookups = Counter(TestInheritedOverrideProvider.lookups)
+        self.assertEqual(lookups[(self.course.location, 'due')], 1)
+
+    def test_overrides_disabled(self):
+        data = self.make_one()
+        block = self.get_blocks()[0]
+        self.assertEqual(data.default(block, 'due'), self.DUE)
+        with disable_overrides():
+            self.assertEqual(data.default(block, 'due'), 'default')
+
+    def test_clear_override_index(self):
+        block = self.get_blocks()[0]
+        self.assertEqual(self.make_one().default(block, 'due'), self.DUE)
+
+        later_due = datetime(2017, 1, 1, tzinfo=UTC)
+        TestInheritedOverrideProvider.overrides = {(self.sequential.location, 'due'): later_due}
+        self.assertEqual(self.make_one().default(block, 'due'), self.DUE)
+        clear_override_index()
+        self.assertEqual(self.make_one().default(block, 'due'), later_due)
+
+
+@attr(shard=1)
+class IndividualStudentOverrideTests(OverrideFieldBase):
+    """
+    Tests for loading individual student overrides.
+    """
+    DUE = datetime(2016, 1, 1, tzinfo=UTC)
+
+    @classmethod
+    def setUpClass(cls):
+        super(IndividualStudentOverrideTests, cls).setUpClass()
+        with cls.store.bulk_operations(cls.course.id):
+            cls.chapter = ItemFactory.create(parent=cls.course, category='chapter')
+            cls.sequentials = [
+                ItemFactory.create(parent=cls.chapter, category='sequential') for __ in range(3)
+            ]
+
+    def setUp(self):
+        super(IndividualStudentOverrideTests, self).setUp()
+        self.user = UserFactory.create()
+        RequestCache.clear_request_cache()
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def test_overrides_loaded_once_per_course(self):
+        override_field_for_user(self.user, self.sequentials[0], 'due', self.DUE)
+        RequestCache.clear_request_cache()
+
+        with self.assertNumQueries(1):
+            dues = [
+                get_override_for_user(self.user, sequential, 'due')
+                for sequential in self.sequentials + [self.chapter]
+            ]
+        self.assertEqual(dues, [self.DUE, None, None, None])
+
+    def test_override_visible_in_same_request(self):
+        self.assertIsNone(get_override_for_user(self.user, self.sequentials[1], 'due'))
+        override_field_for_user(self.user, self.sequentials[1], 'due', self.DUE)
+        self.assertEqual(get_override_for_user(self.user, self.sequentials[1], 'due'), self.DUE)
+
+    def test_only_latest_user_overrides_kept(self):
+        other_user = UserFactory.create()
+        get_override_for_user(self.user, self.sequentials[0], 'due')
+        get_override_for_user(other_user, self.sequentials[0], 'due')
+        # A task going through many users doesn't keep the overrides of each one.
+        self.assertEqual(request_cache.get_cache(OVERRIDES_CACHE).keys(), [other_user.id])
+
+
 @attr(shard=1)
 class ResolveDottedTests(unittest.TestCase):
     """
@@ -6,9 +6,15 @@ defined in edx_user_state_client.
 from collections import defaultdict
 from unittest import skip
 
+import ddt
+from django.db import IntegrityError, connections
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from edx_user_state_client.tests import UserStateClientTestBase
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
 
+from courseware.models import StudentModule
 from courseware.tests.factories import UserFactory
 from courseware.user_state_client import DjangoXBlockUserStateClient
 
@@ -67,3 +73,80 @@ class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
     @skip("Not supported by DjangoXBlockUserStateClient")
     def test_iter_course_many_users(self):
         pass
+
+
+@ddt.ddt
+class TestDjangoUserStateClientSetManyQueries(TestCase):
+    """
+    Counts the queries made by DjangoXBlockUserStateClient.set_many for
+    different numbers of blocks.
+    """
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestDjangoUserStateClientSetManyQueries, self).setUp()
+        self.user = UserFactory.create()
+        self.client = DjangoXBlockUserStateClient(self.user)
+        self.course_key = CourseLocator('org', 'course', 'run')
+
+    def _block_keys_to_state(self, num_blocks, block_type, state):
+        """
+        Return a set_many argument setting ``state`` for ``num_blocks`` blocks.
+        """
+        return {
+            self.course_key.make_usage_key(block_type, 'block_{}'.format(index)): state
+            for index in range(num_blocks)
+        }
+
+    def _count_set_many_queries(self, block_keys_to_state):
+        """
+        Call set_many and return the number of queries it made.
+        """
+        with CaptureQueriesContext(connections['default']) as queries:
+            self.client.set_many(self.user.username, block_keys_to_state)
+        return len(queries)
+
+    @ddt.data(10, 50)
+    def test_query_count_independent_of_block_count(self, num_blocks):
+        # StudentModuleHistory is only written for problems, so use video and
+        # html blocks to count just the StudentModule queries.
+        baseline_created = self._count_set_many_queries(self._block_keys_to_state(1, 'video', {'a': 1}))
+        baseline_updated = self._count_set_many_queries(self._block_keys_to_state(1, 'video', {'b': 2}))
+
+        created = self._count_set_many_queries(self._block_keys_to_state(num_blocks, 'html', {'a': 1}))
+        updated = self._count_set_many_queries(self._block_keys_to_state(num_blocks, 'html', {'b': 2}))
+
+        self.assertEqual(created, baseline_created)
+        self.assertEqual(updated, baseline_updated)
+        self.assertEqual(StudentModule.objects.filter(student=self.user).count(), num_blocks + 1)
+
+    def test_state_is_merged(self):
+        self.client.set_many(self.user.username, self._block_keys_to_state(3, 'problem', {'a': 1}))
+        block_keys_to_state = self._block_keys_to_state(5, 'problem', {'b': 2})
+        self.client.set_many(self.user.username, block_keys_to_state)
+
+        states = {
+            state.block_key.block_id: state.state
+            for state in self.client.get_many(self.user.username, block_keys_to_state.keys())
+        }
+        self.assertEqual(
+            states,
+            {
+                'block_{}'.format(index): {'a': 1, 'b': 2} if index < 3 else {'b': 2}
+                for index in range(5)
+            }
+        )
+
+    def test_bulk_update_integrity_error(self):
+        self.client.set_many(self.user.username, self._block_keys_to_state(3, 'problem', {'a': 1}))
+        block_keys_to_state = self._block_keys_to_state(3, 'problem', {'b': 2})
+        with patch.object(
+            DjangoXBlockUserStateClient, '_bulk_update_student_modules', side_effect=IntegrityError
+        ) as bulk_update:
+            self.client.set_many(self.user.username, block_keys_to_state)
+        self.assertTrue(bulk_update.called)
+
+        # Every row is still written, one at a time.
+        states = [state.state for state in self.client.get_many(self.user.username, block_keys_to_state.keys())]
+        self.assertEqual(states, [{'a': 1, 'b': 2}] * 3)
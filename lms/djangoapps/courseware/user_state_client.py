@@ -10,12 +10,15 @@ from time import time
 
 from django.contrib.auth.models import User
 from django.db import transaction
+from django.db.models import Case, TextField, Value, When
+from django.db.models.signals import post_save
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from edx_user_state_client.interface import XBlockUserState, XBlockUserStateClient
 from xblock.fields import Scope
 
 import dogstats_wrapper as dog_stats_api
-from courseware.models import BaseStudentModuleHistory, StudentModule
+from courseware.models import BaseStudentModuleHistory, StudentModule, chunks
 from openedx.core.djangoapps import monitoring_utils
 
 try:
@@ -50,6 +53,9 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
     # Use this sample rate for DataDog events.
     API_DATADOG_SAMPLE_RATE = 0.1
 
+    # Maximum number of rows changed by each batched UPDATE in set_many.
+    BULK_UPDATE_CHUNK_SIZE = 500
+
     class ServiceUnavailable(XBlockUserStateClient.ServiceUnavailable):
         """
         This error is raised if the service backing this client is currently unavailable.
@@ -236,6 +242,106 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         self._ddog_histogram(evt_time, 'get_many.response_time', duration)
         self._nr_stat_accumulate('get_many', 'duration', duration)
 
+    def _set_student_module(self, user, usage_key, state, block_keys_to_state):
+        """
+        Create or update the :class:`~StudentModule` of a single block, overlaying
+        ``state`` over any stored state.
+
+        Returns:
+            (student_module, created, num_fields_before, num_fields_after)
+        """
+        student_module, created = StudentModule.objects.get_or_create(
+            student=user,
+            course_id=usage_key.course_key,
+            module_state_key=usage_key,
+            defaults={
+                'state': json.dumps(state),
+                'module_type': usage_key.block_type,
+            },
+        )
+
+        num_fields_before = num_fields_after = len(state)
+        if not created:
+            if student_module.state is None:
+                current_state = {}
+            else:
+                current_state = json.loads(student_module.state)
+            num_fields_before = len(current_state)
+            current_state.update(state)
+            num_fields_after = len(current_state)
+            student_module.state = json.dumps(current_state)
+            try:
+                with transaction.atomic():
+                    # Updating the object - force_update guarantees no INSERT will occur.
+                    student_module.save(force_update=True)
+            except IntegrityError:
+                self._log_integrity_error(user, [usage_key], block_keys_to_state)
+
+        return student_module, created, num_fields_before, num_fields_after
+
+    def _bulk_create_student_modules(self, username, modules_to_create):
+        """
+        INSERT all of the new :class:`~StudentModule` rows in ``modules_to_create``
+        (a list of (usage_key, student_module) pairs) with a single query.
+
+        bulk_create doesn't send ``post_save``, so if anything listens for it (e.g.
+        to record StudentModuleHistory), the new rows are read back to get their
+        ids and the signal is sent for each of them.
+        """
+        StudentModule.objects.bulk_create([student_module for __, student_module in modules_to_create])
+        if not post_save.has_listeners(StudentModule):
+            return
+
+        usage_keys = [usage_key for usage_key, __ in modules_to_create]
+        for student_module, __ in self._get_student_modules(username, usage_keys):
+            post_save.send(
+                sender=StudentModule, instance=student_module, created=True,
+                update_fields=None, raw=False, using=student_module._state.db,  # pylint: disable=protected-access
+            )
+
+    def _bulk_update_student_modules(self, modules_to_update):
+        """
+        UPDATE the state of all of the existing :class:`~StudentModule` rows in
+        ``modules_to_update`` (a list of (usage_key, student_module) pairs) with a
+        single batched query, then send ``post_save`` for each of them as
+        ``save()`` would have.
+        """
+        modified = timezone.now()
+        for __, student_module in modules_to_update:
+            student_module.modified = modified
+
+        with transaction.atomic():
+            for chunk in chunks(modules_to_update, self.BULK_UPDATE_CHUNK_SIZE):
+                new_states = [
+                    When(id=student_module.id, then=Value(student_module.state))
+                    for __, student_module in chunk
+                ]
+                StudentModule.objects.filter(
+                    id__in=[student_module.id for __, student_module in chunk]
+                ).update(
+                    state=Case(*new_states, output_field=TextField()),
+                    modified=modified,
+                )
+
+        for __, student_module in modules_to_update:
+            post_save.send(
+                sender=StudentModule, instance=student_module, created=False,
+                update_fields=None, raw=False, using=student_module._state.db,  # pylint: disable=protected-access
+            )
+
+    def _log_integrity_error(self, user, usage_keys, block_keys_to_state):
+        """
+        Log (and otherwise ignore) an IntegrityError raised while updating state.
+        See https://openedx.atlassian.net/browse/TNL-5365
+        """
+        for usage_key in usage_keys:
+            log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
+                user, repr(unicode(usage_key.course_key)), usage_key
+            ))
+        log.warning("set_many: All {} block keys: {}".format(
+            len(block_keys_to_state), block_keys_to_state.keys()
+        ))
+
     def set_many(self, username, block_keys_to_state, scope=Scope.user_state):
         """
         Set fields for a particular XBlock.
@@ -254,7 +360,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         # count how many times this function gets called
         self._nr_stat_increment('set_many', 'calls')
 
-        # We do a find_or_create for every block (rather than re-using field objects
+        # We re-read the row of every block (rather than re-using field objects
         # that were queried in get_many) so that if the score has
         # been changed by some other piece of the code, we don't overwrite
         # that score.
@@ -270,41 +376,64 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         evt_time = time()
 
-        for usage_key, state in block_keys_to_state.items():
-            student_module, created = StudentModule.objects.get_or_create(
-                student=user,
-                course_id=usage_key.course_key,
-                module_state_key=usage_key,
-                defaults={
-                    'state': json.dumps(state),
-                    'module_type': usage_key.block_type,
-                },
-            )
+        # Fetch every existing row in one query (per course), merge state in
+        # Python, then write all new rows with a single bulk INSERT and all
+        # changed rows with a single batched UPDATE.
+        existing_modules = {
+            usage_key: student_module
+            for student_module, usage_key in self._get_student_modules(username, block_keys_to_state.keys())
+        }
+        block_results = {}
+        modules_to_create = []
+        modules_to_update = []
 
-            num_fields_before = num_fields_after = num_new_fields_set = len(state)
-            num_fields_updated = 0
-            if not created:
-                if student_module.state is None:
-                    current_state = {}
-                else:
-                    current_state = json.loads(student_module.state)
+        for usage_key, state in block_keys_to_state.items():
+            student_module = existing_modules.get(usage_key)
+            if student_module is None:
+                student_module = StudentModule(
+                    student=user,
+                    course_id=usage_key.course_key,
+                    module_state_key=usage_key,
+                    state=json.dumps(state),
+                    module_type=usage_key.block_type,
+                )
+                modules_to_create.append((usage_key, student_module))
+                block_results[usage_key] = (student_module, True, len(state), len(state))
+            else:
+                current_state = {} if student_module.state is None else json.loads(student_module.state)
                 num_fields_before = len(current_state)
                 current_state.update(state)
-                num_fields_after = len(current_state)
                 student_module.state = json.dumps(current_state)
-                try:
-                    with transaction.atomic():
-                        # Updating the object - force_update guarantees no INSERT will occur.
-                        student_module.save(force_update=True)
-                except IntegrityError:
-                    # The UPDATE above failed. Log information - but ignore the error.
-                    # See https://openedx.atlassian.net/browse/TNL-5365
-                    log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
-                        user, repr(unicode(usage_key.course_key)), usage_key
-                    ))
-                    log.warning("set_many: All {} block keys: {}".format(
-                        len(block_keys_to_state), block_keys_to_state.keys()
-                    ))
+                modules_to_update.append((usage_key, student_module))
+                block_results[usage_key] = (student_module, False, num_fields_before, len(current_state))
+
+        if modules_to_create:
+            try:
+                with transaction.atomic():
+                    self._bulk_create_student_modules(username, modules_to_create)
+            except IntegrityError:
+                # Another request created some of these rows after we looked for them.
+                # Fall back to creating or updating each row individually.
+                log.info("set_many: IntegrityError on bulk create for student {}; retrying row by row".format(user))
+                for usage_key, __ in modules_to_create:
+                    block_results[usage_key] = self._set_student_module(
+                        user, usage_key, block_keys_to_state[usage_key], block_keys_to_state
+                    )
+
+        if modules_to_update:
+            try:
+                self._bulk_update_student_modules(modules_to_update)
+            except IntegrityError:
+                # Fall back to updating each row individually, so that only the
+                # rows that really fail are left unwritten.
+                log.info("set_many: IntegrityError on bulk update for student {}; retrying row by row".format(user))
+                for usage_key, __ in modules_to_update:
+                    block_results[usage_key] = self._set_student_module(
+                        user, usage_key, block_keys_to_state[usage_key], block_keys_to_state
+                    )
+
+        for usage_key, state in block_keys_to_state.items():
+            student_module, created, num_fields_before, num_fields_after = block_results[usage_key]
 
             # DataDog and New Relic reporting
 
@@ -206,7 +206,7 @@ def inline_discussion(request, course_key, discussion_id):
         annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
 
     is_staff = has_permission(request.user, 'openclose_thread', course.id)
-    threads = [utils.prepare_content(thread, course_key, is_staff) for thread in threads]
+    threads = utils.prepare_content_list(threads, course_key, is_staff)
     with function_trace("add_courseware_context"):
         add_courseware_context(threads, course, request.user)
     course_discussion_settings = get_course_discussion_settings(course.id)
@@ -238,7 +238,7 @@ def forum_form_discussion(request, course_key):
         try:
             unsafethreads, query_params = get_threads(request, course, user_info)  # This might process a search query
             is_staff = has_permission(request.user, 'openclose_thread', course.id)
-            threads = [utils.prepare_content(thread, course_key, is_staff) for thread in unsafethreads]
+            threads = utils.prepare_content_list(unsafethreads, course_key, is_staff)
         except cc.utils.CommentClientMaintenanceError:
             return HttpResponseServerError('Forum is in maintenance mode', status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except ValueError:
@@ -445,7 +445,7 @@ def _create_discussion_board_context(request, base_context, thread=None):
         thread_pages = query_params['num_pages']
         root_url = request.path
     is_staff = has_permission(user, 'openclose_thread', course.id)
-    threads = [utils.prepare_content(thread, course_key, is_staff) for thread in threads]
+    threads = utils.prepare_content_list(threads, course_key, is_staff)
 
     with function_trace("get_metadata_for_threads"):
         annotated_content_info = utils.get_metadata_for_threads(course_key, threads, user, user_info)
@@ -524,7 +524,7 @@ def user_profile(request, course_key, user_id):
             annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
 
         is_staff = has_permission(request.user, 'openclose_thread', course.id)
-        threads = [utils.prepare_content(thread, course_key, is_staff) for thread in threads]
+        threads = utils.prepare_content_list(threads, course_key, is_staff)
         with function_trace("add_courseware_context"):
             add_courseware_context(threads, course, request.user)
         if request.is_ajax():
@@ -618,9 +618,7 @@ def followed_threads(request, course_key, user_id):
             is_staff = has_permission(request.user, 'openclose_thread', course.id)
             return utils.JsonResponse({
                 'annotated_content_info': annotated_content_info,
-                'discussion_data': [
-                    utils.prepare_content(thread, course_key, is_staff) for thread in paginated_results.collection
-                ],
+                'discussion_data': utils.prepare_content_list(paginated_results.collection, course_key, is_staff),
                 'page': query_params['page'],
                 'num_pages': query_params['num_pages'],
             })
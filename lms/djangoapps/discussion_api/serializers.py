@@ -54,9 +54,38 @@ def get_context(course, request, thread=None):
         "staff_user_ids": staff_user_ids,
         "ta_user_ids": ta_user_ids,
         "cc_requester": cc_requester,
+        "usernames_by_id": {},
     }
 
 
+def load_endorsers(context, comments):
+    """
+    Loads the usernames of the users who endorsed any of the given comments
+    or of their children into the context, with a single query, so that
+    serializing the comment tree does not look them up one by one.
+    """
+    endorser_ids = set()
+    pending = list(comments)
+    while pending:
+        comment = pending.pop()
+        endorsement = comment.get("endorsement")
+        if endorsement:
+            endorser_ids.add(int(endorsement["user_id"]))
+        pending.extend(comment.get("children", []))
+    _load_usernames(context, endorser_ids)
+
+
+def _load_usernames(context, user_ids):
+    """
+    Adds the usernames of the given users that the context does not have yet
+    to its usernames_by_id map.
+    """
+    usernames_by_id = context["usernames_by_id"]
+    missing_ids = set(user_ids).difference(usernames_by_id)
+    if missing_ids:
+        usernames_by_id.update(DjangoUser.objects.filter(id__in=missing_ids).values_list("id", "username"))
+
+
 def validate_not_blank(value):
     """
     Validate that a value is not an empty string or whitespace.
@@ -333,7 +362,8 @@ class CommentSerializer(_ContentSerializer):
                     self._is_anonymous(self.context["thread"]) and
                     not self._is_user_privileged(endorser_id)
             ):
-                return DjangoUser.objects.get(id=endorser_id).username
+                _load_usernames(self.context, [endorser_id])
+                return self.context["usernames_by_id"].get(endorser_id)
         return None
 
     def get_endorsed_by_label(self, obj):
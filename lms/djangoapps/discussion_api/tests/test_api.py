@@ -10,7 +10,9 @@ import ddt
 import httpretty
 import mock
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
 from nose.plugins.attrib import attr
 from opaque_keys.edx.locator import CourseLocator
 from pytz import UTC
@@ -1288,6 +1290,53 @@ class GetCommentListTest(ForumsEnableMixin, CommentsServiceMockMixin, SharedModu
         actual_comments = self.get_comment_list(thread).data["results"]
         self.assertIsNone(actual_comments[0]["endorsed_by"])
 
+    def make_endorsed_responses(self, count):
+        """
+        Returns `count` responses, each endorsed by a different user and with
+        a child comment endorsed by yet another user, along with the
+        usernames of the endorsers of each response and its child.
+        """
+        responses = []
+        endorsers = []
+        for index in range(count):
+            response_endorser, child_endorser = UserFactory.create(), UserFactory.create()
+            child = make_minimal_cs_comment({
+                "id": "child_{}".format(index),
+                "endorsed": True,
+                "endorsement": {"user_id": str(child_endorser.id), "time": "2015-05-18T12:34:56Z"},
+            })
+            responses.append(make_minimal_cs_comment({
+                "id": "response_{}".format(index),
+                "endorsed": True,
+                "endorsement": {"user_id": str(response_endorser.id), "time": "2015-05-18T12:34:56Z"},
+                "child_count": 1,
+                "children": [child],
+            }))
+            endorsers.append((response_endorser.username, child_endorser.username))
+        return responses, endorsers
+
+    @ddt.data(1, 5)
+    def test_endorsers_loaded_in_bulk(self, response_count):
+        def get_comments(responses):
+            """
+            Gets a page of the given responses.
+            """
+            thread = self.make_minimal_cs_thread({"children": responses, "resp_total": len(responses)})
+            return self.get_comment_list(thread, page_size=len(responses)).data["results"]
+
+        # Fill the caches before counting queries.
+        get_comments(self.make_endorsed_responses(1)[0])
+        with CaptureQueriesContext(connection) as queries:
+            get_comments(self.make_endorsed_responses(1)[0])
+
+        responses, endorsers = self.make_endorsed_responses(response_count)
+        with self.assertNumQueries(len(queries.captured_queries)):
+            comments = get_comments(responses)
+        self.assertEqual(
+            [(comment["endorsed_by"], comment["children"][0]["endorsed_by"]) for comment in comments],
+            endorsers,
+        )
+
     @ddt.data(
         ("discussion", None, "children", "resp_total"),
         ("question", False, "non_endorsed_responses", "non_endorsed_resp_total"),
@@ -727,8 +727,78 @@ def prepare_content(content, course_key, is_staff=False, discussion_division_ena
         course_key (CourseKey): The course key of the course.
         is_staff (bool): Whether the user is a staff member.
         discussion_division_enabled (bool): Whether division of course discussions is enabled.
-           Note that callers of this method do not need to provide this value (it defaults to None)--
-           it is calculated and then passed to recursive calls of this method.
+           Callers of this method do not need to provide this value (it defaults to None),
+           in which case it is calculated.
+    """
+    return prepare_content_list([content], course_key, is_staff, discussion_division_enabled)[0]
+
+
+def prepare_content_list(content_list, course_key, is_staff=False, discussion_division_enabled=None):
+    """
+    Pre-processes each of the threads or comments in `content_list` like
+    `prepare_content`.
+
+    The endorsers and group names needed by all of the content and its
+    responses are loaded at once, so that preparing a page of threads or a
+    comment tree takes the same number of queries whatever its size.
+
+    Arguments:
+        content_list (list[dict]): Threads or comments.
+        course_key (CourseKey): The course key of the course.
+        is_staff (bool): Whether the user is a staff member.
+        discussion_division_enabled (bool): Whether division of course discussions is enabled.
+           If not provided, it is calculated.
+    """
+    course_discussion_settings = get_course_discussion_settings(course_key)
+    if discussion_division_enabled is None:
+        discussion_division_enabled = course_discussion_division_enabled(course_discussion_settings)
+
+    endorser_ids = set()
+    has_group_ids = False
+    for content in _iter_content_trees(content_list):
+        endorsement = content.get('endorsement')
+        if endorsement and endorsement.get('user_id'):
+            endorser_ids.add(int(endorsement['user_id']))
+        has_group_ids = has_group_ids or content.get('group_id') is not None
+
+    endorsers = User.objects.in_bulk(endorser_ids) if endorser_ids else {}
+    if discussion_division_enabled and has_group_ids:
+        group_names_by_id = get_group_names_by_id(course_discussion_settings)
+    else:
+        group_names_by_id = {}
+
+    return [
+        _prepare_content(
+            content,
+            course_key,
+            is_staff,
+            discussion_division_enabled,
+            course_discussion_settings,
+            endorsers,
+            group_names_by_id,
+        )
+        for content in content_list
+    ]
+
+
+def _iter_content_trees(content_list):
+    """
+    Yields the threads or comments in `content_list` and all of their responses.
+    """
+    for content in content_list:
+        yield content
+        for child_content_key in ["children", "endorsed_responses", "non_endorsed_responses"]:
+            for child in _iter_content_trees(content.get(child_content_key) or []):
+                yield child
+
+
+def _prepare_content(
+        content, course_key, is_staff, discussion_division_enabled, course_discussion_settings, endorsers,
+        group_names_by_id,
+):
+    """
+    Pre-processes a thread or comment for `prepare_content_list`, with the
+    endorsing users keyed by id and the group names keyed by group id.
     """
     fields = [
         'id', 'title', 'body', 'course_id', 'anonymous', 'anonymous_to_peers',
@@ -751,9 +821,8 @@ def prepare_content(content, course_key, is_staff=False, discussion_division_ena
         endorsement = content["endorsement"]
         endorser = None
         if endorsement["user_id"]:
-            try:
-                endorser = User.objects.get(pk=endorsement["user_id"])
-            except User.DoesNotExist:
+            endorser = endorsers.get(int(endorsement["user_id"]))
+            if endorser is None:
                 log.error(
                     "User ID %s in endorsement for comment %s but not in our DB.",
                     content.get('user_id'),
@@ -769,13 +838,18 @@ def prepare_content(content, course_key, is_staff=False, discussion_division_ena
         else:
             del endorsement["user_id"]
 
-    if discussion_division_enabled is None:
-        discussion_division_enabled = course_discussion_division_enabled(get_course_discussion_settings(course_key))
-
     for child_content_key in ["children", "endorsed_responses", "non_endorsed_responses"]:
         if child_content_key in content:
             children = [
-                prepare_content(child, course_key, is_staff, discussion_division_enabled=discussion_division_enabled)
+                _prepare_content(
+                    child,
+                    course_key,
+                    is_staff,
+                    discussion_division_enabled,
+                    course_discussion_settings,
+                    endorsers,
+                    group_names_by_id,
+                )
                 for child in content[child_content_key]
             ]
             content[child_content_key] = children
@@ -783,8 +857,7 @@ def prepare_content(content, course_key, is_staff=False, discussion_division_ena
     if discussion_division_enabled:
         # Augment the specified thread info to include the group name if a group id is present.
         if content.get('group_id') is not None:
-            course_discussion_settings = get_course_discussion_settings(course_key)
-            content['group_name'] = get_group_name(content.get('group_id'), course_discussion_settings)
+            content['group_name'] = group_names_by_id.get(content.get('group_id'))
             content['is_commentable_divided'] = is_commentable_divided(
                 course_key, content['commentable_id'], course_discussion_settings
             )
@@ -1,4 +1,5 @@
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 import dogstats_wrapper as dog_stats_api
@@ -8,7 +9,8 @@ from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED, COURSE
 from .config import assume_zero_if_absent, should_persist_grades
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
-from .models import PersistentCourseGrade, prefetch
+from .models import PersistentCourseGrade, bulk_prefetch, clear_prefetched_data, prefetch
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -19,6 +21,9 @@ class CourseGradeFactory(object):
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of users whose grade data is prefetched together by iter.
+    USER_BATCH_SIZE = 100
+
     def read(
             self,
             user,
@@ -84,6 +89,10 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        Students are graded in batches of USER_BATCH_SIZE.  The persisted
+        grades and scores of each batch are prefetched with a constant number
+        of queries, rather than queried for each student.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
@@ -94,9 +103,43 @@ class CourseGradeFactory(object):
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
-        for user in users:
-            with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
-                yield self._iter_grade_result(user, course_data, force_update)
+        users = iter(users)
+        while True:
+            user_batch = list(islice(users, self.USER_BATCH_SIZE))
+            if not user_batch:
+                break
+            with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter.prefetch', tags=stats_tags):
+                self._prefetch(user_batch, course_data, force_update)
+            try:
+                for user in user_batch:
+                    with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
+                        yield self._iter_grade_result(user, course_data, force_update)
+            finally:
+                self._clear_prefetched(course_data)
+
+    def _prefetch(self, users, course_data, force_update):
+        """
+        Prefetches the grade data of the given batch of users in the course.
+        If prefetching fails, the data is queried for each user instead.
+        """
+        course_key = course_data.course_key
+        try:
+            if should_persist_grades(course_key):
+                bulk_prefetch(users, course_key, include_overrides=force_update)
+            if not assume_zero_if_absent(course_key):
+                SubsectionGradeFactory.prefetch_scores(course_data, users)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u'Grades: failed to prefetch grade data for course %s', course_key)
+            self._clear_prefetched(course_data)
+
+    @staticmethod
+    def _clear_prefetched(course_data):
+        """
+        Clears the grade data prefetched for the last batch of users, so
+        it isn't mistaken for the data of any other user.
+        """
+        clear_prefetched_data(course_data.course_key)
+        SubsectionGradeFactory.clear_prefetched_scores(course_data.course_key)
 
     def _iter_grade_result(self, user, course_data, force_update):
         try:
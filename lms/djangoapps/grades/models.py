@@ -296,6 +296,8 @@ class PersistentSubsectionGrade(TimeStampedModel):
     # track which blocks were visible at the time of grade calculation
     visible_blocks = models.ForeignKey(VisibleBlocks, db_column='visible_blocks_hash', to_field='hashed')
 
+    _CACHE_NAMESPACE = u'grades.models.PersistentSubsectionGrade'
+
     @property
     def full_usage_key(self):
         """
@@ -342,6 +344,26 @@ class PersistentSubsectionGrade(TimeStampedModel):
             usage_key=usage_key,
         )
 
+    @classmethod
+    def prefetch(cls, course_key, users):
+        """
+        Prefetches all grades for the given users in the given course.
+        """
+        prefetched_grades = {user.id: [] for user in users}
+        for grade in cls.objects.select_related('visible_blocks', 'override').filter(
+                user_id__in=prefetched_grades.keys(),
+                course_id=course_key,
+        ):
+            prefetched_grades[grade.user_id].append(grade)
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_key)] = prefetched_grades
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key):
+        """
+        Clears grades prefetched for the given course.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+
     @classmethod
     def bulk_read_grades(cls, user_id, course_key):
         """
@@ -351,6 +373,9 @@ class PersistentSubsectionGrade(TimeStampedModel):
             user_id: The user associated with the desired grades
             course_key: The course identifier for the desired grades
         """
+        prefetched_grades = get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(course_key), {})
+        if user_id in prefetched_grades:
+            return prefetched_grades[user_id]
         return cls.objects.select_related('visible_blocks', 'override').filter(
             user_id=user_id,
             course_id=course_key,
@@ -440,6 +465,10 @@ class PersistentSubsectionGrade(TimeStampedModel):
             if override.possible_graded_override is not None:
                 params['possible_graded'] = override.possible_graded_override
 
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"subsection_grades_cache.{}".format(course_key)
+
     @staticmethod
     def _emit_grade_calculated_event(grade):
         events.subsection_grade_calculated(grade)
@@ -510,6 +539,27 @@ class PersistentCourseGrade(TimeStampedModel):
             cls.objects.filter(user_id__in=[user.id for user in users], course_id=course_id)
         }
 
+    @classmethod
+    def prefetch_for_courses(cls, user, course_ids):
+        """
+        Prefetches the grades of the given user for the given courses.
+        """
+        grades = {
+            grade.course_id: grade
+            for grade in cls.objects.filter(user_id=user.id, course_id__in=course_ids)
+        }
+        for course_id in course_ids:
+            get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_id)] = (
+                {user.id: grades[course_id]} if course_id in grades else {}
+            )
+
+    @classmethod
+    def clear_prefetched_data(cls, course_id):
+        """
+        Clears grades prefetched for the given course.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_id), None)
+
     @classmethod
     def read(cls, user_id, course_id):
         """
@@ -596,12 +646,46 @@ class PersistentSubsectionGradeOverride(models.Model):
 
     @classmethod
     def prefetch(cls, user_id, course_key):
+        if user_id in get_cache(cls._CACHE_NAMESPACE).get(cls._bulk_cache_key(course_key), ()):
+            # already prefetched along with the rest of its batch by bulk_prefetch
+            return
         get_cache(cls._CACHE_NAMESPACE)[(user_id, str(course_key))] = {
             override.grade.usage_key: override
             for override in
             cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
         }
 
+    @classmethod
+    def bulk_prefetch(cls, user_ids, course_key):
+        """
+        Prefetches the overrides of all the given users in the given course
+        with a single query.  Until clear_prefetched_data is called, calls
+        to prefetch for these users reuse the prefetched overrides.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        prefetched_overrides = {user_id: {} for user_id in user_ids}
+        for override in cls.objects.select_related('grade').filter(
+                grade__user_id__in=prefetched_overrides.keys(),
+                grade__course_id=course_key,
+        ):
+            prefetched_overrides[override.grade.user_id][override.grade.usage_key] = override
+        for user_id, overrides in prefetched_overrides.iteritems():
+            cache[(user_id, str(course_key))] = overrides
+        cache[cls._bulk_cache_key(course_key)] = set(prefetched_overrides)
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key):
+        """
+        Clears overrides prefetched for the given course by bulk_prefetch.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user_id in cache.pop(cls._bulk_cache_key(course_key), ()):
+            cache.pop((user_id, str(course_key)), None)
+
+    @classmethod
+    def _bulk_cache_key(cls, course_key):
+        return u"bulk_prefetched_users.{}".format(course_key)
+
     @classmethod
     def get_override(cls, user_id, usage_key):
         prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
@@ -620,3 +704,26 @@ class PersistentSubsectionGradeOverride(models.Model):
 def prefetch(user, course_key):
     PersistentSubsectionGradeOverride.prefetch(user.id, course_key)
     VisibleBlocks.bulk_read(course_key)
+
+
+def bulk_prefetch(users, course_key, include_overrides=False):
+    """
+    Prefetches the persisted course and subsection grades (or, if
+    include_overrides, the subsection grade overrides) of all the given
+    users in the course, with one query each.
+    """
+    if include_overrides:
+        PersistentSubsectionGradeOverride.bulk_prefetch([user.id for user in users], course_key)
+        VisibleBlocks.bulk_read(course_key)
+    else:
+        PersistentCourseGrade.prefetch(course_key, users)
+        PersistentSubsectionGrade.prefetch(course_key, users)
+
+
+def clear_prefetched_data(course_key):
+    """
+    Clears the data prefetched by bulk_prefetch for the given course.
+    """
+    PersistentCourseGrade.clear_prefetched_data(course_key)
+    PersistentSubsectionGrade.clear_prefetched_data(course_key)
+    PersistentSubsectionGradeOverride.clear_prefetched_data(course_key)
@@ -1,4 +1,4 @@
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 from logging import getLogger
 
 from lazy import lazy
@@ -8,8 +8,10 @@ from lms.djangoapps.grades.config import assume_zero_if_absent, should_persist_g
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
-from student.models import anonymous_id_for_user
+from request_cache import get_cache
+from student.models import AnonymousUserId, anonymous_id_for_user
 from submissions import api as submissions_api
+from submissions.models import Score
 
 from .course_data import CourseData
 from .subsection_grade import CreateSubsectionGrade, ReadSubsectionGrade, ZeroSubsectionGrade
@@ -21,6 +23,8 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
+    _CACHE_NAMESPACE = u'grades.subsection_grade_factory.SubsectionGradeFactory'
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -94,12 +98,73 @@ class SubsectionGradeFactory(object):
 
         return calculated_grade
 
+    @classmethod
+    def prefetch_scores(cls, course_data, users):
+        """
+        Prefetches the scores stored in CSM and by the Submissions API
+        for all the given users in the course, with one query each.
+        Users who have several anonymous ids in the course (after a
+        SECRET_KEY change) are still queried through the Submissions
+        API by each factory, which uses their current anonymous id.
+        Factories for these users use the prefetched scores until
+        clear_prefetched_scores is called.
+        """
+        course_key = course_data.course_key
+        scorable_locations = [
+            block_key for block_key in course_data.collected_structure if possibly_scored(block_key)
+        ]
+        csm_scores = ScoresClient.create_for_locations_and_users(
+            course_key, [user.id for user in users], scorable_locations,
+        )
+
+        anonymous_ids = defaultdict(list)
+        for user_id, anonymous_user_id in AnonymousUserId.objects.filter(
+                user_id__in=[user.id for user in users], course_id=course_key,
+        ).values_list('user_id', 'anonymous_user_id'):
+            anonymous_ids[user_id].append(anonymous_user_id)
+        submissions_scores = _get_submissions_scores_for_users(course_key, {
+            user_anonymous_ids[0]: user_id
+            for user_id, user_anonymous_ids in anonymous_ids.iteritems()
+            if len(user_anonymous_ids) == 1
+        })
+
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_key)] = {
+            user.id: (
+                csm_scores[user.id],
+                None if len(anonymous_ids.get(user.id, ())) > 1 else submissions_scores.get(user.id, {}),
+            )
+            for user in users
+        }
+
+    @classmethod
+    def clear_prefetched_scores(cls, course_key):
+        """
+        Clears the scores prefetched for the given course.
+        """
+        get_cache(cls._CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"scores_cache.{}".format(course_key)
+
+    def _prefetched_scores(self):
+        """
+        Returns the (csm_scores, submissions_scores) prefetched for the
+        student, or None if they weren't prefetched.  submissions_scores
+        is None if they have to be queried.
+        """
+        prefetched = get_cache(self._CACHE_NAMESPACE).get(self._cache_key(self.course_data.course_key), {})
+        return prefetched.get(self.student.id)
+
     @lazy
     def _csm_scores(self):
         """
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        prefetched = self._prefetched_scores()
+        if prefetched is not None:
+            return prefetched[0]
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -109,6 +174,9 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        prefetched = self._prefetched_scores()
+        if prefetched is not None and prefetched[1] is not None:
+            return prefetched[1]
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
@@ -157,3 +225,38 @@ class SubsectionGradeFactory(object):
             getattr(subsection, 'subtree_edited_on', None),
             self.student.id,
         ))
+
+
+def _get_submissions_scores_for_users(course_key, users_by_anonymous_id):
+    """
+    Returns the scores stored by the Submissions API in the course for
+    the given anonymous ids, with one query, as a map of user id to the
+    map of item id to score that submissions_api.get_scores returns for
+    each of them.  Like get_scores, only the latest score of each item
+    is returned, unless it is hidden.  Scores only have the fields read
+    by the grades app.
+    """
+    scores = defaultdict(dict)
+    if not users_by_anonymous_id:
+        return scores
+
+    latest_scores = {}
+    # Scores are created in order, so the latest score of each item is
+    # its last one, as in the ScoreSummary the Submissions API maintains.
+    for student_id, item_id, points_earned, points_possible, created_at in Score.objects.filter(
+            student_item__course_id=unicode(course_key),
+            student_item__student_id__in=users_by_anonymous_id.keys(),
+    ).order_by('id').values_list(
+        'student_item__student_id', 'student_item__item_id', 'points_earned', 'points_possible', 'created_at',
+    ):
+        latest_scores[(student_id, item_id)] = {
+            'points_earned': points_earned,
+            'points_possible': points_possible,
+            'created_at': created_at,
+        }
+
+    for (student_id, item_id), score in latest_scores.iteritems():
+        # By convention, 0/0 scores are hidden by the Submissions API.
+        if score['points_possible'] != 0:
+            scores[users_by_anonymous_id[student_id]][item_id] = score
+    return scores
@@ -4,6 +4,8 @@ from nose.plugins.attrib import attr
 import ddt
 from courseware.access import has_access
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from mock import patch
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
@@ -300,7 +302,7 @@ class TestGradeIteration(SharedModuleStoreTestCase):
             else mock_course_grade.return_value
             for student in self.students
         ]
-        with self.assertNumQueries(4):
+        with self.assertNumQueries(6):
             all_course_grades, all_errors = self._course_grades_and_errors_for(self.course, self.students)
         self.assertEqual(
             {student: all_errors[student].message for student in all_errors},
@@ -322,6 +324,23 @@ class TestGradeIteration(SharedModuleStoreTestCase):
         self.assertIsNotNone(all_course_grades[student2])
         self.assertIsNotNone(all_course_grades[student5])
 
+    def test_query_count_independent_of_students(self):
+        """
+        Test that the grades of all students in a batch are read with a
+        constant number of queries.
+        """
+        def _num_queries(students):
+            """
+            Returns the number of queries made to grade the given students.
+            """
+            with CaptureQueriesContext(connection) as queries:
+                self._course_grades_and_errors_for(self.course, students)
+            return len(queries)
+
+        # warm up caches that aren't specific to the students
+        _num_queries(self.students[:1])
+        self.assertEqual(_num_queries(self.students[:1]), _num_queries(self.students))
+
     def _course_grades_and_errors_for(self, course, students):
         """
         Simple helper method to iterate through student grades and give us
@@ -13,7 +13,7 @@ from django.db.utils import IntegrityError
 from django.test import TestCase
 from django.utils.timezone import now
 from freezegun import freeze_time
-from mock import patch
+from mock import Mock, patch
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 
 from lms.djangoapps.grades.models import (
@@ -294,6 +294,38 @@ class PersistentSubsectionGradeTest(GradesModelTestCase):
         self.assertEqual(grade.earned_all, 0.0)
         self.assertEqual(grade.earned_graded, 0.0)
 
+    def test_prefetch(self):
+        grade = PersistentSubsectionGrade.update_or_create_grade(**self.params)
+        other_user_id = self.params['user_id'] + 1
+
+        users = [Mock(id=grade.user_id), Mock(id=other_user_id)]
+
+        with self.assertNumQueries(1):
+            PersistentSubsectionGrade.prefetch(self.course_key, users)
+        with self.assertNumQueries(0):
+            self.assertEqual(list(PersistentSubsectionGrade.bulk_read_grades(grade.user_id, self.course_key)), [grade])
+            self.assertEqual(list(PersistentSubsectionGrade.bulk_read_grades(other_user_id, self.course_key)), [])
+
+        PersistentSubsectionGrade.clear_prefetched_data(self.course_key)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(PersistentSubsectionGrade.bulk_read_grades(grade.user_id, self.course_key)), [grade])
+
+    def test_bulk_prefetch_overrides(self):
+        grade = PersistentSubsectionGrade.update_or_create_grade(**self.params)
+        override = PersistentSubsectionGradeOverride.objects.create(grade=grade, earned_all_override=0.0)
+        other_user_id = self.params['user_id'] + 1
+
+        with self.assertNumQueries(1):
+            PersistentSubsectionGradeOverride.bulk_prefetch([grade.user_id, other_user_id], self.course_key)
+        with self.assertNumQueries(0):
+            PersistentSubsectionGradeOverride.prefetch(grade.user_id, self.course_key)
+            self.assertEqual(PersistentSubsectionGradeOverride.get_override(grade.user_id, self.usage_key), override)
+            self.assertIsNone(PersistentSubsectionGradeOverride.get_override(other_user_id, self.usage_key))
+
+        PersistentSubsectionGradeOverride.clear_prefetched_data(self.course_key)
+        with self.assertNumQueries(1):
+            self.assertEqual(PersistentSubsectionGradeOverride.get_override(grade.user_id, self.usage_key), override)
+
     def _assert_tracker_emitted_event(self, tracker_mock, grade):
         """
         Helper function to ensure that the mocked event tracker
@@ -434,6 +466,21 @@ class PersistentCourseGradesTest(GradesModelTestCase):
         with self.assertRaises(PersistentCourseGrade.DoesNotExist):
             PersistentCourseGrade.read(self.params["user_id"], self.params["course_id"])
 
+    def test_prefetch_for_courses(self):
+        grade = PersistentCourseGrade.update_or_create(**self.params)
+        other_course_key = self.course_key.replace(run='other_run')
+
+        with self.assertNumQueries(1):
+            PersistentCourseGrade.prefetch_for_courses(Mock(id=grade.user_id), [self.course_key, other_course_key])
+        with self.assertNumQueries(0):
+            self.assertEqual(PersistentCourseGrade.read(grade.user_id, self.course_key), grade)
+            with self.assertRaises(PersistentCourseGrade.DoesNotExist):
+                PersistentCourseGrade.read(grade.user_id, other_course_key)
+
+        PersistentCourseGrade.clear_prefetched_data(self.course_key)
+        with self.assertNumQueries(1):
+            self.assertEqual(PersistentCourseGrade.read(grade.user_id, self.course_key), grade)
+
     def test_update_or_create_event(self):
         with patch('lms.djangoapps.grades.events.tracker') as tracker_mock:
             grade = PersistentCourseGrade.update_or_create(**self.params)
@@ -1,11 +1,15 @@
 import ddt
 from courseware.tests.test_submitting_problems import ProblemSubmissionTestMixin
 from django.conf import settings
+from django.contrib.auth.models import User
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from mock import patch
+from student.models import AnonymousUserId, anonymous_id_for_user
+from student.tests.factories import UserFactory
+from submissions import api as submissions_api
 
 from ..models import PersistentSubsectionGrade
-from ..subsection_grade_factory import ZeroSubsectionGrade
+from ..subsection_grade_factory import SubsectionGradeFactory, ZeroSubsectionGrade
 from .base import GradeTestBase
 from .utils import mock_get_score
 
@@ -99,3 +103,63 @@ class TestSubsectionGradeFactory(ProblemSubmissionTestMixin, GradeTestBase):
             ):
                 self.subsection_grade_factory.create(self.sequence)
         self.assertEqual(mock_read_saved_grade.called, feature_flag and course_setting)
+
+    def _create_submissions_score(self, user, item_id, points_earned, points_possible):
+        """
+        Creates a score for the user and item through the submissions API.
+        """
+        submission = submissions_api.create_submission(
+            {
+                'student_id': anonymous_id_for_user(user, self.course.id),
+                'course_id': unicode(self.course.id),
+                'item_id': item_id,
+                'item_type': 'openassessment',
+            },
+            'answer',
+        )
+        submissions_api.set_score(submission['uuid'], points_earned, points_possible)
+
+    @patch('lms.djangoapps.grades.subsection_grade_factory.submissions_api.get_scores')
+    def test_prefetch_scores(self, mock_get_scores):
+        users = [User.objects.get(id=self.request.user.id)] + [UserFactory() for __ in range(3)]
+        self._create_submissions_score(users[0], 'item_1', 1, 2)
+        self._create_submissions_score(users[0], 'item_1', 2, 2)
+        self._create_submissions_score(users[0], 'item_2', 0, 0)
+        self._create_submissions_score(users[1], 'item_1', 1, 4)
+        expected_scores = {
+            user.id: submissions_api.get_scores(unicode(self.course.id), anonymous_id_for_user(user, self.course.id))
+            for user in users[:2]
+        }
+        # users[2] has no anonymous id in the course, so no submissions scores
+        expected_scores[users[2].id] = {}
+        # users[3] has several anonymous ids in the course
+        anonymous_id_for_user(users[3], self.course.id)
+        AnonymousUserId.objects.create(user=users[3], anonymous_user_id='old_anonymous_id', course_id=self.course.id)
+        users = [User.objects.get(id=user.id) for user in users]
+        self.course_data.collected_structure  # pylint: disable=pointless-statement
+
+        # one query each for the CSM scores, the anonymous ids and the submissions scores
+        with self.assertNumQueries(3):
+            SubsectionGradeFactory.prefetch_scores(self.course_data, users)
+        self.addCleanup(SubsectionGradeFactory.clear_prefetched_scores, self.course.id)
+        factories = [SubsectionGradeFactory(user, self.course, self.course_structure) for user in users]
+
+        # the submissions scores of the batch are prefetched, with the
+        # fields of the scores returned by the submissions API read in grades
+        with self.assertNumQueries(0):
+            for factory in factories[:3]:
+                prefetched_scores = factory._submissions_scores  # pylint: disable=protected-access
+                expected = expected_scores[factory.student.id]
+                self.assertEqual(set(prefetched_scores), set(expected))
+                for item_id, score in prefetched_scores.iteritems():
+                    for field in ('points_earned', 'points_possible', 'created_at'):
+                        self.assertEqual(score[field], expected[item_id][field])
+        self.assertFalse(mock_get_scores.called)
+
+        # the scores of users with several anonymous ids are queried
+        # through the submissions API, with their current anonymous id
+        mock_get_scores.return_value = {}
+        self.assertEqual(factories[3]._submissions_scores, {})  # pylint: disable=protected-access
+        mock_get_scores.assert_called_once_with(
+            str(self.course.id), anonymous_id_for_user(users[3], self.course.id),
+        )
@@ -16,3 +16,8 @@ class UpdateProblemModuleStateError(Exception):
 class DuplicateTaskException(Exception):
     """Exception indicating that a task already exists or has already completed."""
     pass
+
+
+class GradeReportShardError(Exception):
+    """Exception recorded as the failure of a sharded grade report when any of its shards failed."""
+    pass
@@ -17,12 +17,14 @@ import hashlib
 import json
 import logging
 import os.path
+import shutil
+import tempfile
 from uuid import uuid4
 
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import models, transaction
 
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
@@ -267,12 +269,48 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+
+        `rows` may be a generator; rows are spooled to a temporary file as
+        they are produced, so the report is never held in memory as a whole.
+        """
+        with tempfile.TemporaryFile() as output_file:
+            csvwriter = csv.writer(output_file)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            output_file.seek(0)
+            self.store(course_id, filename, File(output_file))
+
+    def store_concatenated(self, course_id, filename, header_rows, source_filenames):
+        """
+        Write `header_rows` in csv format followed by the contents of each of
+        the previously stored `source_filenames` (csv files without headers,
+        in order) to a single file named `filename`.
+        """
+        with tempfile.TemporaryFile() as output_file:
+            csvwriter = csv.writer(output_file)
+            csvwriter.writerows(self._get_utf8_encoded_rows(header_rows))
+            for source_filename in source_filenames:
+                with self.open(course_id, source_filename) as source_file:
+                    shutil.copyfileobj(source_file, output_file)
+            output_file.seek(0)
+            self.store(course_id, filename, File(output_file))
+
+    def open(self, course_id, filename):
+        """
+        Return a file object for reading the stored file `filename`.
+        """
+        return self.storage.open(self.path_to(course_id, filename), 'rb')
+
+    def exists(self, course_id, filename):
+        """
+        Return whether `filename` has been stored for `course_id`.
+        """
+        return self.storage.exists(self.path_to(course_id, filename))
+
+    def delete(self, course_id, filename):
+        """
+        Delete the stored file `filename`.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        self.storage.delete(self.path_to(course_id, filename))
 
     def links_for(self, course_id):
         """
@@ -45,6 +45,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
 from lms.djangoapps.instructor_task.tasks_helper.module_state import (
     delete_problem_module_state,
     perform_module_state_update,
+    perform_module_state_update_for_subtask,
     override_score_module_state,
     rescore_problem_module_state,
     reset_attempts_module_state
@@ -72,15 +73,42 @@ def rescore_problem(entry_id, xmodule_instance_args):
 
     `xmodule_instance_args` provides information needed by _get_module_instance_for_task()
     to instantiate an xmodule instance.
+
+    When there are more than settings.INSTRUCTOR_TASK_MODULES_PER_SUBTASK submissions
+    to rescore, they are split among `rescore_problem_subtask` subtasks.
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
     update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    def _create_rescore_subtask(module_list, initial_subtask_status):
+        """Creates a subtask to rescore the given list of student modules."""
+        return rescore_problem_subtask.subtask(
+            (
+                entry_id,
+                xmodule_instance_args,
+                [module['pk'] for module in module_list],
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+        )
+
+    visit_fcn = partial(perform_module_state_update, update_fcn, None, create_subtask_fcn=_create_rescore_subtask)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
+@task  # pylint: disable=not-callable
+def rescore_problem_subtask(entry_id, xmodule_instance_args, module_ids, subtask_status_dict):
+    """
+    Rescores the problem for the given student modules.
+
+    These subtasks are queued by `rescore_problem` when there are many submissions
+    to rescore, and report their progress through the parent InstructorTask.
+    """
+    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
+    return perform_module_state_update_for_subtask(update_fcn, entry_id, module_ids, subtask_status_dict)
+
+
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
 def override_problem_score(entry_id, xmodule_instance_args):
     """
@@ -187,6 +215,20 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def calculate_grades_csv_shard(entry_id, xmodule_instance_args, shard_index, user_ids, subtask_status_dict):
+    """
+    Grade one shard of a course's enrollees for a sharded grade report.
+
+    These subtasks are queued by `calculate_grades_csv` when sharded grade
+    reports are enabled, and report their progress through the parent
+    InstructorTask; the last one to complete uploads the merged report.
+    """
+    return CourseGradeReport.generate_shard(
+        xmodule_instance_args, entry_id, shard_index, user_ids, subtask_status_dict
+    )
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
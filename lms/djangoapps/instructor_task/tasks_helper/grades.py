@@ -1,23 +1,37 @@
 """
 Functionality for generating grade reports.
 """
+import json
 import logging
 import re
+import traceback
 from collections import OrderedDict
 from datetime import datetime
-from itertools import chain, izip, izip_longest
+from itertools import chain, count, izip, izip_longest
 from time import time
 
+from celery.states import FAILURE, SUCCESS
+from django.conf import settings
+from django.contrib.auth.models import User
 from lazy import lazy
 from pytz import UTC
 
 from certificates.models import CertificateWhitelist, GeneratedCertificate, certificate_info_for_user
 from courseware.courses import get_course_by_id
+from courseware.models import chunks
 from instructor_analytics.basic import list_problem_responses
 from instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
-from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.exceptions import GradeReportShardError
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status
+)
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -30,7 +44,7 @@ from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import upload_concatenated_csvs_to_report_store, upload_csv_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -54,6 +68,19 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _partial_report_filename(report_name, entry_id, shard_index):
+    """
+    Returns the ReportStore filename of the partial `report_name` CSV written
+    by the given shard of a sharded report.  Partial reports are kept in a
+    subdirectory so they are never listed as downloadable reports.
+    """
+    return u'partial_reports/{entry_id}/{report_name}_{shard_index:05d}.csv'.format(
+        entry_id=entry_id,
+        report_name=report_name,
+        shard_index=shard_index,
+    )
+
+
 class _CourseGradeReportContext(object):
     """
     Internal class that provides a common context to use for a single grade
@@ -181,7 +208,6 @@ class _CourseGradeBulkContext(object):
         self.enrollments = _EnrollmentBulkContext(context, users)
         bulk_cache_cohorts(context.course_id, users)
         BulkRoleCache.prefetch(users)
-        PersistentCourseGrade.prefetch(context.course_id, users)
         BulkCourseTags.prefetch(context.course_id, users)
 
 
@@ -196,11 +222,232 @@ class CourseGradeReport(object):
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
         """
         Public method to generate a grade report.
-        """
+
+        If sharded grade reports are enabled through GradeReportSetting and
+        the course has more enrollees than the configured batch size, the
+        enrollees are split into shards that are graded by parallel subtasks
+        (see `generate_shard`), and this only queues those subtasks.
+        """
+        grade_report_setting = GradeReportSetting.current() if _entry_id is not None else None
+        if grade_report_setting is not None and grade_report_setting.enabled:
+            total_users = CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True).count()
+            if total_users > grade_report_setting.batch_size:
+                return cls._generate_sharded(
+                    _xmodule_instance_args, _entry_id, action_name, total_users, grade_report_setting.batch_size,
+                )
+
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
             return CourseGradeReport()._generate(context)
 
+    @classmethod
+    def _generate_sharded(cls, _xmodule_instance_args, _entry_id, action_name, total_users, shard_size):
+        """
+        Queues a `calculate_grades_csv_shard` subtask for every `shard_size`
+        enrollees of the course, and returns the task progress.
+        """
+        # Imported here to avoid a circular import; tasks.py imports this module.
+        from lms.djangoapps.instructor_task.tasks import calculate_grades_csv_shard
+
+        entry = InstructorTask.objects.get(pk=_entry_id)
+
+        # As with bulk email, the same task may be run again after a loss of
+        # connection to the broker.  Don't queue a second set of shards.
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            TASK_LOG.warning(u'Task %s: grade report shards have already been queued', entry.task_id)
+            return json.loads(entry.task_output)
+
+        shard_indexes = count()
+
+        def _create_grades_shard_subtask(user_list, initial_subtask_status):
+            """Creates a subtask to grade the given list of users."""
+            return calculate_grades_csv_shard.subtask(
+                (
+                    _entry_id,
+                    _xmodule_instance_args,
+                    next(shard_indexes),
+                    [user['pk'] for user in user_list],
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            )
+
+        users = CourseEnrollment.objects.users_enrolled_in(entry.course_id, include_inactive=True).order_by('id')
+        return queue_subtasks_for_query(
+            entry,
+            action_name,
+            _create_grades_shard_subtask,
+            [users],
+            [],
+            shard_size,
+            total_users,
+        )
+
+    @classmethod
+    def generate_shard(cls, _xmodule_instance_args, entry_id, shard_index, user_ids, subtask_status_dict):
+        """
+        Grades the given users for a sharded grade report, streaming their
+        rows to partial CSV files in the ReportStore.  The shard that
+        completes last merges all partial files into the final report.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        current_task_id = subtask_status.task_id
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        action_name = json.loads(entry.task_output)['action_name']
+        task_input = json.loads(entry.task_input)
+        report = CourseGradeReport()
+
+        with modulestore().bulk_operations(entry.course_id):
+            context = _CourseGradeReportContext(
+                _xmodule_instance_args, entry_id, entry.course_id, task_input, action_name
+            )
+            context.task_progress.total = len(user_ids)
+            try:
+                report._generate_shard(context, entry_id, shard_index, user_ids)
+            except Exception as exception:
+                TASK_LOG.exception(u'%s, Grades shard %d failed', context.task_info_string, shard_index)
+                report._fail_shard(context, entry_id, shard_index, user_ids, exception)
+                subtask_status.increment(failed=len(user_ids), state=FAILURE)
+                if update_subtask_status(entry_id, current_task_id, subtask_status, complete_parent=False):
+                    report._complete_shards(context, entry_id)
+                raise
+
+            subtask_status.increment(
+                succeeded=context.task_progress.succeeded,
+                failed=context.task_progress.failed,
+                state=SUCCESS,
+            )
+            if update_subtask_status(entry_id, current_task_id, subtask_status, complete_parent=False):
+                report._complete_shards(context, entry_id)
+
+        return subtask_status.to_dict()
+
+    def _generate_shard(self, context, entry_id, shard_index, user_ids):
+        """
+        Writes the success and error rows for the given users to partial
+        CSV files.  Success rows are streamed to the ReportStore batch by
+        batch, so memory use is bounded by the shard size.
+        """
+        context.update_status(u'Starting grades shard {}'.format(shard_index))
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        error_rows = []
+
+        def success_rows():
+            """
+            Yields the success rows of every batch of users in the shard,
+            collecting error rows and progress along the way.
+            """
+            for batch_user_ids in chunks(user_ids, self.USER_BATCH_SIZE):
+                users = User.objects.filter(id__in=batch_user_ids).select_related('profile').order_by('id')
+                batch_success_rows, batch_error_rows = self._rows_for_users(context, list(users))
+                error_rows.extend(batch_error_rows)
+
+                task_progress = context.task_progress
+                task_progress.succeeded += len(batch_success_rows)
+                task_progress.failed += len(batch_error_rows)
+                task_progress.attempted = task_progress.succeeded + task_progress.failed
+                context.update_status(u'Compiling grades shard {}'.format(shard_index))
+                for row in batch_success_rows:
+                    yield row
+
+        report_store.store_rows(
+            context.course_id, _partial_report_filename('grades', entry_id, shard_index), success_rows()
+        )
+        if error_rows:
+            report_store.store_rows(
+                context.course_id, _partial_report_filename('errors', entry_id, shard_index), error_rows
+            )
+        context.update_status(u'Completed grades shard {}'.format(shard_index))
+
+    def _fail_shard(self, context, entry_id, shard_index, user_ids, exception):
+        """
+        Replaces whatever the given failed shard wrote with an error row for
+        each of its users, so that the merged report accounts for them.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        try:
+            for report_name in ('grades', 'errors'):
+                filename = _partial_report_filename(report_name, entry_id, shard_index)
+                if report_store.exists(context.course_id, filename):
+                    report_store.delete(context.course_id, filename)
+
+            error_message = u'Grading failed: {}'.format(exception)
+            report_store.store_rows(
+                context.course_id,
+                _partial_report_filename('errors', entry_id, shard_index),
+                [
+                    [user_id, username, error_message]
+                    for user_id, username in User.objects.filter(id__in=user_ids).order_by('id').values_list(
+                        'id', 'username'
+                    )
+                ],
+            )
+        except Exception:  # pylint: disable=broad-except
+            TASK_LOG.exception(
+                u'%s, Storing error rows for failed grades shard %d failed', context.task_info_string, shard_index
+            )
+
+    def _complete_shards(self, context, entry_id):
+        """
+        Merges the partial files of a sharded grade report and marks the
+        InstructorTask as done.  The task fails if any of its shards failed,
+        even though the report is still uploaded.
+        """
+        try:
+            context.update_status(u'Uploading grades')
+            self._merge_shards(context, entry_id)
+        except Exception as exception:  # pylint: disable=broad-except
+            TASK_LOG.exception(u'%s, Merging grades shards failed', context.task_info_string)
+            entry = InstructorTask.objects.get(pk=entry_id)
+            entry.task_output = InstructorTask.create_output_for_failure(exception, traceback.format_exc())
+            entry.task_state = FAILURE
+            entry.save_now()
+            raise
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        subtask_dict = json.loads(entry.subtasks)
+        if subtask_dict['failed'] > 0:
+            message = u'{failed} of {total} grade report shards failed'.format(
+                failed=subtask_dict['failed'], total=subtask_dict['total'],
+            )
+            TASK_LOG.error(u'%s, %s', context.task_info_string, message)
+            entry.task_output = InstructorTask.create_output_for_failure(GradeReportShardError(message), None)
+            entry.task_state = FAILURE
+        else:
+            entry.task_state = SUCCESS
+        entry.save_now()
+        TASK_LOG.info(u'%s, Task type: %s, Completed grades', context.task_info_string, context.action_name)
+
+    def _merge_shards(self, context, entry_id):
+        """
+        Concatenates the partial success and error files written by every
+        shard into the final grade report CSVs, then deletes them.
+        """
+        num_shards = json.loads(InstructorTask.objects.get(pk=entry_id).subtasks)['total']
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        date = datetime.now(UTC)
+
+        for report_name, csv_name, headers, required in (
+            ('grades', 'grade_report', self._success_headers(context), True),
+            ('errors', 'grade_report_err', self._error_headers(), False),
+        ):
+            partial_filenames = [
+                filename for filename in (
+                    _partial_report_filename(report_name, entry_id, shard_index)
+                    for shard_index in range(num_shards)
+                )
+                if report_store.exists(context.course_id, filename)
+            ]
+            if required or partial_filenames:
+                upload_concatenated_csvs_to_report_store(
+                    [headers], partial_filenames, csv_name, context.course_id, date
+                )
+            for filename in partial_filenames:
+                report_store.delete(context.course_id, filename)
+
     def _generate(self, context):
         """
         Internal method for generating a grade report for the given context.
@@ -5,6 +5,8 @@ import json
 import logging
 from time import time
 
+from celery.states import FAILURE, SUCCESS
+from django.conf import settings
 from django.contrib.auth.models import User
 from opaque_keys.edx.keys import UsageKey
 
@@ -23,13 +25,20 @@ from xblock.runtime import KvsFieldData
 from xblock.scorable import Score
 from xmodule.modulestore.django import modulestore
 from ..exceptions import UpdateProblemModuleStateError
+from ..models import InstructorTask
+from ..subtasks import SubtaskStatus, check_subtask_is_valid, queue_subtasks_for_query, update_subtask_status
 from .runner import TaskProgress
 from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED, UPDATE_STATUS_SUCCEEDED
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
+# Number of StudentModules loaded from the database at a time.
+MODULE_CHUNK_SIZE = 500
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+
+def perform_module_state_update(
+        update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name, create_subtask_fcn=None
+):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -48,6 +57,12 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     the update is successful; False indicates the update on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    The StudentModules are loaded in chunks of MODULE_CHUNK_SIZE, so that memory use doesn't grow
+    with the number of students.  If `create_subtask_fcn` is not None and there are more than
+    settings.INSTRUCTOR_TASK_MODULES_PER_SUBTASK modules to update, the modules are instead split
+    among subtasks created by `create_subtask_fcn` (see `queue_subtasks_for_query`), which each
+    call `perform_module_state_update_for_subtask`, and this only queues those subtasks.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -65,28 +80,11 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
 
     """
     start_time = time()
-    usage_keys = []
-    problem_url = task_input.get('problem_url')
-    entrance_exam_url = task_input.get('entrance_exam_url')
     student_identifier = task_input.get('student')
-    problems = {}
-
-    # if problem_url is present make a usage key from it
-    if problem_url:
-        usage_key = UsageKey.from_string(problem_url).map_into_course(course_id)
-        usage_keys.append(usage_key)
-
-        # find the problem descriptor:
-        problem_descriptor = modulestore().get_item(usage_key)
-        problems[unicode(usage_key)] = problem_descriptor
-
-    # if entrance_exam is present grab all problems in it
-    if entrance_exam_url:
-        problems = get_problems_in_section(entrance_exam_url)
-        usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
+    problems = _get_problems(course_id, task_input)
 
     # find the modules in question
-    modules_to_update = StudentModule.objects.filter(course_id=course_id, module_state_key__in=usage_keys)
+    modules_to_update = _get_modules_to_update(course_id, problems)
 
     # give the option of updating an individual student. If not specified,
     # then updates all students who have responded to a problem so far
@@ -105,30 +103,180 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     if filter_fcn is not None:
         modules_to_update = filter_fcn(modules_to_update)
 
-    task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
+    total_modules = modules_to_update.count()
+    modules_per_subtask = settings.INSTRUCTOR_TASK_MODULES_PER_SUBTASK
+    if create_subtask_fcn is not None and total_modules > modules_per_subtask:
+        return _queue_module_state_subtasks(
+            create_subtask_fcn, _entry_id, action_name, modules_to_update, modules_per_subtask, total_modules
+        )
+
+    task_progress = TaskProgress(action_name, total_modules, start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
-        module_descriptor = problems[unicode(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
-            update_status = update_fcn(module_descriptor, module_to_update, task_input)
-            if update_status == UPDATE_STATUS_SUCCEEDED:
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                task_progress.succeeded += 1
-            elif update_status == UPDATE_STATUS_FAILED:
-                task_progress.failed += 1
-            elif update_status == UPDATE_STATUS_SKIPPED:
-                task_progress.skipped += 1
-            else:
-                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+    for modules_chunk in _chunked_modules(modules_to_update):
+        _update_modules(update_fcn, problems, modules_chunk, course_id, task_input, action_name, task_progress)
+        task_progress.update_task_state()
 
     return task_progress.update_task_state()
 
 
+def perform_module_state_update_for_subtask(update_fcn, entry_id, module_ids, subtask_status_dict):
+    """
+    Performs the update of `perform_module_state_update` on the StudentModules with the given ids,
+    as one of the subtasks queued by it.
+
+    The progress of the subtask is reported through the parent InstructorTask, which completes
+    once all of its subtasks have.  Returns the status of the subtask as a dict.
+    """
+    start_time = time()
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    task_input = json.loads(entry.task_input)
+    action_name = json.loads(entry.task_output)['action_name']
+    problems = _get_problems(entry.course_id, task_input)
+    modules_to_update = _get_modules_to_update(entry.course_id, problems).filter(id__in=module_ids)
+
+    task_progress = TaskProgress(action_name, len(module_ids), start_time)
+    try:
+        for modules_chunk in _chunked_modules(modules_to_update):
+            _update_modules(
+                update_fcn, problems, modules_chunk, entry.course_id, task_input, action_name, task_progress
+            )
+    except Exception:
+        TASK_LOG.exception(u'Task %s: subtask %s failed to update student modules', entry.task_id, current_task_id)
+        subtask_status.increment(
+            succeeded=task_progress.succeeded,
+            failed=len(module_ids) - task_progress.succeeded - task_progress.skipped,
+            skipped=task_progress.skipped,
+            state=FAILURE,
+        )
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        raise
+
+    subtask_status.increment(
+        succeeded=task_progress.succeeded,
+        # Modules that were deleted since the subtask was queued are counted as skipped.
+        skipped=len(module_ids) - task_progress.succeeded - task_progress.failed,
+        failed=task_progress.failed,
+        state=SUCCESS,
+    )
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
+def _get_problems(course_id, task_input):
+    """
+    Returns the descriptors of the problems to update for the given task input,
+    keyed by the string of their usage key.
+    """
+    problem_url = task_input.get('problem_url')
+    entrance_exam_url = task_input.get('entrance_exam_url')
+    problems = {}
+
+    # if problem_url is present make a usage key from it
+    if problem_url:
+        usage_key = UsageKey.from_string(problem_url).map_into_course(course_id)
+
+        # find the problem descriptor:
+        problem_descriptor = modulestore().get_item(usage_key)
+        problems[unicode(usage_key)] = problem_descriptor
+
+    # if entrance_exam is present grab all problems in it
+    if entrance_exam_url:
+        problems = get_problems_in_section(entrance_exam_url)
+
+    return problems
+
+
+def _get_modules_to_update(course_id, problems):
+    """
+    Returns a queryset of the StudentModules of all students for the given problems.
+    """
+    usage_keys = [UsageKey.from_string(location).map_into_course(course_id) for location in problems]
+    return StudentModule.objects.filter(
+        course_id=course_id, module_state_key__in=usage_keys
+    ).select_related('student')
+
+
+def _chunked_modules(modules_to_update):
+    """
+    Yields the StudentModules of the given queryset as lists of up to MODULE_CHUNK_SIZE
+    modules, in order of id.
+
+    Each chunk is loaded with a query that starts after the last id of the previous chunk,
+    which stays cheap however far into the table it gets, and isn't affected by modules
+    that are updated or deleted in the meantime.
+    """
+    modules_to_update = modules_to_update.order_by('id')
+    last_id = None
+    while True:
+        chunk_query = modules_to_update if last_id is None else modules_to_update.filter(id__gt=last_id)
+        modules_chunk = list(chunk_query[:MODULE_CHUNK_SIZE])
+        if not modules_chunk:
+            return
+        # Read the id before yielding, as deleting the module clears it.
+        last_id = modules_chunk[-1].id
+        yield modules_chunk
+
+
+def _update_modules(update_fcn, problems, modules_chunk, course_id, task_input, action_name, task_progress):
+    """
+    Calls the update_fcn on each of the given StudentModules, counting the results in task_progress.
+    """
+    # Reuse the course and its problems as loaded for the first module for the rest of the chunk.
+    with modulestore().bulk_operations(course_id):
+        for module_to_update in modules_chunk:
+            task_progress.attempted += 1
+            module_descriptor = problems[unicode(module_to_update.module_state_key)]
+            # There is no try here:  if there's an error, we let it throw, and the task will
+            # be marked as FAILED, with a stack trace.
+            with dog_stats_api.timer(
+                'instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]
+            ):
+                update_status = update_fcn(module_descriptor, module_to_update, task_input)
+                if update_status == UPDATE_STATUS_SUCCEEDED:
+                    # If the update_fcn returns true, then it performed some kind of work.
+                    # Logging of failures is left to the update_fcn itself.
+                    task_progress.succeeded += 1
+                elif update_status == UPDATE_STATUS_FAILED:
+                    task_progress.failed += 1
+                elif update_status == UPDATE_STATUS_SKIPPED:
+                    task_progress.skipped += 1
+                else:
+                    raise UpdateProblemModuleStateError(
+                        "Unexpected update_status returned: {}".format(update_status)
+                    )
+
+
+def _queue_module_state_subtasks(
+        create_subtask_fcn, entry_id, action_name, modules_to_update, modules_per_subtask, total_modules
+):
+    """
+    Queues the subtasks created by create_subtask_fcn to update every modules_per_subtask
+    of the given StudentModules, and returns the task progress.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+
+    # As with bulk email, the same task may be run again after a loss of
+    # connection to the broker.  Don't queue a second set of subtasks.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        TASK_LOG.warning(u'Task %s: student module subtasks have already been queued', entry.task_id)
+        return json.loads(entry.task_output)
+
+    return queue_subtasks_for_query(
+        entry,
+        action_name,
+        create_subtask_fcn,
+        [modules_to_update.order_by('id')],
+        [],
+        modules_per_subtask,
+        total_modules,
+    )
+
+
 @outer_atomic
 def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
     '''
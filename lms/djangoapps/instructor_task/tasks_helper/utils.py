@@ -28,18 +28,37 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
         course_id: ID of the course
     """
     report_store = ReportStore.from_config(config_name)
-    report_store.store_rows(
-        course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=course_filename_prefix_generator(course_id),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
-        rows
+    report_store.store_rows(course_id, _report_filename(csv_name, course_id, timestamp), rows)
+    tracker_emit(csv_name)
+
+
+def upload_concatenated_csvs_to_report_store(
+        header_rows, source_filenames, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'
+):
+    """
+    Upload a CSV made of `header_rows` followed by the contents of the
+    previously stored, headerless CSV files `source_filenames`, using
+    ReportStore.  Used to merge the partial files of a sharded report.
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_store.store_concatenated(
+        course_id, _report_filename(csv_name, course_id, timestamp), header_rows, source_filenames
     )
     tracker_emit(csv_name)
 
 
+def _report_filename(csv_name, course_id, timestamp):
+    """
+    Returns the ReportStore filename for the report `csv_name` of the given
+    course, generated at `timestamp`.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def tracker_emit(report_name):
     """
     Emits a 'report.requested' event for the given report.
@@ -11,6 +11,7 @@ from uuid import uuid4
 
 import ddt
 from celery.states import FAILURE, SUCCESS
+from django.test.utils import override_settings
 from django.utils.translation import ugettext_noop
 from mock import MagicMock, Mock, patch
 from nose.plugins.attrib import attr
@@ -447,6 +448,66 @@ class TestRescoreInstructorTask(TestInstructorTasks):
             action_name='rescored'
         )
 
+    def _rescore_with_mock_module(self, num_students):
+        """
+        Rescores the problem for num_students students with a mocked module,
+        and returns the task entry and the mocked module.
+        """
+        mock_instance = MagicMock()
+        mock_instance.has_submitted_answer.return_value = True
+        self._create_students_with_state(num_students)
+        task_entry = self._create_input_entry()
+        with patch(
+                'lms.djangoapps.instructor_task.tasks_helper.module_state.get_module_for_descriptor_internal'
+        ) as mock_get_module:
+            mock_get_module.return_value = mock_instance
+            self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+        return task_entry, mock_instance
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper.module_state.MODULE_CHUNK_SIZE', 3)
+    def test_rescoring_in_chunks(self):
+        num_students = 10
+        task_entry, mock_instance = self._rescore_with_mock_module(num_students)
+
+        self.assertEqual(mock_instance.rescore.call_count, num_students)
+        # Progress is reported at the start, after each of the 4 chunks and at the end.
+        self.assertEqual(self.current_task.update_state.call_count, 6)
+        self.assert_task_output(
+            output=self.get_task_output(task_entry.id),
+            total=num_students,
+            attempted=num_students,
+            succeeded=num_students,
+            skipped=0,
+            failed=0,
+            action_name='rescored'
+        )
+
+    @override_settings(INSTRUCTOR_TASK_MODULES_PER_SUBTASK=4)
+    def test_rescoring_with_subtasks(self):
+        """
+        Tests that rescoring many submissions is split among subtasks, which
+        Celery runs eagerly here.
+        """
+        num_students = 10
+        task_entry, mock_instance = self._rescore_with_mock_module(num_students)
+
+        self.assertEqual(mock_instance.rescore.call_count, num_students)
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        subtasks = json.loads(entry.subtasks)
+        self.assertEqual(subtasks['total'], 3)
+        self.assertEqual(subtasks['succeeded'], 3)
+        self.assert_task_output(
+            output=self.get_task_output(task_entry.id),
+            total=num_students,
+            attempted=num_students,
+            succeeded=num_students,
+            skipped=0,
+            failed=0,
+            action_name='rescored',
+            duration_ms=-1,
+        )
+
 
 @attr(shard=3)
 class TestResetAttemptsInstructorTask(TestInstructorTasks):
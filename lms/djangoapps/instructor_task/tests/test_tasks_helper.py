@@ -8,6 +8,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 import tempfile
@@ -16,6 +17,7 @@ from datetime import datetime
 
 import ddt
 import unicodecsv
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
@@ -34,6 +36,7 @@ from courseware.tests.factories import InstructorFactory
 from instructor_analytics.basic import UNAVAILABLE
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_enrollment_report,
@@ -53,6 +56,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -83,7 +87,7 @@ from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls
 from xmodule.partitions.partitions import Group, UserPartition
 
-from ..models import ReportStore
+from ..models import InstructorTask, ReportStore
 from ..tasks_helper.utils import UPDATE_STATUS_FAILED, UPDATE_STATUS_SUCCEEDED
 
 
@@ -395,7 +399,7 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
 
         RequestCache.clear_request_cache()
 
-        expected_query_count = 36
+        expected_query_count = 37
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
             with check_mongo_calls(mongo_count):
                 with self.assertNumQueries(expected_query_count):
@@ -423,6 +427,86 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
             {'attempted': expected_students, 'succeeded': expected_students, 'failed': 0}, result
         )
 
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_report(self, _mock_current_task):
+        """
+        Test that a sharded grade report grades every shard and merges them
+        into a single report.  Celery runs the shard subtasks eagerly here.
+        """
+        GradeReportSetting.objects.create(enabled=True, batch_size=2)
+        usernames = ['student{}'.format(index) for index in range(5)]
+        for username in usernames:
+            self.create_student(username, '{}@example.com'.format(username))
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type='grade_course',
+            task_input=json.dumps({}),
+        )
+
+        CourseGradeReport.generate({}, entry.id, self.course.id, {}, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.subtasks)['total'], 3)
+        self.assertDictContainsSubset(
+            {'attempted': len(usernames), 'succeeded': len(usernames), 'failed': 0}, json.loads(entry.task_output)
+        )
+
+        # Only the merged report is listed; the partial files are removed.
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.assertFalse(report_store.exists(self.course.id, 'partial_reports/{}/grades_00000.csv'.format(entry.id)))
+        self.verify_rows_in_csv(
+            [{'Username': username} for username in usernames],
+            ignore_other_columns=True,
+        )
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_report_with_failed_shard(self, _mock_current_task):
+        """
+        Test that a sharded grade report whose shard fails lists that shard's
+        users as errors and marks the task as failed.
+        """
+        GradeReportSetting.objects.create(enabled=True, batch_size=2)
+        usernames = ['student{}'.format(index) for index in range(5)]
+        for username in usernames:
+            self.create_student(username, '{}@example.com'.format(username))
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type='grade_course',
+            task_input=json.dumps({}),
+        )
+
+        generate_shard = CourseGradeReport._generate_shard  # pylint: disable=protected-access
+
+        def _generate_shard(report, context, entry_id, shard_index, user_ids):
+            """Fails the second shard."""
+            if shard_index == 1:
+                raise Exception('Shard failed')
+            return generate_shard(report, context, entry_id, shard_index, user_ids)
+
+        with patch.object(CourseGradeReport, '_generate_shard', _generate_shard):
+            CourseGradeReport.generate({}, entry.id, self.course.id, {}, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['message'], '1 of 3 grade report shards failed')
+        subtasks = json.loads(entry.subtasks)
+        self.assertEqual((subtasks['succeeded'], subtasks['failed']), (2, 1))
+
+        # The users of the failed shard are reported as errors instead of
+        # silently missing from the report.
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 2)
+        reports = {}
+        for report_filename, _ in links:
+            report_name = 'grade_report_err' if 'grade_report_err' in report_filename else 'grade_report'
+            with report_store.storage.open(report_store.path_to(self.course.id, report_filename)) as csv_file:
+                reports[report_name] = [row['Username'] for row in unicodecsv.DictReader(csv_file)]
+        self.assertEqual(reports['grade_report'], usernames[:2] + usernames[4:])
+        self.assertEqual(reports['grade_report_err'], usernames[2:4])
+
 
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
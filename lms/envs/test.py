@@ -237,6 +237,13 @@ CACHES = {
     },
 }
 
+# Don't keep course structures in process memory between tests
+COURSE_STRUCTURE_CACHE_LRU_SIZE = 0
+
+# Don't keep course overviews in caches between tests
+COURSE_OVERVIEW_CACHE_TIMEOUT = 0
+COURSE_OVERVIEW_CACHE_LRU_SIZE = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
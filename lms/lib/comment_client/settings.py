@@ -6,3 +6,9 @@ else:
     SERVICE_HOST = 'http://localhost:4567'
 
 PREFIX = SERVICE_HOST + '/api/v1'
+
+# Number of connections to the comments service kept alive by each process.
+POOL_SIZE = getattr(settings, 'COMMENTS_SERVICE_POOL_SIZE', 10)
+
+# Number of times requests that fail to connect to the comments service are retried.
+MAX_RETRIES = getattr(settings, 'COMMENTS_SERVICE_MAX_RETRIES', 2)
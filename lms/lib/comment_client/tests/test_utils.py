@@ -0,0 +1,123 @@
+"""
+Tests for the requests the comment client sends to the comments service,
+against a local stub of the service.
+"""
+import json
+import threading
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
+from django.test import TestCase
+from mock import Mock, patch
+
+from django_comment_common.models import ForumsConfig
+from lms.lib.comment_client import utils
+from request_cache.middleware import RequestCache
+
+
+class StubCommentServiceHandler(BaseHTTPRequestHandler):
+    """
+    Responds to every request with an empty JSON object, over keep-alive
+    connections.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.num_connections += 1
+
+    def _respond(self):
+        """
+        Counts the request and sends the response.
+        """
+        length = int(self.headers.getheader('content-length') or 0)
+        self.rfile.read(length)
+        self.server.requests.append((self.command, self.path))
+        body = json.dumps({})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_PUT = _respond
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class StubCommentServiceServer(ThreadingMixIn, HTTPServer):
+    """
+    A stub comments service listening on a free local port.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubCommentServiceHandler)
+        self.num_connections = 0
+        self.requests = []
+
+    @property
+    def url(self):
+        """
+        The URL of the users endpoint of the stub.
+        """
+        return 'http://127.0.0.1:{}/api/v1/users/1'.format(self.server_address[1])
+
+
+class PerformRequestTest(TestCase):
+    """
+    Tests for perform_request.
+    """
+    def setUp(self):
+        super(PerformRequestTest, self).setUp()
+        ForumsConfig.objects.create(enabled=True)
+
+        self.server = StubCommentServiceServer()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        # Start each test with a new session.
+        patcher = patch.dict(utils._SESSION, {'pid': None, 'session': None})  # pylint: disable=protected-access
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def test_connections_are_reused(self):
+        for __ in range(3):
+            self.assertEqual(utils.perform_request('get', self.server.url), {})
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.num_connections, 1)
+
+    def test_lookups_are_not_coalesced_outside_requests(self):
+        for __ in range(2):
+            utils.perform_request('get', self.server.url, metric_action='model.retrieve')
+        self.assertEqual(len(self.server.requests), 2)
+
+    @patch('lms.lib.comment_client.utils.request_cache.get_request', Mock(return_value=Mock()))
+    def test_lookups_are_coalesced_within_requests(self):
+        for __ in range(2):
+            utils.perform_request('get', self.server.url, {'course_id': 'a/b/c'}, metric_action='model.retrieve')
+        self.assertEqual(len(self.server.requests), 1)
+
+        # Other parameters make another lookup.
+        utils.perform_request('get', self.server.url, {'course_id': 'd/e/f'}, metric_action='model.retrieve')
+        self.assertEqual(len(self.server.requests), 2)
+
+        # Changes discard the previous lookups.
+        utils.perform_request('put', self.server.url, {'default_sort_key': 'date'}, metric_action='model.update')
+        utils.perform_request('get', self.server.url, {'course_id': 'a/b/c'}, metric_action='model.retrieve')
+        self.assertEqual(
+            [command for command, __ in self.server.requests],
+            ['GET', 'GET', 'PUT', 'GET'],
+        )
+
+    @patch('lms.lib.comment_client.utils.request_cache.get_request', Mock(return_value=Mock()))
+    def test_coalesced_responses_are_copies(self):
+        first = utils.perform_request('get', self.server.url, metric_action='model.retrieve')
+        first['username'] = 'changed'
+        second = utils.perform_request('get', self.server.url, metric_action='model.retrieve')
+        self.assertEqual(second, {})
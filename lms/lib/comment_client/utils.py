@@ -1,17 +1,36 @@
 """" Common utilities for comment client wrapper """
+import copy
 import logging
+import os
+import threading
 from contextlib import contextmanager
+from cookielib import DefaultCookiePolicy
 from time import time
 from uuid import uuid4
 
 import requests
 from django.conf import settings
 from django.utils.translation import get_language
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
 
 import dogstats_wrapper as dog_stats_api
+import request_cache
+
+from . import settings as comment_client_settings
 
 log = logging.getLogger(__name__)
 
+# Per-request cache of the forums configuration and of the responses to
+# the comments service lookups made during the request.
+REQUEST_CACHE_NAME = u'comment_client.utils'
+
+# The comments service lookups whose responses are reused within a request.
+COALESCED_METRIC_ACTIONS = frozenset(['model.retrieve'])
+
+_SESSION_LOCK = threading.Lock()
+_SESSION = {'pid': None, 'session': None}
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -53,11 +72,74 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
-def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
+def get_session():
+    """
+    Returns the HTTP session shared by all the threads of the process to
+    send requests to the comments service.
+
+    The session keeps up to COMMENTS_SERVICE_POOL_SIZE connections alive, so
+    that requests don't each need a new connection, and retries requests that
+    fail to connect up to COMMENTS_SERVICE_MAX_RETRIES times.  It doesn't keep
+    cookies, as it is shared by the requests of all users.
+    """
+    with _SESSION_LOCK:
+        # Connections can't be shared with the processes forked after they were opened.
+        if _SESSION['pid'] != os.getpid():
+            session = requests.Session()
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(
+                pool_maxsize=comment_client_settings.POOL_SIZE,
+                max_retries=Retry(total=comment_client_settings.MAX_RETRIES, read=False, backoff_factor=0.1),
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _SESSION.update(pid=os.getpid(), session=session)
+        return _SESSION['session']
+
+
+def pooled_request(method, url, **kwargs):
+    """
+    Sends a request to the comments service over the shared session, like
+    `requests.request`, and returns the response.
+    """
+    session = get_session()
+    pool = session.get_adapter(url).poolmanager.connection_from_url(url)
+    num_connections = pool.num_connections
+    response = session.request(method, url, **kwargs)
+    dog_stats_api.increment(
+        'comment_client.request.connection',
+        tags=[u'reused:{}'.format(pool.num_connections == num_connections)],
+    )
+    return response
+
+
+def _get_request_cache():
+    """
+    Returns the comment client's cache for the current request, or None
+    outside of a request.
+    """
+    if request_cache.get_request() is None:
+        return None
+    return request_cache.get_cache(REQUEST_CACHE_NAME)
+
+
+def _get_forums_config():
+    """
+    Returns the current ForumsConfig, loaded once per request.
+    """
     # To avoid dependency conflict
     from django_comment_common.models import ForumsConfig
-    config = ForumsConfig.current()
+    cache = _get_request_cache()
+    if cache is None:
+        return ForumsConfig.current()
+    if 'forums_config' not in cache:
+        cache['forums_config'] = ForumsConfig.current()
+    return cache['forums_config']
+
+
+def perform_request(method, url, data_or_params=None, raw=False,
+                    metric_action=None, metric_tags=None, paged_results=False):
+    config = _get_forums_config()
 
     if not config.enabled:
         raise CommentClientMaintenanceError('service disabled')
@@ -71,6 +153,22 @@ def perform_request(method, url, data_or_params=None, raw=False,
 
     if data_or_params is None:
         data_or_params = {}
+
+    # Identical lookups made during a request, like those of the requesting
+    # user or of the thread being viewed, reuse the response of the first
+    # one.  Any change made through the comments service discards them.
+    responses = None
+    coalesce_key = None
+    cache = _get_request_cache()
+    if cache is not None:
+        responses = cache.setdefault('responses', {})
+        if method != 'get':
+            responses.clear()
+        elif metric_action in COALESCED_METRIC_ACTIONS:
+            coalesce_key = (url, raw, repr(sorted(data_or_params.items())), get_language())
+            if coalesce_key in responses:
+                dog_stats_api.increment('comment_client.request.coalesced', tags=metric_tags)
+                return copy.deepcopy(responses[coalesce_key])
     headers = {
         'X-Edx-Api-Key': config.api_key,
         'Accept-Language': get_language(),
@@ -85,7 +183,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = pooled_request(
             method,
             url,
             data=data,
@@ -109,36 +207,38 @@ def perform_request(method, url, data_or_params=None, raw=False,
         raise CommentClientMaintenanceError(response.text)
     elif response.status_code == 500:
         raise CommentClient500Error(response.text)
+    elif raw:
+        result = response.text
     else:
-        if raw:
-            return response.text
-        else:
-            try:
-                data = response.json()
-            except ValueError:
-                raise CommentClientError(
-                    u"Invalid JSON response for request {request_id}; first 100 characters: '{content}'".format(
-                        request_id=request_id,
-                        content=response.text[:100]
-                    )
-                )
-            if paged_results:
-                dog_stats_api.histogram(
-                    'comment_client.request.paged.result_count',
-                    value=len(data.get('collection', [])),
-                    tags=metric_tags
-                )
-                dog_stats_api.histogram(
-                    'comment_client.request.paged.page',
-                    value=data.get('page', 1),
-                    tags=metric_tags
-                )
-                dog_stats_api.histogram(
-                    'comment_client.request.paged.num_pages',
-                    value=data.get('num_pages', 1),
-                    tags=metric_tags
+        try:
+            result = response.json()
+        except ValueError:
+            raise CommentClientError(
+                u"Invalid JSON response for request {request_id}; first 100 characters: '{content}'".format(
+                    request_id=request_id,
+                    content=response.text[:100]
                 )
-            return data
+            )
+        if paged_results:
+            dog_stats_api.histogram(
+                'comment_client.request.paged.result_count',
+                value=len(result.get('collection', [])),
+                tags=metric_tags
+            )
+            dog_stats_api.histogram(
+                'comment_client.request.paged.page',
+                value=result.get('page', 1),
+                tags=metric_tags
+            )
+            dog_stats_api.histogram(
+                'comment_client.request.paged.num_pages',
+                value=result.get('num_pages', 1),
+                tags=metric_tags
+            )
+
+    if coalesce_key is not None:
+        responses[coalesce_key] = copy.deepcopy(result)
+    return result
 
 
 class CommentClientError(Exception):
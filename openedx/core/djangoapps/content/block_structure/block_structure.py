@@ -6,9 +6,12 @@ Module with family of classes for block structures.
 
 The following internal data structures are implemented:
     _BlockRelations - Data structure for a single block's relations.
+    _CompactBlockRelations - Data structure for the relations of all
+        blocks in a structure.
     _BlockData - Data structure for a single block's data.
 """
-from copy import deepcopy
+import sys
+from array import array
 from functools import partial
 from logging import getLogger
 
@@ -28,6 +31,11 @@ class _BlockRelations(object):
     """
     Data structure to encapsulate relationships for a single block,
     including its children and parents.
+
+    Block structures stored before version 3 of BlockStructureBlockData
+    map each usage key to one of these; _CompactBlockRelations uses them
+    for the blocks whose relations changed, with integer ids in place
+    of usage keys.
     """
     def __init__(self):
 
@@ -40,6 +48,258 @@ class _BlockRelations(object):
         self.children = []
 
 
+def _id_array(values=()):
+    """
+    Returns an array of block ids holding the given values.
+    """
+    return array('i', values)
+
+
+def _pack_ids(id_array):
+    """
+    Serializes an array of block ids to little-endian bytes.
+    """
+    if sys.byteorder != 'little':
+        id_array = _id_array(id_array)
+        id_array.byteswap()
+    return id_array.tostring()
+
+
+def _unpack_ids(data):
+    """
+    Deserializes an array of block ids from little-endian bytes.
+    """
+    id_array = _id_array()
+    id_array.fromstring(data)
+    if sys.byteorder != 'little':
+        id_array.byteswap()
+    return id_array
+
+
+class _CompactBlockRelations(object):
+    """
+    Data structure to encapsulate the relationships of all the blocks
+    in a block structure.
+
+    Each block's usage key is interned to an integer id, its index in
+    `keys`.  The ids of the blocks' parents and children are stored in
+    CSR-style arrays: the children of the block with id i are
+    children[child_offsets[i]:child_offsets[i + 1]], and likewise for
+    its parents.
+
+    The arrays are never changed, so that copies of the relations can
+    share them.  Instead, blocks whose relations change are given their
+    own _BlockRelations of ids, which take precedence over the arrays,
+    and removed blocks are recorded in a set.  Only the arrays are
+    pickled, after folding any changes into new arrays.
+    """
+    def __init__(self):
+
+        # List of the usage keys of the blocks, indexed by block id.
+        # list [UsageKey]
+        self.keys = []
+
+        # Map of a block's usage key to its block id.
+        # dict {UsageKey: int}
+        self.ids = {}
+
+        # Whether keys and ids are shared with a copy of these relations,
+        # and have to be copied before adding a block.
+        self._keys_shared = False
+
+        # CSR-style arrays of the parents and children of the blocks.
+        self._parent_offsets = _id_array([0])
+        self._parents = _id_array()
+        self._child_offsets = _id_array([0])
+        self._children = _id_array()
+
+        # Map of a block id to its changed relations.
+        # dict {int: _BlockRelations}
+        self._changed = {}
+
+        # Set of the ids of the removed blocks.
+        # set(int)
+        self._removed = set()
+
+    def __len__(self):
+        return len(self.keys) - len(self._removed)
+
+    def __contains__(self, usage_key):
+        block_id = self.ids.get(usage_key)
+        return block_id is not None and block_id not in self._removed
+
+    def __iter__(self):
+        keys = self.keys
+        return (usage_key for block_id, usage_key in enumerate(keys) if block_id not in self._removed)
+
+    def __getstate__(self):
+        relations = self.compacted() if self._changed or self._removed else self
+        return {
+            'keys': relations.keys,
+            'arrays': [
+                _pack_ids(id_array) for id_array in (
+                    relations._parent_offsets,  # pylint: disable=protected-access
+                    relations._parents,  # pylint: disable=protected-access
+                    relations._child_offsets,  # pylint: disable=protected-access
+                    relations._children,  # pylint: disable=protected-access
+                )
+            ],
+        }
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.keys = state['keys']
+        self.ids = {usage_key: block_id for block_id, usage_key in enumerate(self.keys)}
+        self._parent_offsets, self._parents, self._child_offsets, self._children = (
+            _unpack_ids(data) for data in state['arrays']
+        )
+
+    @classmethod
+    def from_dict(cls, block_relations):
+        """
+        Returns the compact relations equivalent to the given map of a
+        block's usage key to its _BlockRelations, the format used
+        before version 3 of BlockStructureBlockData.
+        """
+        relations = cls()
+        for usage_key in block_relations:
+            relations.add_block(usage_key)
+        for usage_key, block_relations_entry in block_relations.iteritems():
+            changed = relations._changed[relations.ids[usage_key]]  # pylint: disable=protected-access
+            changed.parents = [relations.add_block(parent) for parent in block_relations_entry.parents]
+            changed.children = [relations.add_block(child) for child in block_relations_entry.children]
+        return relations.compacted()
+
+    def get_id(self, usage_key):
+        """
+        Returns the block id of the given usage key.  Raises KeyError
+        if the block is not in the relations.
+        """
+        block_id = self.ids[usage_key]
+        if block_id in self._removed:
+            raise KeyError(usage_key)
+        return block_id
+
+    def get_parent_ids(self, block_id):
+        """
+        Returns the ids of the parents of the block with the given id.
+        """
+        changed = self._changed.get(block_id)
+        if changed is not None:
+            return changed.parents
+        if block_id in self._removed:
+            return []
+        return self._parents[self._parent_offsets[block_id]:self._parent_offsets[block_id + 1]]
+
+    def get_child_ids(self, block_id):
+        """
+        Returns the ids of the children of the block with the given id.
+        """
+        changed = self._changed.get(block_id)
+        if changed is not None:
+            return changed.children
+        if block_id in self._removed:
+            return []
+        return self._children[self._child_offsets[block_id]:self._child_offsets[block_id + 1]]
+
+    def add_block(self, usage_key):
+        """
+        Adds the block with the given usage key, if it isn't there
+        already, and returns its block id.
+        """
+        block_id = self.ids.get(usage_key)
+        if block_id is None:
+            if self._keys_shared:
+                self.keys = list(self.keys)
+                self.ids = dict(self.ids)
+                self._keys_shared = False
+            block_id = self.ids[usage_key] = len(self.keys)
+            self.keys.append(usage_key)
+            self._changed[block_id] = _BlockRelations()
+        elif block_id in self._removed:
+            self._removed.discard(block_id)
+            self._changed[block_id] = _BlockRelations()
+        return block_id
+
+    def remove_block(self, block_id):
+        """
+        Removes the block with the given id.  Its parents and children
+        are left unchanged.
+        """
+        self._changed.pop(block_id, None)
+        self._removed.add(block_id)
+
+    def get_relations_to_update(self, block_id):
+        """
+        Returns the _BlockRelations of ids of the block with the given
+        id, which can be changed in place.
+        """
+        changed = self._changed.get(block_id)
+        if changed is None:
+            changed = _BlockRelations()
+            changed.parents = list(self.get_parent_ids(block_id))
+            changed.children = list(self.get_child_ids(block_id))
+            self._changed[block_id] = changed
+        return changed
+
+    def add_relation(self, parent_id, child_id):
+        """
+        Adds a parent to child relationship between the blocks with
+        the given ids.
+        """
+        self.get_relations_to_update(parent_id).children.append(child_id)
+        self.get_relations_to_update(child_id).parents.append(parent_id)
+
+    def copy(self):
+        """
+        Returns a copy of these relations that can be changed without
+        affecting the original.
+        """
+        relations_copy = _CompactBlockRelations()
+        relations_copy.keys = self.keys
+        relations_copy.ids = self.ids
+        relations_copy._keys_shared = self._keys_shared = True  # pylint: disable=protected-access
+        relations_copy._parent_offsets = self._parent_offsets  # pylint: disable=protected-access
+        relations_copy._parents = self._parents  # pylint: disable=protected-access
+        relations_copy._child_offsets = self._child_offsets  # pylint: disable=protected-access
+        relations_copy._children = self._children  # pylint: disable=protected-access
+        for block_id, changed in self._changed.iteritems():
+            changed_copy = relations_copy._changed[block_id] = _BlockRelations()  # pylint: disable=protected-access
+            changed_copy.parents = list(changed.parents)
+            changed_copy.children = list(changed.children)
+        relations_copy._removed = set(self._removed)  # pylint: disable=protected-access
+        return relations_copy
+
+    def compacted(self, block_ids=None):
+        """
+        Returns new relations holding only the blocks with the given ids,
+        in the given order, with all their relations in arrays.  Relations
+        with blocks that are left out are dropped.
+
+        Arguments:
+            block_ids (list[int]) - The ids of the blocks to keep. If None,
+                all the blocks are kept.
+        """
+        if block_ids is None:
+            block_ids = [block_id for block_id in xrange(len(self.keys)) if block_id not in self._removed]
+        new_ids = {block_id: new_id for new_id, block_id in enumerate(block_ids)}
+
+        relations = _CompactBlockRelations()
+        relations.keys = [self.keys[block_id] for block_id in block_ids]
+        relations.ids = {usage_key: new_id for new_id, usage_key in enumerate(relations.keys)}
+        # pylint: disable=protected-access
+        for block_id in block_ids:
+            relations._parents.extend(
+                new_ids[parent] for parent in self.get_parent_ids(block_id) if parent in new_ids
+            )
+            relations._parent_offsets.append(len(relations._parents))
+            relations._children.extend(
+                new_ids[child] for child in self.get_child_ids(block_id) if child in new_ids
+            )
+            relations._child_offsets.append(len(relations._children))
+        return relations
+
+
 class BlockStructure(object):
     """
     Base class for a block structure.  BlockStructures are constructed
@@ -56,14 +316,14 @@ class BlockStructure(object):
         # UsageKey
         self.root_block_usage_key = root_block_usage_key
 
-        # Map of a block's usage key to its block relations. The
-        # existence of a block in the structure is determined by its
-        # presence in this map.
-        # dict {UsageKey: _BlockRelations}
-        self._block_relations = {}
+        # Relations of all the blocks in the structure. The existence
+        # of a block in the structure is determined by its presence in
+        # the relations.
+        # _CompactBlockRelations
+        self._block_relations = _CompactBlockRelations()
 
         # Add the root block.
-        self._add_block(self._block_relations, root_block_usage_key)
+        self._block_relations.add_block(root_block_usage_key)
 
     def __iter__(self):
         """
@@ -91,7 +351,10 @@ class BlockStructure(object):
         Returns:
             [UsageKey] - A list of usage keys of the block's parents.
         """
-        return self._block_relations[usage_key].parents if usage_key in self else []
+        if usage_key not in self:
+            return []
+        relations = self._block_relations
+        return [relations.keys[parent] for parent in relations.get_parent_ids(relations.get_id(usage_key))]
 
     def get_children(self, usage_key):
         """
@@ -105,7 +368,10 @@ class BlockStructure(object):
         Returns:
             [UsageKey] - A list of usage keys of the block's children.
         """
-        return self._block_relations[usage_key].children if usage_key in self else []
+        if usage_key not in self:
+            return []
+        relations = self._block_relations
+        return [relations.keys[child] for child in relations.get_child_ids(relations.get_id(usage_key))]
 
     def set_root_block(self, usage_key):
         """
@@ -119,8 +385,9 @@ class BlockStructure(object):
             usage_key - The usage key of the block that is to be set as the
                 new root of the block structure.
         """
+        relations = self._block_relations
+        relations.get_relations_to_update(relations.get_id(usage_key)).parents = []
         self.root_block_usage_key = usage_key
-        self._block_relations[usage_key].parents = []
 
     def __contains__(self, usage_key):
         """
@@ -145,7 +412,7 @@ class BlockStructure(object):
             iterator(UsageKey) - An iterator of the usage
             keys of all the blocks in the block structure.
         """
-        return self._block_relations.iterkeys()
+        return iter(self._block_relations)
 
     #--- Block structure traversal methods ---#
 
@@ -167,13 +434,23 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_topologically method.
         """
-        return traverse_topologically(
-            start_node=start_node or self.root_block_usage_key,
-            get_parents=self.get_parents,
-            get_children=self.get_children,
-            filter_func=filter_func,
+        start_node = start_node or self.root_block_usage_key
+        if start_node not in self:
+            return traverse_topologically(
+                start_node=start_node,
+                get_parents=self.get_parents,
+                get_children=self.get_children,
+                filter_func=filter_func,
+                yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+            )
+        relations = self._block_relations
+        return self._block_keys_of(relations, traverse_topologically(
+            start_node=relations.get_id(start_node),
+            get_parents=relations.get_parent_ids,
+            get_children=relations.get_child_ids,
+            filter_func=self._block_id_filter(relations, filter_func),
             yield_descendants_of_unyielded=yield_descendants_of_unyielded,
-        )
+        ))
 
     def post_order_traversal(
             self,
@@ -192,42 +469,58 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_post_order method.
         """
-        return traverse_post_order(
-            start_node=start_node or self.root_block_usage_key,
-            get_children=self.get_children,
-            filter_func=filter_func,
-        )
+        start_node = start_node or self.root_block_usage_key
+        if start_node not in self:
+            return traverse_post_order(
+                start_node=start_node,
+                get_children=self.get_children,
+                filter_func=filter_func,
+            )
+        relations = self._block_relations
+        return self._block_keys_of(relations, traverse_post_order(
+            start_node=relations.get_id(start_node),
+            get_children=relations.get_child_ids,
+            filter_func=self._block_id_filter(relations, filter_func),
+        ))
 
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
 
+    @staticmethod
+    def _block_id_filter(relations, filter_func):
+        """
+        Returns a filter function on block ids for the given filter
+        function on usage keys.
+        """
+        if filter_func is None:
+            return None
+        keys = relations.keys
+        return lambda block_id: filter_func(keys[block_id])
+
+    @staticmethod
+    def _block_keys_of(relations, block_ids):
+        """
+        Returns a generator of the usage keys of the given block ids.
+        """
+        keys = relations.keys
+        return (keys[block_id] for block_id in block_ids)
+
     def _prune_unreachable(self):
         """
         Mutates this block structure by removing any unreachable blocks.
         """
-
-        # Create a new block relations map to store only those blocks
-        # that are still linked
-        pruned_block_relations = {}
-        old_block_relations = self._block_relations
+        relations = self._block_relations
+        if self.root_block_usage_key not in relations:
+            self._block_relations = _CompactBlockRelations()
+            return
 
         # Build the structure from the leaves up by doing a post-order
         # traversal of the old structure, thereby encountering only
         # reachable blocks.
-        for block_key in self.post_order_traversal():
-            # If the block is in the old structure,
-            if block_key in old_block_relations:
-                # Add it to the new pruned structure
-                self._add_block(pruned_block_relations, block_key)
-
-                # Add a relationship to only those old children that
-                # were also added to the new pruned structure.
-                for child in old_block_relations[block_key].children:
-                    if child in pruned_block_relations:
-                        self._add_to_relations(pruned_block_relations, block_key, child)
-
-        # Replace this structure's relations with the newly pruned one.
-        self._block_relations = pruned_block_relations
+        self._block_relations = relations.compacted(list(traverse_post_order(
+            start_node=relations.get_id(self.root_block_usage_key),
+            get_children=relations.get_child_ids,
+        )))
 
     def _add_relation(self, parent_key, child_key):
         """
@@ -237,44 +530,8 @@ class BlockStructure(object):
             parent_key (UsageKey) - Usage key of the parent block.
             child_key (UsageKey) - Usage key of the child block.
         """
-        self._add_to_relations(self._block_relations, parent_key, child_key)
-
-    @staticmethod
-    def _add_to_relations(block_relations, parent_key, child_key):
-        """
-        Adds a parent to child relationship in the given block
-        relations map.
-
-        Arguments:
-            block_relations (dict({UsageKey: _BlockRelations})) -
-                Internal map of a block's usage key to its
-                parents/children relations.
-
-            parent_key (UsageKey) - Usage key of the parent block.
-
-            child_key (UsageKey) - Usage key of the child block.
-        """
-        BlockStructure._add_block(block_relations, parent_key)
-        BlockStructure._add_block(block_relations, child_key)
-
-        block_relations[child_key].parents.append(parent_key)
-        block_relations[parent_key].children.append(child_key)
-
-    @staticmethod
-    def _add_block(block_relations, usage_key):
-        """
-        Adds the given usage_key to the given block_relations map.
-
-        Arguments:
-            block_relations (dict({UsageKey: _BlockRelations})) -
-                Internal map of a block's usage key to its
-                parents/children relations.
-
-            usage_key (UsageKey) - Usage key of the block that is to
-                be added to the given block_relations.
-        """
-        if usage_key not in block_relations:
-            block_relations[usage_key] = _BlockRelations()
+        relations = self._block_relations
+        relations.add_relation(relations.add_block(parent_key), relations.add_block(child_key))
 
 
 class FieldData(object):
@@ -392,6 +649,32 @@ class BlockData(FieldData):
         self.transformer_data = TransformerDataMap()
 
 
+def _copy_transformer_data_map(transformer_data_map):
+    """
+    Returns a copy of the given TransformerDataMap whose
+    TransformerData can be changed without affecting the original.
+    The data's values themselves are not copied.
+    """
+    transformer_data_map_copy = TransformerDataMap()
+    for transformer_name, transformer_data in transformer_data_map.iteritems():
+        transformer_data_copy = TransformerData()
+        transformer_data_copy.fields = dict(transformer_data.fields)
+        transformer_data_map_copy[transformer_name] = transformer_data_copy
+    return transformer_data_map_copy
+
+
+def _copy_block_data(block_data):
+    """
+    Returns a copy of the given BlockData whose fields and transformer
+    data can be changed without affecting the original.  The data's
+    values themselves are not copied.
+    """
+    block_data_copy = BlockData(block_data.location)
+    block_data_copy.fields = dict(block_data.fields)
+    block_data_copy.transformer_data = _copy_transformer_data_map(block_data.transformer_data)
+    return block_data_copy
+
+
 class BlockStructureBlockData(BlockStructure):
     """
     Subclass of BlockStructure that is responsible for managing block
@@ -401,7 +684,7 @@ class BlockStructureBlockData(BlockStructure):
     # update this value whenever the data structure changes. Dependent storage
     # layers can then use this value when serializing/deserializing block
     # structures, and invalidating any previously cached/stored data.
-    VERSION = 2
+    VERSION = 3
 
     def __init__(self, root_block_usage_key):
         super(BlockStructureBlockData, self).__init__(root_block_usage_key)
@@ -411,21 +694,39 @@ class BlockStructureBlockData(BlockStructure):
         # dict {UsageKey: BlockData}
         self._block_data_map = {}
 
+        # Set of usage keys of the blocks whose data belongs to this
+        # block structure alone, and can be changed in place.  None
+        # when the data of all blocks does, which is the case unless
+        # it is shared with a copy of the structure.
+        # set(UsageKey) or None
+        self._owned_block_data = None
+
         # Map of a transformer's name to its non-block-specific data.
         self.transformer_data = TransformerDataMap()
 
     def copy(self):
         """
-        Returns a new instance of BlockStructureBlockData with a
-        deep-copy of this instance's contents.
+        Returns a new instance of BlockStructureBlockData with this
+        instance's contents.
+
+        The contents are copied on write: both instances share the
+        relations arrays, and the data of each block until either of
+        them changes it through the methods of this class, at which
+        point that instance makes its own copy of the block's data.
+        Values stored in the data (lists, dicts, ...) are never copied,
+        so they must be replaced rather than changed in place.
         """
         from .factory import BlockStructureFactory
-        return BlockStructureFactory.create_new(
+        block_structure = BlockStructureFactory.create_new(
             self.root_block_usage_key,
-            deepcopy(self._block_relations),
-            deepcopy(self.transformer_data),
-            deepcopy(self._block_data_map),
+            self._block_relations.copy(),
+            _copy_transformer_data_map(self.transformer_data),
+            dict(self._block_data_map),
         )
+        # From now on, neither structure owns any block's data.
+        for structure in (self, block_structure):
+            structure._owned_block_data = set()  # pylint: disable=protected-access
+        return block_structure
 
     def iteritems(self):
         """
@@ -444,6 +745,9 @@ class BlockStructureBlockData(BlockStructure):
     def __getitem__(self, usage_key):
         """
         Returns the BlockData associated with the given key.
+
+        The BlockData may be shared with copies of this block structure,
+        so it must not be changed directly.
         """
         return self._block_data_map[usage_key]
 
@@ -506,6 +810,9 @@ class BlockStructureBlockData(BlockStructure):
 
         Raises KeyError if not found.
 
+        The TransformerData may be shared with copies of this block
+        structure, so it must not be changed directly.
+
         Arguments:
             usage_key (UsageKey) - Usage key of the block whose
                 transformer data is requested.
@@ -577,8 +884,8 @@ class BlockStructureBlockData(BlockStructure):
                 whose data entry is to be deleted.
         """
         try:
-            transformer_block_data = self.get_transformer_block_data(usage_key, transformer)
-            delattr(transformer_block_data, key)
+            self.get_transformer_block_data(usage_key, transformer)
+            delattr(self._get_or_create_block(usage_key).transformer_data[transformer], key)
         except (AttributeError, KeyError):
             pass
 
@@ -602,26 +909,30 @@ class BlockStructureBlockData(BlockStructure):
                 removed block's children become children of the
                 removed block's parents.
         """
-        children = self._block_relations[usage_key].children
-        parents = self._block_relations[usage_key].parents
+        relations = self._block_relations
+        block_id = relations.get_id(usage_key)
+        children = relations.get_child_ids(block_id)
+        parents = relations.get_parent_ids(block_id)
 
         # Remove block from its children.
         for child in children:
-            self._block_relations[child].parents.remove(usage_key)
+            relations.get_relations_to_update(child).parents.remove(block_id)
 
         # Remove block from its parents.
         for parent in parents:
-            self._block_relations[parent].children.remove(usage_key)
+            relations.get_relations_to_update(parent).children.remove(block_id)
 
         # Remove block.
-        self._block_relations.pop(usage_key, None)
+        relations.remove_block(block_id)
         self._block_data_map.pop(usage_key, None)
+        if self._owned_block_data is not None:
+            self._owned_block_data.discard(usage_key)
 
         # Recreate the graph connections if descendants are to be kept.
         if keep_descendants:
             for child in children:
                 for parent in parents:
-                    self._add_relation(parent, child)
+                    relations.add_relation(parent, child)
 
     def create_universal_filter(self):
         """
@@ -736,16 +1047,24 @@ class BlockStructureBlockData(BlockStructure):
 
     def _get_or_create_block(self, usage_key):
         """
-        Returns the BlockData associated with the given usage_key.
-        If not found, creates and returns a new BlockData and
-        maps it to the given key.
+        Returns the BlockData associated with the given usage_key, to
+        be changed.  If not found, creates and returns a new BlockData
+        and maps it to the given key.  If shared with another block
+        structure, copies it first.
         """
-        try:
-            return self._block_data_map[usage_key]
-        except KeyError:
-            block_data = BlockData(usage_key)
-            self._block_data_map[usage_key] = block_data
-            return block_data
+        block_data = self._block_data_map.get(usage_key)
+        if block_data is None:
+            # Use the usage key object of the block's relations, so
+            # that it is only pickled once.
+            block_id = self._block_relations.ids.get(usage_key)
+            if block_id is not None:
+                usage_key = self._block_relations.keys[block_id]
+            block_data = self._block_data_map[usage_key] = BlockData(usage_key)
+        elif self._owned_block_data is not None and usage_key not in self._owned_block_data:
+            block_data = self._block_data_map[usage_key] = _copy_block_data(block_data)
+        if self._owned_block_data is not None:
+            self._owned_block_data.add(usage_key)
+        return block_data
 
 
 class BlockStructureModulestoreData(BlockStructureBlockData):
@@ -32,6 +32,7 @@ class BlockStructureManager(object):
         """
         self.root_block_usage_key = root_block_usage_key
         self.modulestore = modulestore
+        self.cache = cache
         self.store = BlockStructureStore(cache)
 
     def get_transformed(self, transformers, starting_block_usage_key=None, collected_block_structure=None):
@@ -41,7 +42,9 @@ class BlockStructureManager(object):
         and modulestore, as needed.
 
         Details: Similar to the get_collected method, except the transformers'
-        transform methods are also called.
+        transform methods are also called.  When the CACHE_TRANSFORM_RESULTS
+        switch is enabled, the results of the transformers that declare a
+        transform_result_signature are cached and reused.
 
         Arguments:
             transformers (BlockStructureTransformers) - Collection of
@@ -73,7 +76,8 @@ class BlockStructureManager(object):
                     unicode(self.root_block_usage_key),
                 )
             block_structure.set_root_block(starting_block_usage_key)
-        transformers.transform(block_structure)
+        result_cache = self.cache if config.waffle().is_enabled(config.CACHE_TRANSFORM_RESULTS) else None
+        transformers.transform(block_structure, result_cache)
         return block_structure
 
     def get_collected(self):
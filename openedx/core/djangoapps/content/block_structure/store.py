@@ -7,7 +7,7 @@ from logging import getLogger
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
 from . import config
-from .block_structure import BlockStructureBlockData
+from .block_structure import BlockStructureBlockData, _CompactBlockRelations
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
 from .models import BlockStructureModel
@@ -205,6 +205,10 @@ class BlockStructureStore(object):
         Deserializes the given data and returns the parsed block_structure.
         """
         block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+        if isinstance(block_relations, dict):
+            # Stored before version 3 of BlockStructureBlockData; it can
+            # still be used until it's collected again.
+            block_relations = _CompactBlockRelations.from_dict(block_relations)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
             block_relations,
@@ -2,6 +2,7 @@
 Tests for block_structure.py
 """
 # pylint: disable=protected-access
+import cPickle as pickle
 from collections import namedtuple
 from copy import deepcopy
 import ddt
@@ -13,6 +14,7 @@ from openedx.core.lib.graph_traversals import traverse_post_order
 
 from ..block_structure import BlockStructure, BlockStructureModulestoreData
 from ..exceptions import TransformerException
+from ..factory import BlockStructureFactory
 from .helpers import MockXBlock, MockTransformer, ChildrenMapTestMixin
 
 
@@ -44,6 +46,43 @@ class TestBlockStructure(TestCase, ChildrenMapTestMixin):
             self.assertIn(node, block_structure)
         self.assertNotIn(len(children_map) + 1, block_structure)
 
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_relations_pickling(self, children_map):
+        block_structure = self.create_block_structure(children_map, BlockStructure)
+        unpickled = BlockStructure(block_structure.root_block_usage_key)
+        unpickled._block_relations = pickle.loads(pickle.dumps(block_structure._block_relations, -1))
+        self.assert_block_structure(unpickled, children_map)
+        self.assertFalse(unpickled._block_relations._changed)
+
+        # the unpickled relations can still change
+        unpickled._add_relation(0, len(children_map))
+        self.assertIn(len(children_map), unpickled.get_children(0))
+        self.assertEqual(unpickled.get_parents(len(children_map)), [0])
+        unpickled.set_root_block(1)
+        self.assertEqual(unpickled.get_parents(1), [])
+        self.assertEqual(set(unpickled.get_children(1)), set(children_map[1]))
+
+    def test_remove_block_after_pickling(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.DAG_CHILDREN_MAP)
+        block_structure._block_relations = pickle.loads(pickle.dumps(block_structure._block_relations, -1))
+        block_structure.remove_block(3, keep_descendants=True)
+        self.assert_block_structure(
+            block_structure, [[1, 2], [5, 6], [5, 6, 4], [], [], [], []], missing_blocks=[3],
+        )
+
+    def test_relations_pickling_after_removal(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.DAG_CHILDREN_MAP)
+        block_structure.remove_block(3, keep_descendants=True)
+        block_structure._block_relations = pickle.loads(pickle.dumps(block_structure._block_relations, -1))
+        self.assert_block_structure(
+            block_structure, [[1, 2], [5, 6], [5, 6, 4], [], [], [], []], missing_blocks=[3],
+        )
+        self.assertEqual(len(block_structure), 6)
+
 
 @attr(shard=2)
 @ddt.ddt
@@ -268,3 +307,89 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         _set_value(new_copy, 'edit2')
         self.assertEquals(_get_value(block_structure), 'edit1')
         self.assertEquals(_get_value(new_copy), 'edit2')
+
+    def test_copy_on_write(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+        for block in block_structure:
+            block_structure.set_transformer_block_field(block, 'transformer', 'test_key', block)
+        new_copy = block_structure.copy()
+
+        # unchanged blocks are shared
+        self.assertIs(new_copy[1], block_structure[1])
+        self.assertIs(new_copy._block_relations._children, block_structure._block_relations._children)
+
+        # changed blocks are not
+        new_copy.set_transformer_block_field(1, 'transformer', 'test_key', 'edit')
+        new_copy.set_root_block(1)
+        self.assertIsNot(new_copy[1], block_structure[1])
+        self.assertEquals(block_structure.get_transformer_block_field(1, 'transformer', 'test_key'), 1)
+        self.assertEquals(block_structure.get_parents(1), [0])
+        self.assertEquals(new_copy.get_parents(1), [])
+
+        # neither is pruning
+        new_copy._prune_unreachable()
+        self.assert_block_structure(block_structure, ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+        self.assertNotIn(0, new_copy)
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_copy_transforms_like_deep_copy(self, children_map):
+        def _transform(structure):
+            """
+            Changes the given structure the way transformers do.
+            """
+            structure.remove_block_traversal(lambda block: block == 2)
+            for index, block in enumerate(structure.topological_traversal()):
+                if index % 2 == 0:
+                    structure.set_transformer_block_field(block, 'transformer', 'test_key', 'edit')
+            structure.set_transformer_data('transformer', 'test_key', 'edit')
+            structure._prune_unreachable()
+            return structure
+
+        def _contents(structure):
+            """
+            Returns the relations and transformer fields of all blocks in the given structure.
+            """
+            return {
+                block: (
+                    structure.get_parents(block),
+                    structure.get_children(block),
+                    structure.get_transformer_block_field(block, 'transformer', 'test_key'),
+                )
+                for block in structure
+            }
+
+        block_structure = self.create_block_structure(children_map)
+        for block in block_structure:
+            block_structure.set_transformer_block_field(block, 'transformer', 'test_key', block)
+        original_contents = _contents(block_structure)
+
+        deep_copy = BlockStructureFactory.create_new(
+            block_structure.root_block_usage_key,
+            deepcopy(block_structure._block_relations),
+            deepcopy(block_structure.transformer_data),
+            deepcopy(block_structure._block_data_map),
+        )
+        transformed_copy = _transform(block_structure.copy())
+
+        self.assertEquals(_contents(transformed_copy), _contents(_transform(deep_copy)))
+        self.assertEquals(transformed_copy.get_transformer_data('transformer', 'test_key'), 'edit')
+        self.assertEquals(_contents(block_structure), original_contents)
+        self.assertIsNone(block_structure.get_transformer_data('transformer', 'test_key'))
+
+    def test_copy_of_copy(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
+        first_copy = block_structure.copy()
+        second_copy = first_copy.copy()
+
+        first_copy.remove_block(2, keep_descendants=True)
+        second_copy.remove_block(1, keep_descendants=False)
+        block_structure.set_transformer_data('transformer', 'test_key', 'original')
+        self.assertIsNone(first_copy.get_transformer_data('transformer', 'test_key'))
+
+        self.assert_block_structure(block_structure, [[1], [2], [3], []])
+        self.assert_block_structure(first_copy, [[1], [3], [], []], missing_blocks=[2])
+        self.assert_block_structure(second_copy, [[], [], [3], []], missing_blocks=[1])
@@ -0,0 +1,131 @@
+"""
+Performance tests comparing copy-on-write copies of collected block
+structures with the deep copies they replace.
+"""
+# pylint: disable=protected-access
+import gc
+import unittest
+from copy import deepcopy
+from timeit import default_timer
+
+import ddt
+
+from ..block_structure import BlockStructureBlockData
+from ..factory import BlockStructureFactory
+
+# Number of simulated requests per measurement; the fastest one is reported.
+REPEAT = 5
+
+
+def generate_block_structure(chapters, sequentials, verticals, problems):
+    """
+    Returns a collected block structure with the given fan-out at each
+    level, with a few xBlock fields and transformer fields per block.
+    """
+    block_structure = BlockStructureBlockData('course')
+
+    def add_block(block_key, parent_key=None, **fields):
+        """
+        Adds a block with the given fields under the given parent.
+        """
+        if parent_key is not None:
+            block_structure._add_relation(parent_key, block_key)
+        block_data = block_structure._get_or_create_block(block_key)
+        block_data.display_name = block_key
+        block_data.group_access = {}
+        for name, value in fields.iteritems():
+            setattr(block_data, name, value)
+        block_structure.set_transformer_block_field(block_key, 'visibility', 'merged_visible_to_staff_only', False)
+        block_structure.set_transformer_block_field(block_key, 'start_date', 'merged_start_date', None)
+
+    add_block('course', category='course')
+    for chapter in range(chapters):
+        chapter_key = 'chapter_{}'.format(chapter)
+        add_block(chapter_key, 'course', category='chapter')
+        for sequential in range(sequentials):
+            sequential_key = '{}_{}'.format(chapter_key, sequential)
+            add_block(sequential_key, chapter_key, category='sequential', graded=True)
+            for vertical in range(verticals):
+                vertical_key = '{}_{}'.format(sequential_key, vertical)
+                add_block(vertical_key, sequential_key, category='vertical')
+                for problem in range(problems):
+                    add_block(
+                        '{}_{}'.format(vertical_key, problem), vertical_key, category='problem', weight=1.0,
+                    )
+    block_structure.set_transformer_data('grades', 'course_version', 1)
+    return block_structure
+
+
+def deep_copy(block_structure):
+    """
+    Copies the block structure the way BlockStructureBlockData.copy used to.
+    """
+    return BlockStructureFactory.create_new(
+        block_structure.root_block_usage_key,
+        deepcopy(block_structure._block_relations),
+        deepcopy(block_structure.transformer_data),
+        deepcopy(block_structure._block_data_map),
+    )
+
+
+def transform(block_structure, written_every):
+    """
+    Simulates the transformers of a request: removes every tenth
+    problem and writes a transformer field on every written_every-th block.
+    """
+    block_structure.remove_block_traversal(
+        lambda block_key: block_key.endswith('_0') and block_key.count('_') == 4
+    )
+    for index, block_key in enumerate(block_structure.topological_traversal()):
+        if index % written_every == 0:
+            block_structure.set_transformer_block_field(block_key, 'block_depth', 'block_depth', index)
+    block_structure._prune_unreachable()
+    return block_structure
+
+
+def time_request(copy, collected, written_every):
+    """
+    Returns the best wall-clock time of copying and transforming the
+    collected structure, and the number of gc-tracked objects the
+    transformed copy keeps alive.
+    """
+    best = None
+    for __ in range(REPEAT):
+        start = default_timer()
+        transform(copy(collected), written_every)
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    before = len(gc.get_objects())
+    result = transform(copy(collected), written_every)  # pylint: disable=unused-variable
+    gc.collect()
+    return best, len(gc.get_objects()) - before
+
+
+@ddt.ddt
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip("performance test, run manually")
+class BlockStructureCopyPerf(unittest.TestCase):
+    """
+    Compares the per-request time and memory of copying collected
+    block structures.
+    """
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(
+        ((10, 5, 5, 3), 10),
+        ((20, 10, 5, 4), 10),
+        ((20, 10, 5, 4), 1),
+    )
+    @ddt.unpack
+    def test_copy(self, shape, written_every):
+        collected = generate_block_structure(*shape)
+        print "\n{} blocks, transformer field written on 1 of {} blocks".format(len(collected), written_every)
+        for name, copy in (('deepcopy', deep_copy), ('copy-on-write', BlockStructureBlockData.copy)):
+            seconds, objects = time_request(copy, collected, written_every)
+            print "{:>14}: {:8.2f}ms per request, {:>7} live objects".format(name, seconds * 1000, objects)
+
@@ -1,11 +1,16 @@
 """
 Tests for block_structure/cache.py
 """
+import zlib
+
 import ddt
 from nose.plugins.attrib import attr
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+from ..block_structure import _BlockRelations
 from ..config import STORAGE_BACKING_FOR_CACHE, waffle
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
@@ -90,3 +95,49 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.assertEquals(self.mock_cache.timeout_from_last_call, 0)
         self.store.add(self.block_structure)
         self.assertEquals(self.mock_cache.timeout_from_last_call, timeout)
+
+    def test_serialize_compact_relations(self):
+        self.block_structure.remove_block(self.block_key_factory(4), keep_descendants=False)
+        for block_key in self.block_structure:
+            self.block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', 'val')
+        serialized_data = self.store._serialize(self.block_structure)  # pylint: disable=protected-access
+
+        # the removal is folded into the arrays, and no per-block relations are pickled
+        self.assertNotIn('_BlockRelations', zlib.decompress(serialized_data))
+        block_relations, __, block_data_map = zunpickle(serialized_data)
+        self.assertEquals(block_relations._changed, {})  # pylint: disable=protected-access
+        self.assertEquals(len(block_relations), 4)
+
+        # the block data share the usage keys of the relations, so that each is pickled once
+        self.assertEquals(len(block_data_map), 4)
+        for block_key, block_data in block_data_map.iteritems():
+            self.assertIs(block_key, block_relations.keys[block_relations.ids[block_key]])
+            self.assertIs(block_data.location, block_key)
+
+        block_structure = self.store._deserialize(  # pylint: disable=protected-access
+            serialized_data, self.block_structure.root_block_usage_key,
+        )
+        self.assert_block_structure(block_structure, [[1, 2], [3], [], [], []], missing_blocks=[4])
+        self.assertEquals(
+            block_structure.get_transformer_block_field(self.block_key_factory(3), MockTransformer, 'test'), 'val',
+        )
+
+    def test_deserialize_relations_before_version_3(self):
+        block_relations = {}
+        for parent, children in enumerate(self.children_map):
+            parent_key = self.block_key_factory(parent)
+            block_relations.setdefault(parent_key, _BlockRelations())
+            for child in children:
+                child_key = self.block_key_factory(child)
+                block_relations[parent_key].children.append(child_key)
+                block_relations.setdefault(child_key, _BlockRelations()).parents.append(parent_key)
+        serialized_data = zpickle((
+            block_relations,
+            self.block_structure.transformer_data,
+            self.block_structure._block_data_map,  # pylint: disable=protected-access
+        ))
+
+        block_structure = self.store._deserialize(  # pylint: disable=protected-access
+            serialized_data, self.block_structure.root_block_usage_key,
+        )
+        self.assert_block_structure(block_structure, self.children_map)
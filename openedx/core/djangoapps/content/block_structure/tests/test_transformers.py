@@ -1,15 +1,16 @@
 """
 Tests for transformers.py
 """
+import ddt
 from mock import MagicMock, patch
 from nose.plugins.attrib import attr
 from unittest import TestCase
 
 from ..block_structure import BlockStructureModulestoreData
 from ..exceptions import TransformerException, TransformerDataIncompatible
-from ..transformers import BlockStructureTransformers
+from ..transformers import BlockStructureTransformers, COLLECTED_VERSION_KEY, COLLECTION_DATA_NAME
 from .helpers import (
-    ChildrenMapTestMixin, MockTransformer, MockFilteringTransformer, mock_registered_transformers
+    ChildrenMapTestMixin, MockCache, MockTransformer, MockFilteringTransformer, mock_registered_transformers
 )
 
 
@@ -82,3 +83,143 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
                 self.transformers.verify_versions(block_structure)
             self.transformers.collect(block_structure)
             self.assertTrue(self.transformers.verify_versions(block_structure))
+
+        self.assertIsNotNone(block_structure.get_transformer_data(COLLECTION_DATA_NAME, COLLECTED_VERSION_KEY))
+
+
+class RemovalTransformer(MockFilteringTransformer):
+    """
+    A filtering transformer that removes the blocks listed in the
+    usage_info, and declares them as its result's signature.
+    """
+    def transform_block_filters(self, usage_info, block_structure):
+        usage_info.filters_call_count += 1
+        return [
+            block_structure.create_removal_filter(lambda block_key: block_key in usage_info.removed),
+            block_structure.create_removal_filter(
+                lambda block_key: block_key in usage_info.removed_keeping_descendants,
+                keep_descendants=True,
+            ),
+        ]
+
+    def transform_result_signature(self, usage_info, block_structure):
+        if usage_info.signature_declared:
+            return (tuple(sorted(usage_info.removed)), tuple(sorted(usage_info.removed_keeping_descendants)))
+        return None
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestTransformResultCache(ChildrenMapTestMixin, TestCase):
+    """
+    Test class for the caching of transform results, comparing the
+    results of cached transforms with those of uncached transforms.
+    """
+    def setUp(self):
+        super(TestTransformResultCache, self).setUp()
+        self.cache = MockCache()
+        self.registered_transformers = [RemovalTransformer(), MockFilteringTransformer()]
+
+    def create_collected_block_structure(self, children_map, collected_version=u'version'):
+        """
+        Returns a block structure for the given children_map, as if it
+        were collected with the given version.
+        """
+        block_structure = self.create_block_structure(children_map)
+        if collected_version:
+            block_structure.set_transformer_data(COLLECTION_DATA_NAME, COLLECTED_VERSION_KEY, collected_version)
+        return block_structure
+
+    def transform(self, collected, removed=(), removed_keeping_descendants=(), signature_declared=True, cache=None):
+        """
+        Returns a copy of the collected block structure transformed for
+        a usage removing the given blocks, and the number of times the
+        transformer's filters were computed.
+        """
+        usage_info = MagicMock(
+            removed=set(removed),
+            removed_keeping_descendants=set(removed_keeping_descendants),
+            signature_declared=signature_declared,
+            filters_call_count=0,
+        )
+        with mock_registered_transformers(self.registered_transformers):
+            transformers = BlockStructureTransformers(self.registered_transformers, usage_info)
+            block_structure = collected.copy()
+            transformers.transform(block_structure, cache)
+        return block_structure, usage_info.filters_call_count
+
+    def assert_same_structure(self, block_structure, expected_block_structure):
+        """
+        Verifies that the given block structures have the same blocks
+        and relations.
+        """
+        self.assertEqual(set(block_structure), set(expected_block_structure))
+        for block_key in expected_block_structure:
+            self.assertEqual(
+                set(block_structure.get_children(block_key)),
+                set(expected_block_structure.get_children(block_key)),
+            )
+            self.assertEqual(
+                set(block_structure.get_parents(block_key)),
+                set(expected_block_structure.get_parents(block_key)),
+            )
+
+    @ddt.data(
+        (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, {1}, ()),
+        (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, {3}, {1}),
+        (ChildrenMapTestMixin.LINEAR_CHILDREN_MAP, (), {1, 2}),
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, {1}, ()),
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, {1, 4}, {2}),
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, {2, 5}, {3}),
+    )
+    @ddt.unpack
+    def test_cached_matches_uncached(self, children_map, removed, removed_keeping_descendants):
+        collected = self.create_collected_block_structure(children_map)
+        uncached, __ = self.transform(collected, removed, removed_keeping_descendants)
+
+        first, first_call_count = self.transform(collected, removed, removed_keeping_descendants, cache=self.cache)
+        self.assert_same_structure(first, uncached)
+        self.assertEqual(first_call_count, 1)
+        self.assertEqual(len(self.cache.map), 1)
+
+        second, second_call_count = self.transform(collected, removed, removed_keeping_descendants, cache=self.cache)
+        self.assert_same_structure(second, uncached)
+        self.assertEqual(second_call_count, 0)
+
+    def test_cached_per_signature(self):
+        collected = self.create_collected_block_structure(self.DAG_CHILDREN_MAP)
+        self.transform(collected, {1}, cache=self.cache)
+        other, __ = self.transform(collected, {2}, cache=self.cache)
+        self.assert_same_structure(other, self.transform(collected, {2})[0])
+        self.assertEqual(len(self.cache.map), 2)
+
+    def test_cached_per_collected_version(self):
+        self.transform(self.create_collected_block_structure(self.DAG_CHILDREN_MAP), {1}, cache=self.cache)
+        __, call_count = self.transform(
+            self.create_collected_block_structure(self.DAG_CHILDREN_MAP, u'other version'), {1}, cache=self.cache,
+        )
+        self.assertEqual(call_count, 1)
+        self.assertEqual(len(self.cache.map), 2)
+
+    def test_cached_per_root(self):
+        collected = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        self.transform(collected, {3}, cache=self.cache)
+        collected.set_root_block(1)
+        block_structure, call_count = self.transform(collected, {3}, cache=self.cache)
+        self.assertEqual(call_count, 1)
+        self.assertEqual(set(block_structure), {1, 4})
+
+    @ddt.data(
+        {'signature_declared': False},
+        {'collected_version': None},
+    )
+    @ddt.unpack
+    def test_not_cached(self, signature_declared=True, collected_version=u'version'):
+        collected = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP, collected_version)
+        for __ in range(2):
+            block_structure, call_count = self.transform(
+                collected, {1}, signature_declared=signature_declared, cache=self.cache,
+            )
+            self.assertEqual(call_count, 1)
+            self.assertEqual(set(block_structure), {0, 2})
+        self.assertEqual(self.cache.map, {})
@@ -207,3 +207,34 @@ class FilteringTransformerMixin(BlockStructureTransformer):
                 transformer, that is to be transformed in place.
         """
         raise NotImplementedError
+
+    def transform_result_signature(self, usage_info, block_structure):  # pylint: disable=unused-argument
+        """
+        Optionally declares which parts of the given usage_info the
+        result of transform_block_filters depends on, allowing the
+        framework to cache the blocks removed by this transformer and
+        to reuse them for all equivalent usages.
+
+        Transformers opt in by returning a value that is the same for
+        any two usages for which the filters remove the same blocks
+        from the same collected block structure - for example, a tuple
+        of the user's group ids.  The value must be made of
+        primitives whose repr is stable (strings, numbers, booleans,
+        None and tuples of them).
+
+        Transformers whose filters depend on anything else (the
+        current time, the user's state, ...) or have side effects
+        should not opt in.
+
+        Arguments:
+            usage_info (any negotiated type) - See the description in
+                transform_block_filters.
+
+            block_structure (BlockStructureBlockData) - See the
+                description in transform_block_filters.
+
+        Returns:
+            A hashable signature, or None if the result of the filters
+            may not be cached.
+        """
+        return None
@@ -2,8 +2,13 @@
 Module for a collection of BlockStructureTransformers.
 """
 import functools
+from hashlib import sha1
 from logging import getLogger
+from uuid import uuid4
 
+from openedx.core.djangoapps import monitoring_utils
+
+from . import config
 from .exceptions import TransformerException, TransformerDataIncompatible
 from .transformer import FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
@@ -11,6 +16,14 @@ from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
+# Name under which the framework's own data is stored along with the
+# transformers' data in collected block structures.
+COLLECTION_DATA_NAME = u'block_structure_collection'
+
+# Key of the random version that identifies each collection of a block
+# structure, and so the results of transforming it.
+COLLECTED_VERSION_KEY = u'collected_version'
+
 
 class BlockStructureTransformers(object):
     """
@@ -79,6 +92,8 @@ class BlockStructureTransformers(object):
             block_structure._add_transformer(transformer)  # pylint: disable=protected-access
             transformer.collect(block_structure)
 
+        block_structure.set_transformer_data(COLLECTION_DATA_NAME, COLLECTED_VERSION_KEY, uuid4().hex)
+
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
@@ -105,20 +120,25 @@ class BlockStructureTransformers(object):
             )
         return True
 
-    def transform(self, block_structure):
+    def transform(self, block_structure, result_cache=None):
         """
         The given block structure is transformed by each transformer in the
         collection. Tranformers with filters are combined and run first in a
         single course tree traversal, then remaining transformers are run in
         the order that they were added.
+
+        If a result_cache (django.core.cache.backends.base.BaseCache) is
+        given, the blocks removed by each filtering transformer that
+        declares a transform_result_signature are cached in it and
+        reused for usages with the same signature.
         """
-        self._transform_with_filters(block_structure)
+        self._transform_with_filters(block_structure, result_cache)
         self._transform_without_filters(block_structure)
 
         # Prune the block structure to remove any unreachable blocks.
         block_structure._prune_unreachable()  # pylint: disable=protected-access
 
-    def _transform_with_filters(self, block_structure):
+    def _transform_with_filters(self, block_structure, result_cache=None):
         """
         Transforms the given block_structure using the transform_block_filters
         method from the given transformers.
@@ -128,7 +148,7 @@ class BlockStructureTransformers(object):
 
         filters = []
         for transformer in self._transformers['supports_filter']:
-            filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+            filters.extend(self._get_block_filters(transformer, block_structure, result_cache))
 
         combined_filters = functools.reduce(
             self._filter_chain,
@@ -137,6 +157,87 @@ class BlockStructureTransformers(object):
         )
         block_structure.filter_topological_traversal(combined_filters)
 
+    def _get_block_filters(self, transformer, block_structure, result_cache):
+        """
+        Returns the filters of the given transformer for the given
+        block_structure, applying its cached removals if available.
+        """
+        cache_key = self._result_cache_key(transformer, block_structure) if result_cache else None
+        if cache_key is None:
+            return transformer.transform_block_filters(self.usage_info, block_structure)
+
+        removals = result_cache.get(cache_key)
+        if removals is None:
+            monitoring_utils.increment(u'block_structure.transform_result_cache.{}.miss'.format(transformer.name()))
+            removals = self._get_removals(transformer, block_structure)
+            result_cache.set(cache_key, removals, timeout=config.cache_timeout_in_seconds())
+        else:
+            monitoring_utils.increment(u'block_structure.transform_result_cache.{}.hit'.format(transformer.name()))
+
+        removed, removed_keeping_descendants = removals
+        return [
+            block_structure.create_removal_filter(lambda block_key: block_key in removed),
+            block_structure.create_removal_filter(
+                lambda block_key: block_key in removed_keeping_descendants,
+                keep_descendants=True,
+            ),
+        ]
+
+    def _result_cache_key(self, transformer, block_structure):
+        """
+        Returns the key under which the removals of the given transformer
+        for the given block_structure and this collection's usage_info are
+        cached, or None if they may not be cached.
+        """
+        collected_version = block_structure.get_transformer_data(COLLECTION_DATA_NAME, COLLECTED_VERSION_KEY)
+        if collected_version is None:
+            # Collected before transform results were cached.
+            return None
+
+        signature = transformer.transform_result_signature(self.usage_info, block_structure)
+        if signature is None:
+            return None
+
+        return u'transform_result.{}.{}'.format(
+            transformer.name(),
+            sha1(repr((
+                collected_version,
+                unicode(block_structure.root_block_usage_key),
+                transformer.READ_VERSION,
+                transformer.WRITE_VERSION,
+                signature,
+            ))).hexdigest(),
+        )
+
+    def _get_removals(self, transformer, block_structure):
+        """
+        Returns the blocks that the given transformer alone removes from
+        the given block_structure, as a pair of sets: the blocks removed
+        along with their descendants, and the blocks whose descendants
+        are kept.
+
+        The transformer is run on a copy of the block structure, so the
+        removals don't depend on the other transformers.
+        """
+        removals = (set(), set())
+        block_structure_copy = block_structure.copy()
+        remove_block = block_structure_copy.remove_block
+
+        def record_removal(usage_key, keep_descendants):
+            """
+            Records the removal of the block before removing it.
+            """
+            removals[bool(keep_descendants)].add(usage_key)
+            remove_block(usage_key, keep_descendants)
+
+        block_structure_copy.remove_block = record_removal
+        block_structure_copy.filter_topological_traversal(functools.reduce(
+            self._filter_chain,
+            transformer.transform_block_filters(self.usage_info, block_structure_copy),
+            block_structure_copy.create_universal_filter()
+        ))
+        return removals
+
     def _filter_chain(self, accumulated, additional):
         """
         Given two functions that take a block_key and return a boolean, yield
@@ -1,11 +1,15 @@
 """
 Declaration of CourseOverview model
 """
+import copy
 import json
 import logging
+import time
 from urlparse import urlparse, urlunparse
+from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models, transaction
 from django.db.models.fields import BooleanField, DateTimeField, DecimalField, TextField, FloatField, IntegerField
 from django.db.utils import IntegrityError
@@ -17,7 +21,9 @@ from opaque_keys.edx.keys import CourseKey
 
 from config_models.models import ConfigurationModel
 from lms.djangoapps import django_comment_client
+from openedx.core.djangoapps import monitoring_utils
 from openedx.core.djangoapps.models.course_details import CourseDetails
+from openedx.core.lib.cache_utils import LRUCache
 from static_replace.models import AssetBaseUrlConfig
 from xmodule import course_metadata_utils, block_metadata_utils
 from xmodule.course_module import CourseDescriptor, DEFAULT_START_DATE
@@ -27,6 +33,25 @@ from openedx.core.djangoapps.xmodule_django.models import CourseKeyField, UsageK
 
 log = logging.getLogger(__name__)
 
+_OVERVIEW_LRU_CACHE = {}
+
+
+def get_overview_lru_cache():
+    """
+    Return the process-wide LRUCache of CourseOverviews, or None if it is
+    disabled.
+
+    Its capacity is the ``COURSE_OVERVIEW_CACHE_LRU_SIZE`` setting, in
+    number of overviews; 0 disables it.
+    """
+    max_size = getattr(settings, 'COURSE_OVERVIEW_CACHE_LRU_SIZE', 0)
+    if not max_size:
+        return None
+    if max_size not in _OVERVIEW_LRU_CACHE:
+        _OVERVIEW_LRU_CACHE.clear()
+        _OVERVIEW_LRU_CACHE[max_size] = LRUCache(max_size)
+    return _OVERVIEW_LRU_CACHE[max_size]
+
 
 class CourseOverview(TimeStampedModel):
     """
@@ -251,6 +276,10 @@ class CourseOverview(TimeStampedModel):
                     )
                     raise
 
+                # Saving the overview cleared it from the cache before the
+                # transaction was committed, so concurrent readers may have
+                # cached the previous overview meanwhile.
+                cls.clear_cache(course_id)
                 return course_overview
             elif course is not None:
                 raise IOError(
@@ -283,6 +312,11 @@ class CourseOverview(TimeStampedModel):
             - IOError if some other error occurs while trying to load the
                 course from the module store.
         """
+        cache_versions = cls._get_cache_versions([course_id])
+        course_overview = cls._get_from_cache([course_id], cache_versions).get(course_id)
+        if course_overview:
+            return course_overview
+
         try:
             course_overview = cls.objects.select_related('image_set').get(id=course_id)
             if course_overview.version < cls.VERSION:
@@ -298,7 +332,9 @@ class CourseOverview(TimeStampedModel):
         if course_overview and not hasattr(course_overview, 'image_set'):
             CourseOverviewImageSet.create(course_overview)
 
-        return course_overview or cls.load_from_module_store(course_id)
+        course_overview = course_overview or cls.load_from_module_store(course_id)
+        cls._set_in_cache([course_overview], cache_versions)
+        return course_overview
 
     @classmethod
     def get_from_ids_if_exists(cls, course_ids):
@@ -312,14 +348,151 @@ class CourseOverview(TimeStampedModel):
         Callers should assume that this list is incomplete and fall back to
         get_from_id if they need to guarantee CourseOverview generation.
         """
-        return {
-            overview.id: overview
-            for overview
-            in cls.objects.select_related('image_set').filter(
-                id__in=course_ids,
-                version__gte=cls.VERSION
+        course_ids = list(course_ids)
+        cache_versions = cls._get_cache_versions(course_ids)
+        course_overviews = cls._get_from_cache(course_ids, cache_versions)
+        missing_course_ids = [course_id for course_id in course_ids if course_id not in course_overviews]
+        if missing_course_ids:
+            loaded_course_overviews = {
+                overview.id: overview
+                for overview
+                in cls.objects.select_related('image_set').filter(
+                    id__in=missing_course_ids,
+                    version__gte=cls.VERSION
+                )
+            }
+            cls._set_in_cache(loaded_course_overviews.values(), cache_versions)
+            course_overviews.update(loaded_course_overviews)
+        return course_overviews
+
+    @classmethod
+    def _cache_key(cls, course_id, cache_version):
+        """
+        Returns the key of the overview of the given course in the Django
+        cache.  It includes the model's VERSION, so that overviews cached
+        by older code are never read, and the course's cache version, so
+        that overviews cached before the course's last change are never
+        read.
+        """
+        return u'course_overview.v{}.{}.{}'.format(cls.VERSION, course_id, cache_version)
+
+    @classmethod
+    def _cache_version_key(cls, course_id):
+        """
+        Returns the key of the cache version of the given course in the
+        Django cache.
+        """
+        return u'course_overview.cache_version.{}'.format(course_id)
+
+    @classmethod
+    def _get_cache_versions(cls, course_ids):
+        """
+        Returns a dict mapping the given course_ids to their current cache
+        versions, which change whenever their overviews change.
+
+        They must be read before the overviews are loaded from the
+        database, so that overviews loaded before a concurrent change are
+        cached under the versions that change replaced, where they are
+        never read.
+        """
+        if not getattr(settings, 'COURSE_OVERVIEW_CACHE_TIMEOUT', 0) and get_overview_lru_cache() is None:
+            return {course_id: None for course_id in course_ids}
+
+        version_keys = {course_id: cls._cache_version_key(course_id) for course_id in course_ids}
+        cached = cache.get_many(version_keys.values())
+        cache_versions = {}
+        for course_id, version_key in version_keys.iteritems():
+            cache_version = cached.get(version_key)
+            if cache_version is None:
+                cache_version = uuid4().hex
+                if not cache.add(version_key, cache_version, None):
+                    # Another process added it first.
+                    cache_version = cache.get(version_key)
+            cache_versions[course_id] = cache_version
+        return cache_versions
+
+    @classmethod
+    def _get_from_cache(cls, course_ids, cache_versions):
+        """
+        Returns a dict mapping the given course_ids to fresh copies of
+        their CourseOverviews cached under the given cache versions, for
+        those found in the process-wide LRU cache or in the Django cache.
+
+        Entries of the LRU cache are also only used for
+        COURSE_OVERVIEW_CACHE_LRU_TIMEOUT seconds, in case the cache
+        versions can't be kept in the Django cache.
+        """
+        course_overviews = {}
+        lru_cache = get_overview_lru_cache()
+        if lru_cache is not None:
+            now = time.time()
+            for course_id in course_ids:
+                entry = lru_cache.get(course_id)
+                if entry is not None and entry[0] > now and entry[1] == cache_versions[course_id]:
+                    course_overviews[course_id] = copy.deepcopy(entry[2])
+            monitoring_utils.accumulate('course_overview.cache.lru_hits', len(course_overviews))
+
+        missing_course_ids = [course_id for course_id in course_ids if course_id not in course_overviews]
+        if missing_course_ids and getattr(settings, 'COURSE_OVERVIEW_CACHE_TIMEOUT', 0):
+            cached = cache.get_many([
+                cls._cache_key(course_id, cache_versions[course_id]) for course_id in missing_course_ids
+            ])
+            cached_overviews = [
+                overview for overview in cached.itervalues()
+                if overview.version >= cls.VERSION
+            ]
+            monitoring_utils.accumulate('course_overview.cache.hits', len(cached_overviews))
+            monitoring_utils.accumulate('course_overview.cache.misses', len(missing_course_ids) - len(cached_overviews))
+            cls._set_in_lru_cache(cached_overviews, cache_versions)
+            course_overviews.update((overview.id, overview) for overview in cached_overviews)
+
+        return course_overviews
+
+    @classmethod
+    def _set_in_cache(cls, course_overviews, cache_versions):
+        """
+        Caches the given CourseOverviews, loaded from the database, in the
+        Django cache and the process-wide LRU cache, under the given cache
+        versions, read before they were loaded.
+        """
+        timeout = getattr(settings, 'COURSE_OVERVIEW_CACHE_TIMEOUT', 0)
+        if timeout and course_overviews:
+            cache.set_many(
+                {
+                    cls._cache_key(overview.id, cache_versions[overview.id]): overview
+                    for overview in course_overviews
+                },
+                timeout,
             )
-        }
+        cls._set_in_lru_cache(course_overviews, cache_versions)
+
+    @classmethod
+    def _set_in_lru_cache(cls, course_overviews, cache_versions):
+        """
+        Caches fresh copies of the given CourseOverviews in the
+        process-wide LRU cache, if enabled, under the given cache
+        versions.  Fresh copies don't share their state or their
+        prefetched image sets with the overviews given to callers.
+        """
+        lru_cache = get_overview_lru_cache()
+        if lru_cache is None:
+            return
+        expires_at = time.time() + getattr(settings, 'COURSE_OVERVIEW_CACHE_LRU_TIMEOUT', 0)
+        for overview in course_overviews:
+            lru_cache.set(overview.id, (expires_at, cache_versions[overview.id], copy.deepcopy(overview)))
+
+    @classmethod
+    def clear_cache(cls, course_id):
+        """
+        Changes the cache version of the given course, so that the
+        overviews cached under its previous versions, in the Django cache
+        and in the LRU cache of any process, are never read again.
+        Called whenever the overview or its images are saved or deleted.
+        """
+        cache.set(cls._cache_version_key(course_id), uuid4().hex, None)
+        lru_cache = get_overview_lru_cache()
+        if lru_cache is not None:
+            lru_cache.delete(course_id)
 
     def clean_id(self, padding_char='='):
         """
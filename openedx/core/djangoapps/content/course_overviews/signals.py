@@ -1,9 +1,10 @@
 """
 Signal handler for invalidating cached course overviews
 """
+from django.db.models.signals import post_delete, post_save
 from django.dispatch.dispatcher import receiver
 
-from .models import CourseOverview
+from .models import CourseOverview, CourseOverviewImageSet
 from openedx.core.djangoapps.signals.signals import COURSE_PACING_CHANGED, COURSE_START_DATE_CHANGED
 from xmodule.modulestore.django import SignalHandler
 
@@ -32,6 +33,25 @@ def _listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=
     CourseAboutSearchIndexer.remove_deleted_items(course_key)
 
 
+@receiver(post_save, sender=CourseOverview)
+@receiver(post_delete, sender=CourseOverview)
+def _listen_for_course_overview_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the changed CourseOverview from the cache.
+    """
+    CourseOverview.clear_cache(instance.id)
+
+
+@receiver(post_save, sender=CourseOverviewImageSet)
+@receiver(post_delete, sender=CourseOverviewImageSet)
+def _listen_for_course_overview_image_set_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the CourseOverview of the changed CourseOverviewImageSet from
+    the cache.
+    """
+    CourseOverview.clear_cache(instance.course_overview_id)
+
+
 def _check_for_course_changes(previous_course_overview, updated_course_overview):
     if previous_course_overview:
         _check_for_course_date_changes(previous_course_overview, updated_course_overview)
@@ -11,6 +11,7 @@ from nose.plugins.attrib import attr
 import pytz
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db.utils import IntegrityError
 from django.test.utils import override_settings
 from django.utils import timezone
@@ -35,7 +36,7 @@ from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, check_mongo_calls_range
 
-from ..models import CourseOverview, CourseOverviewImageSet, CourseOverviewImageConfig
+from ..models import CourseOverview, CourseOverviewImageSet, CourseOverviewImageConfig, get_overview_lru_cache
 
 
 @attr(shard=3)
@@ -509,6 +510,119 @@ class CourseOverviewTestCase(ModuleStoreTestCase):
         self.assertIn(course_with_overview_1.id, course_ids_to_overviews)
 
 
+@attr(shard=3)
+@ddt.ddt
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    COURSE_OVERVIEW_CACHE_TIMEOUT=60,
+    COURSE_OVERVIEW_CACHE_LRU_SIZE=10,
+    COURSE_OVERVIEW_CACHE_LRU_TIMEOUT=60,
+)
+class CourseOverviewCacheTestCase(ModuleStoreTestCase):
+    """
+    Tests for the caching of CourseOverviews in the Django cache and the
+    process-wide LRU cache.
+    """
+    ENABLED_SIGNALS = ['course_published']
+
+    def setUp(self):
+        super(CourseOverviewCacheTestCase, self).setUp()
+        cache.clear()
+        get_overview_lru_cache().clear()
+        self.addCleanup(get_overview_lru_cache().clear)
+        self.course = CourseFactory.create(display_name='Original', emit_signals=True)
+
+    def test_get_from_id(self):
+        CourseOverview.get_from_id(self.course.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, 'Original')
+
+    @ddt.data(True, False)
+    def test_get_from_django_cache(self, lru_entry_expired):
+        CourseOverview.get_from_id(self.course.id)
+        if lru_entry_expired:
+            get_overview_lru_cache().clear()
+        else:
+            cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, 'Original')
+
+    def test_lru_entries_expire(self):
+        with override_settings(COURSE_OVERVIEW_CACHE_LRU_TIMEOUT=0):
+            CourseOverview.get_from_id(self.course.id)
+        # Changes made by other processes don't clear this process' LRU cache.
+        CourseOverview.objects.filter(id=self.course.id).update(display_name='Updated')
+        cache.clear()
+        self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, 'Updated')
+
+    def test_lru_entries_invalidated_by_other_processes(self):
+        CourseOverview.get_from_id(self.course.id)
+        # Another process changes the overview, and with it its cache version.
+        CourseOverview.objects.filter(id=self.course.id).update(display_name='Updated')
+        cache.set(CourseOverview._cache_version_key(self.course.id), 'other', None)  # pylint: disable=protected-access
+        self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, 'Updated')
+
+    def test_concurrent_change_not_cached(self):
+        set_in_cache = CourseOverview._set_in_cache  # pylint: disable=protected-access
+
+        def change_then_set_in_cache(course_overviews, cache_versions):
+            """
+            Saves a change to the overview after it was loaded, but before it is cached.
+            """
+            overview = CourseOverview.objects.get(id=self.course.id)
+            overview.display_name = 'Concurrent'
+            overview.save()
+            set_in_cache(course_overviews, cache_versions)
+
+        with mock.patch.object(CourseOverview, '_set_in_cache', side_effect=change_then_set_in_cache):
+            self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, 'Original')
+        self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, 'Concurrent')
+
+    def test_get_from_ids_if_exists(self):
+        other_course = CourseFactory.create(emit_signals=True)
+        course_without_overview = CourseFactory.create(emit_signals=False)
+        CourseOverview.get_from_id(self.course.id)
+
+        course_ids = [self.course.id, other_course.id, course_without_overview.id]
+        # Only the overviews that aren't cached are queried.
+        with self.assertNumQueries(1):
+            overviews = CourseOverview.get_from_ids_if_exists(iter(course_ids))
+        self.assertEqual(set(overviews), {self.course.id, other_course.id})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(set(CourseOverview.get_from_ids_if_exists(course_ids)), set(overviews))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(set(CourseOverview.get_from_ids_if_exists(course_ids[:2])), set(overviews))
+
+    def test_cached_overviews_are_copies(self):
+        overview = CourseOverview.get_from_id(self.course.id)
+        overview.display_name = 'Changed'
+        cached_overview = CourseOverview.get_from_id(self.course.id)
+        self.assertEqual(cached_overview.display_name, 'Original')
+        # pylint: disable=protected-access
+        self.assertIsNot(cached_overview._state, overview._state)
+        self.assertIsNot(cached_overview._state, CourseOverview.get_from_id(self.course.id)._state)
+
+    def test_invalidated_on_save(self):
+        overview = CourseOverview.get_from_id(self.course.id)
+        overview.display_name = 'Saved'
+        overview.save()
+        self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, 'Saved')
+
+    def test_invalidated_on_publish(self):
+        CourseOverview.get_from_id(self.course.id)
+        self.course.display_name = 'Published'
+        self.update_course(self.course, self.user.id)
+        self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, 'Published')
+
+    def test_old_versions_are_not_cached(self):
+        overview = CourseOverview.get_from_id(self.course.id)
+        overview.version = CourseOverview.VERSION - 1
+        overview.save()
+        self.assertEqual(CourseOverview.get_from_ids_if_exists([self.course.id]), {})
+
+
 @attr(shard=3)
 @ddt.ddt
 class CourseOverviewImageSetTestCase(ModuleStoreTestCase):
@@ -15,36 +15,103 @@ except InvalidCacheBackendError:
     pass
 
 
+# Cached in place of the metadata of an asset that doesn't exist.
+MISSING_ASSET = 'missing'
+
+
+class AssetMetadata(object):
+    """
+    The attributes of a piece of content needed to authorize and answer
+    conditional requests for it, without its data.
+    """
+    def __init__(self, location, content_type, length, content_digest, locked, last_modified_at):
+        self.location = location
+        self.content_type = content_type
+        self.length = length
+        self.content_digest = content_digest
+        self.locked = locked
+        self.last_modified_at = last_modified_at
+
+    @classmethod
+    def from_content(cls, content):
+        """
+        Returns the metadata of the given piece of content.
+        """
+        return cls(
+            content.location,
+            content.content_type,
+            content.length,
+            getattr(content, 'content_digest', None),
+            getattr(content, 'locked', False),
+            content.last_modified_at,
+        )
+
+
+def _location_key(location):
+    """
+    Returns the cache key of the content at the given location.
+    """
+    return unicode(location).encode("utf-8")
+
+
+def _metadata_key(location):
+    """
+    Returns the cache key of the metadata of the content at the given location.
+    """
+    return 'metadata:' + _location_key(location)
+
+
 def set_cached_content(content):
     """
     Stores the given piece of content in the cache, using its location as the key.
     """
-    CONTENT_CACHE.set(unicode(content.location).encode("utf-8"), content, version=STATIC_CONTENT_VERSION)
+    CONTENT_CACHE.set(_location_key(content.location), content, version=STATIC_CONTENT_VERSION)
 
 
 def get_cached_content(location):
     """
     Retrieves the given piece of content by its location if cached.
     """
-    return CONTENT_CACHE.get(unicode(location).encode("utf-8"), version=STATIC_CONTENT_VERSION)
+    return CONTENT_CACHE.get(_location_key(location), version=STATIC_CONTENT_VERSION)
+
+
+def set_cached_metadata(content):
+    """
+    Stores the metadata of the given piece of content in the cache.
+    """
+    CONTENT_CACHE.set(
+        _metadata_key(content.location), AssetMetadata.from_content(content), version=STATIC_CONTENT_VERSION
+    )
+
+
+def set_cached_missing(location, timeout):
+    """
+    Remembers for `timeout` seconds that there is no content at the given location.
+    """
+    CONTENT_CACHE.set(_metadata_key(location), MISSING_ASSET, timeout, version=STATIC_CONTENT_VERSION)
+
+
+def get_cached_metadata(location):
+    """
+    Retrieves the AssetMetadata of the content at the given location if cached,
+    or MISSING_ASSET if the content is known not to exist.
+    """
+    return CONTENT_CACHE.get(_metadata_key(location), version=STATIC_CONTENT_VERSION)
 
 
 def del_cached_content(location):
     """
-    Delete content for the given location, as well versions of the content without a run.
+    Delete content and metadata for the given location, as well versions of the content without a run.
 
     It's possible that the content could have been cached without knowing the course_key,
     and so without having the run.
     """
-    def location_str(loc):
-        """Force the location to a Unicode string."""
-        return unicode(loc).encode("utf-8")
-
-    locations = [location_str(location)]
+    locations = [location]
     try:
-        locations.append(location_str(location.replace(run=None)))
+        locations.append(location.replace(run=None))
     except InvalidKeyError:
         # although deprecated keys allowed run=None, new keys don't if there is no version.
         pass
 
-    CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    keys = [_location_key(loc) for loc in locations] + [_metadata_key(loc) for loc in locations]
+    CONTENT_CACHE.delete_many(keys, version=STATIC_CONTENT_VERSION)
@@ -2,25 +2,33 @@
 Middleware to serve assets.
 """
 
+import calendar
 import logging
 import datetime
+from uuid import uuid4
 log = logging.getLogger(__name__)
 try:
     import newrelic.agent
 except ImportError:
     newrelic = None  # pylint: disable=invalid-name
+from django.conf import settings
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect,
+    StreamingHttpResponse)
+from django.utils.http import parse_http_date_safe
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
-from .caching import get_cached_content, set_cached_content
+from .caching import (
+    MISSING_ASSET, AssetMetadata, get_cached_content, get_cached_metadata, set_cached_content, set_cached_metadata,
+    set_cached_missing
+)
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -31,6 +39,10 @@ from .models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Requests for more ranges than this, after merging overlapping ones, are
+# answered with the full content.
+MAX_RANGES = 50
+
 
 class StaticContentServer(object):
     """
@@ -67,14 +79,13 @@ class StaticContentServer(object):
             except (InvalidLocationError, InvalidKeyError):
                 return HttpResponseBadRequest()
 
-            # Attempt to load the asset to make sure it exists, and grab the asset digest
-            # if we're able to load it.
-            actual_digest = None
+            # Attempt to load the asset's metadata to make sure it exists, and grab the asset
+            # digest if we're able to load it.
             try:
-                content = self.load_asset_from_location(loc)
-                actual_digest = getattr(content, "content_digest", None)
+                content = self.load_asset_metadata(loc)
             except (ItemNotFoundError, NotFoundError):
                 return HttpResponseNotFound()
+            actual_digest = getattr(content, "content_digest", None)
 
             # If this was a versioned asset, and the digest doesn't match, redirect
             # them to the actual version.
@@ -108,11 +119,20 @@ class StaticContentServer(object):
 
             # Figure out if the client sent us a conditional request, and let them know
             # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
-                if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
-                if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+            etag = get_etag(content)
+            if not self.is_modified(request, content, etag):
+                response = HttpResponseNotModified()
+                if etag:
+                    response['ETag'] = etag
+                return response
+
+            # Everything above is answered from the asset's metadata alone; the asset
+            # itself is only loaded once we know its data is going to be sent.
+            if isinstance(content, AssetMetadata):
+                try:
+                    content = self.load_asset_from_location(loc)
+                except (ItemNotFoundError, NotFoundError):
+                    return HttpResponseNotFound()
 
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
@@ -121,11 +141,8 @@ class StaticContentServer(object):
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
-            if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
+            content_type = content.content_type
+            if request.META.get('HTTP_RANGE') and self.is_range_current(request, content, etag):
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -138,36 +155,46 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
-                        log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
-                        )
                     else:
-                        first, last = ranges[0]
-
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                        ranges = merge_ranges(
+                            (first, last) for first, last in ranges if 0 <= first <= last < content.length
+                        )
+                        if not ranges:
+                            log.warning(
+                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            )
+                            response = HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            response['Content-Range'] = 'bytes */{length}'.format(length=content.length)
+                            return response
+                        elif len(ranges) > MAX_RANGES:
+                            # We're allowed to ignore the ranges, and send back the full content.
+                            log.warning(
+                                u"Too many ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            )
+                        elif len(ranges) == 1:
+                            first, last = ranges[0]
+                            response = self.make_response(content, content.stream_data_in_range(first, last))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
                             response.status_code = 206  # Partial Content
-
-                            if newrelic:
-                                newrelic.agent.add_custom_parameter('contentserver.ranged', True)
                         else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
-                            )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            # Multiple ranges are sent as a multipart/byteranges message.
+                            # https://tools.ietf.org/html/rfc7233#section-4.1
+                            boundary = uuid4().hex
+                            content_type = 'multipart/byteranges; boundary={}'.format(boundary)
+                            response = self.make_response(content, stream_multipart_ranges(content, ranges, boundary))
+                            response['Content-Length'] = str(multipart_ranges_length(content, ranges, boundary))
+                            response.status_code = 206  # Partial Content
+
+                        if response is not None and newrelic:
+                            newrelic.agent.add_custom_parameter('contentserver.ranged', True)
+                            newrelic.agent.add_custom_parameter('contentserver.range_count', len(ranges))
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = self.make_response(content, content.stream_data())
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -176,7 +203,9 @@ class StaticContentServer(object):
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
+            response['Content-Type'] = content_type
+            if etag:
+                response['ETag'] = etag
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
             # middleware we have in place, there's no easy way to use the built-in Django
@@ -186,6 +215,62 @@ class StaticContentServer(object):
 
             return response
 
+    @staticmethod
+    def make_response(content, data):
+        """
+        Returns a response for the given chunks of the content's data.
+
+        Content that was loaded into memory is small, and sent as a regular
+        response.  Otherwise the data is streamed from the contentstore, so that
+        only one chunk at a time is held in memory.
+        """
+        if isinstance(content, StaticContentStream):
+            return StreamingHttpResponse(data)
+        return HttpResponse(data)
+
+    @staticmethod
+    def is_modified(request, content, etag):
+        """
+        Returns whether the content should be sent in response to a conditional
+        request, based on its If-None-Match or If-Modified-Since header.
+        """
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            # If-None-Match takes precedence, and uses the weak comparison.
+            # https://tools.ietf.org/html/rfc7232#section-3.2
+            if not etag:
+                return True
+            if if_none_match.strip() == '*':
+                return False
+            return not any(
+                tag.strip().replace('W/', '', 1) == etag for tag in if_none_match.split(',')
+            )
+
+        if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+        if if_modified_since is not None:
+            if if_modified_since == content.last_modified_at.strftime(HTTP_DATE_FORMAT):
+                return False
+            if_modified_since = parse_http_date_safe(if_modified_since)
+            if if_modified_since is not None:
+                return calendar.timegm(content.last_modified_at.utctimetuple()) > if_modified_since
+        return True
+
+    @staticmethod
+    def is_range_current(request, content, etag):
+        """
+        Returns whether the Range header of the request should be honored, given
+        its If-Range header: a range of an outdated representation is ignored,
+        and the full content sent instead.
+        """
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith('"'):
+            # Entity tags in If-Range use the strong comparison.
+            return bool(etag) and if_range == etag
+        return if_range == content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+
     def set_caching_headers(self, content, response):
         """
         Sets caching headers based on whether or not the asset is locked.
@@ -265,6 +350,24 @@ class StaticContentServer(object):
 
         return True
 
+    def load_asset_metadata(self, location):
+        """
+        Loads the metadata of an asset based on its location, either retrieving it
+        from a cache or loading the asset itself.
+
+        Returns an AssetMetadata, or the asset itself if it had to be loaded.  Raises
+        NotFoundError if the asset is known not to exist.
+        """
+        metadata = get_cached_metadata(location)
+        if metadata == MISSING_ASSET:
+            raise NotFoundError(location)
+        if metadata is not None:
+            return metadata
+
+        content = self.load_asset_from_location(location)
+        set_cached_metadata(content)
+        return content
+
     def load_asset_from_location(self, location):
         """
         Loads an asset based on its location, either retrieving it from a cache
@@ -274,22 +377,96 @@ class StaticContentServer(object):
         # See if we can load this item from cache.
         content = get_cached_content(location)
         if content is None:
-            # Not in cache, so just try and load it from the asset manager.
+            # Not in cache, so just try and load it from the asset manager.  Remember
+            # for a while that missing assets are missing, so that repeated requests
+            # for them don't all reach the contentstore.
             try:
                 content = AssetManager.find(location, as_stream=True)
             except (ItemNotFoundError, NotFoundError):
+                set_cached_missing(location, settings.COURSE_ASSETS_CACHE_MISSING_TIMEOUT)
                 raise
 
-            # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
-            # because it's the default for memcached and also we don't want to do too much
-            # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            # Now that we fetched it, let's go ahead and try to cache it, if it's small enough:
+            # the limit should stay below the item size limit of the cache (1MB for memcached),
+            # and we don't want to do too much buffering in memory when we're serving an
+            # actual request.
+            if content.length is not None and content.length < settings.COURSE_ASSETS_CACHE_MAX_BODY_SIZE:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
 
         return content
 
 
+def get_etag(content):
+    """
+    Returns the strong entity tag for the content, derived from its digest,
+    or None if it has no digest.
+    """
+    digest = getattr(content, 'content_digest', None)
+    if not digest:
+        return None
+    return '"{}"'.format(digest)
+
+
+def merge_ranges(ranges):
+    """
+    Returns the given (first, last) byte ranges in order, merging the ranges
+    that overlap or are adjacent.
+    """
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def _multipart_part_header(content, first, last, boundary):
+    """
+    Returns the delimiter and headers preceding the (first, last) range in a
+    multipart/byteranges message.
+    """
+    return (
+        '--{boundary}\r\n'
+        'Content-Type: {content_type}\r\n'
+        'Content-Range: bytes {first}-{last}/{length}\r\n'
+        '\r\n'
+    ).format(
+        boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length
+    )
+
+
+def _multipart_end(boundary):
+    """
+    Returns the closing delimiter of a multipart/byteranges message.
+    """
+    return '--{boundary}--\r\n'.format(boundary=boundary)
+
+
+def stream_multipart_ranges(content, ranges, boundary):
+    """
+    Yields the body of a multipart/byteranges message holding the given ranges
+    of the content, one chunk at a time.
+    """
+    for first, last in ranges:
+        yield _multipart_part_header(content, first, last, boundary)
+        for chunk in content.stream_data_in_range(first, last):
+            yield chunk
+        yield '\r\n'
+    yield _multipart_end(boundary)
+
+
+def multipart_ranges_length(content, ranges, boundary):
+    """
+    Returns the length of the body generated by stream_multipart_ranges.
+    """
+    length = len(_multipart_end(boundary))
+    for first, last in ranges:
+        length += len(_multipart_part_header(content, first, last, boundary)) + (last - first + 1) + len('\r\n')
+    return length
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
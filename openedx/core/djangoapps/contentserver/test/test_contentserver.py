@@ -27,7 +27,8 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
-from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
+from ..caching import del_cached_content
+from ..middleware import merge_ranges, parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
 
@@ -242,16 +243,104 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges message
+        with one part per range.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
-        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.status_code, 206)
         self.assertNotIn('Content-Range', resp)
-        self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        self.assertEqual(resp['Content-Length'], str(len(resp.content)))
+
+        boundary = resp['Content-Type'].split('boundary=')[1]
+        full_content = self.client.get(self.url_unlocked).content
+        parts = resp.content.split('--' + boundary)
+        self.assertEqual(parts[0], '')
+        self.assertEqual(parts[-1], '--\r\n')
+        expected_ranges = [(first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1)]
+        self.assertEqual(len(parts[1:-1]), len(expected_ranges))
+        for part, (first, last) in zip(parts[1:-1], expected_ranges):
+            headers, body = part.split('\r\n\r\n', 1)
+            self.assertIn('Content-Range: bytes {}-{}/{}'.format(first, last, self.length_unlocked), headers)
+            self.assertEqual(body, full_content[first:last + 1] + '\r\n')
+
+    def test_range_request_overlapping_ranges(self):
+        """
+        Test that overlapping ranges are merged into a single range.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=10-20, 0-15')
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp['Content-Range'], 'bytes 0-20/{}'.format(self.length_unlocked))
+        self.assertEqual(resp['Content-Length'], '21')
+
+    def test_range_request_with_unsatisfiable_ranges(self):
+        """
+        Test that unsatisfiable ranges are ignored, as long as one range can be satisfied.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9, {}-'.format(self.length_unlocked))
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp['Content-Range'], 'bytes 0-9/{}'.format(self.length_unlocked))
+
+    def test_etag(self):
+        """
+        Test that responses carry a strong ETag, and that conditional requests
+        with If-None-Match are answered with 304 Not Modified if it matches.
+        """
+        resp = self.client.get(self.url_unlocked)
+        etag = resp['ETag']
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+
+        for if_none_match in (etag, 'W/' + etag, '"other", ' + etag, '*'):
+            resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=if_none_match)
+            self.assertEqual(resp.status_code, 304)
+            self.assertEqual(resp['ETag'], etag)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_if_none_match_takes_precedence(self):
+        """
+        Test that If-Modified-Since is ignored when If-None-Match is sent.
+        """
+        last_modified = self.client.get(self.url_unlocked)['Last-Modified']
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other"', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, 200)
+
+    @ddt.data(
+        (datetime.timedelta(0), 304),
+        (datetime.timedelta(days=1), 304),
+        (datetime.timedelta(days=-1), 200),
+    )
+    @ddt.unpack
+    def test_if_modified_since(self, offset, expected_status):
+        """
+        Test that If-Modified-Since dates are compared to the asset's modification date.
+        """
+        last_modified = self.client.get(self.url_unlocked)['Last-Modified']
+        last_modified = datetime.datetime.strptime(last_modified, HTTP_DATE_FORMAT)
+        resp = self.client.get(
+            self.url_unlocked, HTTP_IF_MODIFIED_SINCE=(last_modified + offset).strftime(HTTP_DATE_FORMAT)
+        )
+        self.assertEqual(resp.status_code, expected_status)
+
+    def test_if_range(self):
+        """
+        Test that ranges are only sent if If-Range matches the current version
+        of the asset, and that the full content is sent otherwise.
+        """
+        resp = self.client.get(self.url_unlocked)
+        for if_range in (resp['ETag'], resp['Last-Modified']):
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=if_range)
+            self.assertEqual(resp.status_code, 206)
+
+        for if_range in ('"other"', 'Mon, 01 Jan 2001 00:00:00 GMT'):
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=if_range)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
 
     @ddt.data(
         'bytes 0-',
@@ -275,6 +364,7 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}'.format(
             first=(self.length_unlocked / 2), last=(self.length_unlocked / 4)))
         self.assertEqual(resp.status_code, 416)
+        self.assertEqual(resp['Content-Range'], 'bytes */{}'.format(self.length_unlocked))
 
     def test_range_request_malformed_out_of_bounds(self):
         """
@@ -285,6 +375,56 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
 
+    def test_missing_asset_is_cached(self):
+        """
+        Test that repeated requests for a missing asset only look for it once.
+        """
+        missing_asset = self.course_key.make_asset_key('asset', 'missing.txt')
+        del_cached_content(missing_asset)
+        self.addCleanup(del_cached_content, missing_asset)
+
+        with patch.object(AssetManager, 'find', wraps=AssetManager.find) as mock_find:
+            for __ in range(2):
+                resp = self.client.get(unicode(missing_asset))
+                self.assertEqual(resp.status_code, 404)
+            self.assertEqual(mock_find.call_count, 1)
+
+    @override_settings(COURSE_ASSETS_CACHE_MAX_BODY_SIZE=0)
+    def test_conditional_request_answered_from_metadata(self):
+        """
+        Test that conditional requests for assets whose data isn't cached are
+        answered without loading the asset.
+        """
+        del_cached_content(self.unlocked_asset)
+        self.addCleanup(del_cached_content, self.unlocked_asset)
+        etag = self.client.get(self.url_unlocked)['ETag']
+
+        with patch.object(AssetManager, 'find', wraps=AssetManager.find) as mock_find:
+            resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(resp.status_code, 304)
+            self.assertEqual(mock_find.call_count, 0)
+
+            # The data of the asset isn't cached, so it's loaded whenever it's sent.
+            resp = self.client.get(self.url_unlocked)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(mock_find.call_count, 1)
+
+    def test_locked_asset_authorized_from_metadata(self):
+        """
+        Test that unauthorized requests for a locked asset are refused without
+        loading the asset.
+        """
+        del_cached_content(self.locked_asset)
+        self.addCleanup(del_cached_content, self.locked_asset)
+        self.client.login(username=self.staff_usr, password='test')
+        self.assertEqual(self.client.get(self.url_locked).status_code, 200)
+        self.client.logout()
+
+        with patch.object(AssetManager, 'find', wraps=AssetManager.find) as mock_find:
+            resp = self.client.get(self.url_locked)
+            self.assertEqual(resp.status_code, 403)
+            self.assertEqual(mock_find.call_count, 0)
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
@@ -447,3 +587,22 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertRaisesRegexp(
             exception_class, exception_message_regex, parse_range_header, header_value, self.content_length
         )
+
+
+@ddt.ddt
+class MergeRangesTestCase(unittest.TestCase):
+    """
+    Tests for the merge_ranges function.
+    """
+    @ddt.data(
+        ([], []),
+        ([(0, 10)], [(0, 10)]),
+        ([(20, 30), (0, 10)], [(0, 10), (20, 30)]),
+        ([(0, 10), (5, 20)], [(0, 20)]),
+        ([(0, 10), (11, 20)], [(0, 20)]),
+        ([(0, 100), (10, 20)], [(0, 100)]),
+        ([(0, 10), (12, 20), (5, 11)], [(0, 20)]),
+    )
+    @ddt.unpack
+    def test_merge_ranges(self, ranges, expected_ranges):
+        self.assertEqual(merge_ranges(ranges), expected_ranges)
@@ -298,7 +298,7 @@ class CourseWaffleFlag(WaffleFlag):
             """
             # Import is placed here to avoid model import at project startup.
             from .models import WaffleFlagCourseOverrideModel
-            cache_key = u'{}.{}'.format(namespaced_flag_name, unicode(course_key))
+            cache_key = self._course_override_cache_key(course_key)
             force_override = self.waffle_namespace._cached_flags.get(cache_key)
 
             if force_override is None:
@@ -313,6 +313,30 @@ class CourseWaffleFlag(WaffleFlag):
 
         return course_override_callback
 
+    def prefetch_course_overrides(self, course_keys):
+        """
+        Caches the course overrides of the flag for the given courses, so that
+        checking it for each of them doesn't query the database once per course.
+
+        Arguments:
+            course_keys (list of CourseKey): The courses to prefetch overrides for.
+        """
+        # Import is placed here to avoid model import at project startup.
+        from .models import WaffleFlagCourseOverrideModel
+        course_keys = [
+            course_key for course_key in course_keys
+            if self.waffle_namespace._cached_flags.get(self._course_override_cache_key(course_key)) is None
+        ]
+        overrides = WaffleFlagCourseOverrideModel.override_values(self.namespaced_flag_name, course_keys)
+        for course_key, force_override in overrides.iteritems():
+            self.waffle_namespace._cached_flags[self._course_override_cache_key(course_key)] = force_override
+
+    def _course_override_cache_key(self, course_key):
+        """
+        Returns the key under which the course override of the flag is cached.
+        """
+        return u'{}.{}'.format(self.namespaced_flag_name, unicode(course_key))
+
     def is_enabled(self, course_key=None):
         """
         Returns whether or not the flag is enabled.
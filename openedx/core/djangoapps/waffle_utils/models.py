@@ -50,6 +50,33 @@ class WaffleFlagCourseOverrideModel(ConfigurationModel):
             return effective.override_choice
         return cls.ALL_CHOICES.unset
 
+    @classmethod
+    def override_values(cls, waffle_flag, course_ids):
+        """
+        Returns a dict mapping each of the given course ids to the value that
+        override_value would return for it, using a single query.
+
+        Arguments:
+            waffle_flag (String): The name of the flag.
+            course_ids (list of CourseKey): The course ids for which the flag
+                may have been overridden.
+        """
+        values = {course_id: cls.ALL_CHOICES.unset for course_id in course_ids}
+        if not values or not waffle_flag:
+            return values
+
+        seen_course_ids = set()
+        overrides = cls.objects.filter(
+            waffle_flag=waffle_flag, course_id__in=values.keys()
+        ).order_by('-change_date', '-id')
+        for override in overrides:
+            if override.course_id in seen_course_ids:
+                continue
+            seen_course_ids.add(override.course_id)
+            if override.enabled:
+                values[override.course_id] = override.override_choice
+        return values
+
     class Meta(object):
         app_label = "waffle_utils"
         verbose_name = 'Waffle flag course override'
@@ -91,3 +91,26 @@ class TestCourseWaffleFlag(TestCase):
                 self.NAMESPACED_FLAG_NAME,
                 self.TEST_COURSE_KEY
             )
+
+    def test_prefetch_course_overrides(self):
+        """
+        Test that prefetched course overrides are used instead of being read
+        one course at a time.
+        """
+        RequestCache.clear_request_cache()
+
+        with patch.object(WaffleFlagCourseOverrideModel, 'override_values', return_value={
+            self.TEST_COURSE_KEY: WaffleFlagCourseOverrideModel.ALL_CHOICES.on,
+            self.TEST_COURSE_2_KEY: WaffleFlagCourseOverrideModel.ALL_CHOICES.unset,
+        }):
+            self.TEST_COURSE_FLAG.prefetch_course_overrides([self.TEST_COURSE_KEY, self.TEST_COURSE_2_KEY])
+            WaffleFlagCourseOverrideModel.override_values.assert_called_once_with(
+                self.NAMESPACED_FLAG_NAME,
+                [self.TEST_COURSE_KEY, self.TEST_COURSE_2_KEY]
+            )
+
+        with patch.object(WaffleFlagCourseOverrideModel, 'override_value') as override_value:
+            with override_flag(self.NAMESPACED_FLAG_NAME, active=False):
+                self.assertTrue(self.TEST_COURSE_FLAG.is_enabled(self.TEST_COURSE_KEY))
+                self.assertFalse(self.TEST_COURSE_FLAG.is_enabled(self.TEST_COURSE_2_KEY))
+            self.assertFalse(override_value.called)
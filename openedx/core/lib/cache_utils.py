@@ -4,6 +4,7 @@ Utilities related to caching.
 import collections
 import cPickle as pickle
 import functools
+import threading
 import zlib
 
 from xblock.core import XBlock
@@ -84,6 +85,82 @@ class memoized(object):  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+class LRUCache(object):
+    """
+    A thread-safe, in-process least-recently-used cache whose capacity is
+    the total size of its entries rather than their number.
+
+    The caller supplies each entry's size (e.g. its serialized length in
+    bytes) when setting it. Entries bigger than the whole cache are not
+    stored. Since the cache lives for the lifetime of the process, only use
+    it for values that never change for a given key, or that the caller
+    invalidates explicitly.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Return the value cached for key (marking it as recently used), or default.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, size=1):
+        """
+        Cache value under key, evicting the least recently used entries as
+        needed to stay within max_size. Returns whether the value was cached.
+        """
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            if size > self.max_size:
+                return False
+            while self._entries and self.size + size > self.max_size:
+                __, (__, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+            self._entries[key] = (value, size)
+            self.size += size
+            return True
+
+    def delete(self, key):
+        """
+        Remove key from the cache, if present.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+
+    def clear(self):
+        """
+        Remove every entry from the cache. The counters are left untouched.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
 def hashvalue(arg):
     """
     If arg is an xblock, use its location. otherwise just turn it into a string
@@ -6,7 +6,7 @@ from unittest import TestCase
 import ddt
 from mock import MagicMock
 
-from openedx.core.lib.cache_utils import memoize_in_request_cache
+from openedx.core.lib.cache_utils import LRUCache, memoize_in_request_cache
 
 
 @ddt.ddt
@@ -63,3 +63,52 @@ class TestMemoizeInRequestCache(TestCase):
                 func_to_memoize(*arg_list2)
 
             self.assertEquals(self.func_to_count.call_count, 2)
+
+
+class TestLRUCache(TestCase):
+    """
+    Test the size-bounded LRUCache.
+    """
+    def setUp(self):
+        super(TestLRUCache, self).setUp()
+        self.cache = LRUCache(max_size=10)
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get('foo'))
+        self.assertEqual(self.cache.get('foo', 'default'), 'default')
+        self.assertTrue(self.cache.set('foo', 'bar', size=4))
+        self.assertEqual(self.cache.get('foo'), 'bar')
+        self.assertEqual((self.cache.hits, self.cache.misses, self.cache.size), (1, 2, 4))
+
+    def test_eviction_order(self):
+        self.cache.set('a', 1, size=4)
+        self.cache.set('b', 2, size=4)
+        # touch 'a' so that 'b' is the least recently used entry
+        self.cache.get('a')
+        self.cache.set('c', 3, size=4)
+
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('c', self.cache)
+        self.assertEqual((self.cache.evictions, self.cache.size, len(self.cache)), (1, 8, 2))
+
+    def test_replace(self):
+        self.cache.set('a', 1, size=4)
+        self.cache.set('a', 2, size=6)
+        self.assertEqual(self.cache.get('a'), 2)
+        self.assertEqual((self.cache.size, self.cache.evictions), (6, 0))
+
+    def test_oversized(self):
+        self.cache.set('a', 1, size=4)
+        self.assertFalse(self.cache.set('b', 2, size=11))
+        self.assertNotIn('b', self.cache)
+        self.assertEqual((self.cache.size, self.cache.evictions), (4, 0))
+
+    def test_delete_and_clear(self):
+        self.cache.set('a', 1, size=4)
+        self.cache.set('b', 2, size=4)
+        self.cache.delete('a')
+        self.cache.delete('missing')
+        self.assertEqual((self.cache.size, len(self.cache)), (4, 1))
+        self.cache.clear()
+        self.assertEqual((self.cache.size, len(self.cache)), (0, 0))